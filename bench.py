@@ -0,0 +1,280 @@
+# bench.py — Micro-Benchmarks der heißen Pfade (Parsing, Filter/Ranking, Rendering, Positions-Store, Exit-Engine)
+# - Synthetische DexScreener-Pairs aus festem Seed (ingest.synthetic_pairs), 100 … 100k Pairs, 1 … 1000 Positionen
+# - Pro Fall: Median/p95 je Durchlauf und Durchsatz; Ergebnis als JSON zum Vergleich zwischen Commits
+# CLI: python bench.py [--quick] [--seed 42] [--min-time 0.2] [--only filter,exit] [--out bench_output.json]
+#                      [--compare alt.json]
+import io, json, os, platform, shutil, statistics, subprocess, sys, tempfile, time
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+PAIR_SIZES = (100, 1_000, 10_000, 100_000)
+POSITION_SIZES = (1, 10, 100, 1_000)
+GROUPS = ("parse", "snapshot", "filter", "vector", "render", "store", "exit")
+
+def _git_rev() -> Optional[str]:
+    try:
+        here = os.path.dirname(os.path.abspath(__file__))
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=here, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+def measure(fn: Callable[[], Any], items: int, min_time: float = 0.2, max_runs: int = 200,
+            setup: Optional[Callable[[], Any]] = None) -> Dict[str, Any]:
+    """fn() wiederholt bis min_time (mind. 3 Läufe); setup() läuft vor jedem Lauf außerhalb der Messung."""
+    times: List[float] = []
+    quiet = io.StringIO()
+    spent = 0.0
+    while (spent < min_time or len(times) < 3) and len(times) < max_runs:
+        if setup:
+            setup()
+        with redirect_stdout(quiet):   # filter_pairs & Co. loggen jeden Lauf
+            t0 = time.perf_counter()
+            fn()
+            dt = time.perf_counter() - t0
+        quiet.seek(0)
+        quiet.truncate()
+        times.append(dt)
+        spent += dt
+    times.sort()
+    med = statistics.median(times)
+    return {
+        "runs": len(times), "items": items,
+        "median_ms": med * 1000.0,
+        "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000.0,
+        "min_ms": times[0] * 1000.0,
+        "items_per_s": items / med if med > 0 else 0.0,
+        "ns_per_item": med / items * 1e9 if items else 0.0,
+    }
+
+class Bench:
+    def __init__(self, seed: int = 42, min_time: float = 0.2, pair_sizes=PAIR_SIZES, position_sizes=POSITION_SIZES):
+        self.seed = seed
+        self.min_time = min_time
+        self.pair_sizes = tuple(pair_sizes)
+        self.position_sizes = tuple(position_sizes)
+        self.results: List[Dict[str, Any]] = []
+        # feste Uhr, damit der Age-Filter bei jedem Lauf dieselben Pairs durchlässt
+        self.now_ms = 1_750_000_000_000
+        self._raw: Dict[int, List[Dict[str, Any]]] = {}
+        self._snaps: Dict[int, list] = {}
+
+    # ---------- Daten ----------
+    def raw(self, n: int) -> List[Dict[str, Any]]:
+        if n not in self._raw:
+            from ingest import synthetic_pairs, project_pair
+            # Bot-Pipeline sieht nur projizierte Felder (ingest.parse_pairs)
+            self._raw[n] = [project_pair(p) for p in synthetic_pairs(n, self.seed, now_ms=self.now_ms)]
+        return self._raw[n]
+
+    def snaps(self, n: int) -> list:
+        if n not in self._snaps:
+            from pairs import PairSnapshot
+            self._snaps[n] = [PairSnapshot.from_pair(p) for p in self.raw(n)]
+        return self._snaps[n]
+
+    def _add(self, group: str, name: str, size: int, res: Dict[str, Any], **extra):
+        row = {"group": group, "name": name, "size": size}
+        row.update(res)
+        row.update(extra)
+        self.results.append(row)
+        print(f"  {group:8s} {name:26s} n={size:<7d} median {row['median_ms']:10.3f} ms | p95 {row['p95_ms']:10.3f} ms | "
+              f"{row['items_per_s']:14,.0f}/s | {row['ns_per_item']:9.0f} ns/item")
+
+    # ---------- Fälle ----------
+    def bench_parse(self):
+        from pairs import _as_int, _as_float, _num
+        for n in self.pair_sizes:
+            raw = self.raw(n)
+            ints = [p.get("fdv") for p in raw]
+            floats = [p.get("priceNative") for p in raw]
+
+            def run_int():
+                for v in ints:
+                    _as_int(v)
+
+            def run_float():
+                for v in floats:
+                    _as_float(v)
+
+            def run_num():
+                for p in raw:
+                    _num(p, "liquidity", "usd")
+                    _num(p, "volume", "m5")
+                    _num(p, "fdv")
+
+            self._add("parse", "_as_int", n, measure(run_int, n, self.min_time))
+            self._add("parse", "_as_float", n, measure(run_float, n, self.min_time))
+            self._add("parse", "_num x3", n, measure(run_num, 3 * n, self.min_time))
+
+    def bench_snapshot(self):
+        from pairs import PairSnapshot
+        for n in self.pair_sizes:
+            raw = self.raw(n)
+            self._add("snapshot", "PairSnapshot.from_pair", n,
+                      measure(lambda: [PairSnapshot.from_pair(p) for p in raw], n, self.min_time))
+
+    def bench_filter(self, bot):
+        for n in self.pair_sizes:
+            snaps = self.snaps(n)
+            with redirect_stdout(io.StringIO()):
+                filtered = bot.filter_pairs(snaps)
+            self._add("filter", "filter_pairs", n, measure(lambda: bot.filter_pairs(snaps), n, self.min_time),
+                      kept=len(filtered))
+            hits = bot.apply_strategy(filtered)
+            self._add("filter", "apply_strategy", len(filtered),
+                      measure(lambda: bot.apply_strategy(filtered), max(1, len(filtered)), self.min_time), hits=len(hits))
+            self._add("filter", "filter+strategy", n,
+                      measure(lambda: bot.apply_strategy(bot.filter_pairs(snaps)), n, self.min_time), hits=len(hits))
+
+    def bench_vector(self, bot):
+        import vector_engine
+        if not vector_engine.HAVE_NUMPY:
+            print("  vector   numpy fehlt – übersprungen")
+            return
+        for n in self.pair_sizes:
+            snaps = self.snaps(n)
+            self._add("vector", "filter_and_rank", n,
+                      measure(lambda: vector_engine.filter_and_rank(snaps, bot.CONFIG), n, self.min_time))
+
+    def bench_render(self, bot):
+        for n in self.pair_sizes:
+            rows = [(p, p.liq, p.fdv, p.vol5, p.best_vol) for p in self.snaps(n)]
+            self._add("render", "_fmt_pair", n, measure(lambda: [bot._fmt_pair(*t) for t in rows], n, self.min_time))
+
+    def bench_store(self):
+        from positions import PositionBook, JsonFileStore, SqliteStore
+        for backend in ("json", "sqlite"):
+            for n in self.position_sizes:
+                folder = tempfile.mkdtemp(prefix="bench-pos-")
+                try:
+                    with redirect_stdout(io.StringIO()):
+                        store = (JsonFileStore(os.path.join(folder, "p.json"), fsync="never") if backend == "json"
+                                 else SqliteStore(os.path.join(folder, "p.db"), fsync="never"))
+                        book = PositionBook(store, flush_interval=3600.0)
+                    pos = [{"mint": f"Mint{i:040d}", "symbol": f"T{i}", "entry_price_sol": 0.001 * (i + 1),
+                            "qty_est": 1000.0, "tp1_hit": False, "high_after_tp1": 0.0} for i in range(n)]
+
+                    def add_all():
+                        for p in pos:
+                            book.add(p)
+
+                    def update_all():
+                        for i, p in enumerate(pos):
+                            book.update(p["mint"], {"high_after_tp1": 0.002 * (i + 1)})
+
+                    self._add("store", f"{backend}.add", n, measure(add_all, n, self.min_time, setup=book.flush))
+                    self._add("store", f"{backend}.update", n, measure(update_all, n, self.min_time, setup=book.flush))
+                    self._add("store", f"{backend}.flush(all dirty)", n,
+                              measure(book.flush, n, self.min_time, setup=update_all))
+                    self._add("store", f"{backend}.get", n,
+                              measure(lambda: [book.get(p["mint"]) for p in pos], n, self.min_time))
+                    book.close()
+                finally:
+                    shutil.rmtree(folder, ignore_errors=True)
+
+    def bench_exit(self, bot):
+        from exit_engine import ExitEngine
+        cfg = dict(bot.CONFIG)
+        for n in self.position_sizes:
+            eng = ExitEngine(cfg, on_signal=lambda s: None)
+            mints = [f"Mint{i:040d}" for i in range(n)]
+            pos = [{"mint": m, "symbol": m[:6], "entry_price_sol": 1.0} for m in mints]
+            quiet = {m: 1.01 for m in mints}              # kreuzt keinen Trigger
+            cross = {m: 1.5 if i % 10 == 0 else 1.01 for i, m in enumerate(mints)}   # 10 % feuern TP1
+
+            def track_all():
+                for p in pos:
+                    eng.track(p)
+
+            track_all()
+            self._add("exit", "process (kein Trigger)", n, measure(lambda: eng.process(quiet), n, self.min_time))
+            self._add("exit", "process (10% TP1)", n,
+                      measure(lambda: eng.process(cross), n, self.min_time, setup=track_all))
+            self._add("exit", "track (reindex)", n, measure(track_all, n, self.min_time))
+
+    # ---------- Ablauf ----------
+    def run(self, only: Optional[List[str]] = None) -> Dict[str, Any]:
+        groups = [g for g in GROUPS if not only or g in only]
+        bot = None
+        if any(g in groups for g in ("filter", "vector", "render", "exit")):
+            os.environ.setdefault("DRY_RUN", "1")
+            with redirect_stdout(io.StringIO()):
+                import bot
+            # Age-Filter gegen die feste Generator-Uhr
+            bot._now_us = lambda now=None: self.now_ms * 1000
+            import vector_engine
+            vector_engine._now_us = bot._now_us
+        t0 = time.perf_counter()
+        for g in groups:
+            fn = getattr(self, f"bench_{g}")
+            fn(bot) if g in ("filter", "vector", "render", "exit") else fn()
+        return {
+            "meta": {
+                "commit": _git_rev(),
+                "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "seed": self.seed,
+                "min_time": self.min_time,
+                "pair_sizes": list(self.pair_sizes),
+                "position_sizes": list(self.position_sizes),
+                "groups": groups,
+                "total_sec": time.perf_counter() - t0,
+            },
+            "results": self.results,
+        }
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold_pct: float = 10.0) -> List[str]:
+    """Median-Vergleich je (group, name, size); Zeilen mit mehr als threshold_pct Abweichung markiert."""
+    ref = {(r["group"], r["name"], r["size"]): r for r in old.get("results", [])}
+    out = []
+    for r in new.get("results", []):
+        o = ref.get((r["group"], r["name"], r["size"]))
+        if not o or o["median_ms"] <= 0:
+            continue
+        d = (r["median_ms"] / o["median_ms"] - 1.0) * 100.0
+        mark = "  LANGSAMER" if d > threshold_pct else ("  schneller" if d < -threshold_pct else "")
+        out.append(f"  {r['group']:8s} {r['name']:26s} n={r['size']:<7d} {o['median_ms']:10.3f} -> {r['median_ms']:10.3f} ms ({d:+6.1f}%){mark}")
+    return out
+
+def main(argv: List[str]) -> int:
+    opts = {"--seed": "42", "--min-time": "0.2", "--only": "", "--out": "bench_output.json", "--compare": ""}
+    quick = False
+    i = 0
+    while i < len(argv):
+        a = argv[i]
+        if a == "--quick":
+            quick = True
+            i += 1
+        elif a in opts and i + 1 < len(argv):
+            opts[a] = argv[i + 1]
+            i += 2
+        else:
+            print("Usage: python bench.py [--quick] [--seed N] [--min-time S] [--only gruppe,...] [--out datei.json] [--compare alt.json]")
+            print(f"Gruppen: {', '.join(GROUPS)}")
+            return 2
+    only = [g.strip() for g in opts["--only"].split(",") if g.strip()] or None
+    b = Bench(
+        seed=int(opts["--seed"]), min_time=float(opts["--min-time"]),
+        pair_sizes=PAIR_SIZES[:3] if quick else PAIR_SIZES,
+        position_sizes=POSITION_SIZES[:3] if quick else POSITION_SIZES,
+    )
+    print(f"[BENCH] seed={b.seed} pairs={list(b.pair_sizes)} positions={list(b.position_sizes)}")
+    report = b.run(only)
+    if opts["--out"]:
+        with open(opts["--out"], "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"[BENCH] {len(report['results'])} Ergebnisse -> {opts['--out']} ({report['meta']['total_sec']:.1f}s)")
+    if opts["--compare"]:
+        with open(opts["--compare"]) as f:
+            old = json.load(f)
+        print(f"[BENCH] Vergleich mit {opts['--compare']} (Commit {old.get('meta', {}).get('commit')}):")
+        for line in compare(old, report):
+            print(line)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -1,62 +1,51 @@
 # bot.py — NeoAutoSniper mit echtem Buy/Sell, Partial-TP, und /set min|max|res|pct|slippage|timeout
-import os, time, json, threading, requests
-from typing import List, Dict, Any, Optional
+import os, time, threading, requests
+from typing import List, Dict, Any, Optional, Callable
 from datetime import datetime, timezone
-
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from http_pool import get_session
+from ingest import parse_pairs
+from pairs import _as_int, _as_float, _num, _now_us, PairSnapshot
+from prices import PriceOracle, PriceSnapshot, PriceCache
+from positions import PositionBook, JsonFileStore, SqliteStore
+from exit_engine import ExitEngine, ExitSignal, ExitExecutor
+from stream_feed import StreamingPriceFeed
+from scan_index import SeenPairIndex
+import vector_engine
 from telegram_handlers import TelegramBot
+from tg_outbox import PRIO_INFO, PRIO_DIGEST
 from trading import JupiterTrader
+from confirm_tracker import UNKNOWN
+from paper import PaperTrader
+from strategies import STRATEGIES, Strategy, StrategyEngine
+import runtime_state
+import replay
 
 # ===== Utils =====
-def _as_int(v, default=0):
-    try:
-        return int(float(str(v).strip().replace("_","").replace(",","").replace("%","")))
-    except Exception:
-        return int(default)
-
-def _as_float(v, default=0.0):
-    try:
-        return float(str(v).strip().replace("_","").replace(",","").replace("%",""))
-    except Exception:
-        return float(default)
-
-def _num(d, *path, default=0.0):
-    cur = d
-    for k in path:
-        if not isinstance(cur, dict) or k not in cur:
-            return float(default)
-        cur = cur[k]
-    try:
-        return float(cur)
-    except Exception:
-        return float(default)
-
-def _best_vol(p: Dict[str, Any]) -> int:
-    vol = p.get("volume") or {}
-    cands = [
-        _as_int(vol.get("m5", 0)), _as_int(vol.get("m15", 0)),
-        _as_int(vol.get("h1", 0)), _as_int(vol.get("h6", 0)),
-        _as_int(vol.get("h24", 0))
-    ]
-    return max(cands) if cands else 0
-
-def _age_minutes(p: Dict[str, Any]) -> int:
-    ts = p.get("pairCreatedAt")
-    try:
-        if ts is None:
-            return 10**9
-        dt = datetime.fromtimestamp(int(ts)/1000.0, tz=timezone.utc)
-        return int((datetime.now(timezone.utc) - dt).total_seconds() // 60)
-    except Exception:
-        return 10**9
-
-def _fmt_pair(p, liq, fdv, vol5, bestv) -> str:
-    base  = (p.get("baseToken") or {}).get("symbol") or "?"
-    quote = (p.get("quoteToken") or {}).get("symbol") or "?"
-    url   = p.get("url") or ""
-    ageM  = _age_minutes(p)
+def _fmt_pair(p: PairSnapshot, liq, fdv, vol5, bestv) -> str:
+    base  = p.base_symbol or "?"
+    quote = p.quote_symbol or "?"
+    url   = p.url
+    ageM  = p.age_minutes()
     return f"• <b>{base}/{quote}</b> | liq ${liq:,.0f} | fdv ${fdv:,.0f} | vol5 {int(vol5):,} | best {bestv:,} | age {ageM}m | {url}"
 
+def _fmt_signal(s: Dict[str, Any]) -> str:
+    src = "+".join(s.get("strategies") or [])
+    if s.get("snap") is not None:
+        row = _fmt_pair(s["snap"], s["liq_usd"], s["fdv"], s["vol5m"], s["best_vol"])
+    else:
+        row = (f"• <b>{s.get('symbol') or '?'}</b> | liq ${float(s.get('liq_usd') or 0):,.0f} | fdv ${float(s.get('fdv') or 0):,.0f}"
+               f" | vol5 {int(float(s.get('vol5m') or 0)):,} | {s.get('address') or ''}")
+    return f"{row} [{src}]" if len(s.get("strategies") or []) > 1 or src != "scanner" else row
+
 # ===== Config =====
+_DEFAULT_SCAN_SOURCES = [
+    "https://api.dexscreener.com/latest/dex/search?q=solana",
+    "https://api.dexscreener.com/latest/dex/search?q=SOL",
+    "https://api.dexscreener.com/latest/dex/search?q=SOL/USDC",
+]
+
 CONFIG: Dict[str, Any] = {
     # Scanner
     "STRAT_CHAIN":       os.getenv("STRAT_CHAIN", "solana").lower(),
@@ -68,13 +57,19 @@ CONFIG: Dict[str, Any] = {
     "STRAT_VOL_BEST_MIN":_as_int(os.getenv("STRAT_VOL_BEST_MIN", "3000")),
     "MAX_AGE_MIN":       _as_int(os.getenv("MAX_AGE_MIN", "360")),
     "STRAT_MAX_ITEMS":   _as_int(os.getenv("STRAT_MAX_ITEMS", "200")),
+    "SCAN_CONCURRENT":   _as_int(os.getenv("SCAN_CONCURRENT", "1"), 1),
+    "SCAN_SOURCES":      [u.strip() for u in os.getenv("DS_SEARCH_URLS", ",".join(_DEFAULT_SCAN_SOURCES)).split(",") if u.strip()],
     "HTTP_TIMEOUT":      _as_int(os.getenv("HTTP_TIMEOUT", "20")),
+    "PRICE_TTL":         _as_float(os.getenv("PRICE_TTL", "5")),
     "SCAN_INTERVAL":     _as_int(os.getenv("SCAN_INTERVAL", "60")),
+    "SCAN_INCREMENTAL":  _as_int(os.getenv("SCAN_INCREMENTAL", "1"), 1),
+    "SCAN_ENGINE":       os.getenv("SCAN_ENGINE", "python").lower(),   # 'python' oder 'numpy'
     # Trading toggles
     "DRY_RUN":           _as_int(os.getenv("DRY_RUN", "0"), 0),
     "AUTO_BUY":          _as_int(os.getenv("AUTO_BUY", "1"), 1),
     "SLIPPAGE_BPS":      _as_int(os.getenv("SLIPPAGE_BPS", "100"), 100),
     "SWAP_TIMEOUT":      _as_int(os.getenv("SWAP_TIMEOUT", "45"), 45),
+    "PREQUOTE_TOP_N":    _as_int(os.getenv("PREQUOTE_TOP_N", "3"), 3),
     # Sizing
     "INVEST_MODE":       os.getenv("INVEST_MODE", "pct").lower(), # 'pct' oder 'fixed'
     "INVEST_PCT":        _as_float(os.getenv("INVEST_PCT", "50")),
@@ -91,6 +86,10 @@ CONFIG: Dict[str, Any] = {
     "BREAKEVEN_AFTER_TP1":   _as_int(os.getenv("BREAKEVEN_AFTER_TP1", "1"), 1),
     "TRAIL_AFTER_TP1_PCT":   _as_float(os.getenv("TRAIL_AFTER_TP1_PCT", "8")),
     "STOP_LOSS_PCT":         _as_float(os.getenv("STOP_LOSS_PCT", "10")),
+    "EXIT_POLL_SEC":         _as_float(os.getenv("EXIT_POLL_SEC", "5")),
+    "PRICE_STREAM":          _as_int(os.getenv("PRICE_STREAM", "0"), 0),
+    "EXIT_RETRIES":          _as_int(os.getenv("EXIT_RETRIES", "3"), 3),
+    "EXIT_WORKERS":          _as_int(os.getenv("EXIT_WORKERS", "4"), 4),
 }
 
 def settings_text() -> str:
@@ -101,10 +100,11 @@ def settings_text() -> str:
         f"• LIQ_MIN: {c['STRAT_LIQ_MIN']:,} | FDV_MAX: {c['STRAT_FDV_MAX']:,}",
         f"• VOL5M_MIN: {c['STRAT_VOL5M_MIN']:,} | VOL_BEST_MIN: {c['STRAT_VOL_BEST_MIN']:,}",
         f"• MAX_AGE_MIN: {c['MAX_AGE_MIN']} | MAX_ITEMS: {c['STRAT_MAX_ITEMS']}",
+        f"• SOURCES: {len(c['SCAN_SOURCES'])} | CONCURRENT: {c['SCAN_CONCURRENT']} | ENGINE: {_scan_engine()}",
         f"• DRY_RUN: {c['DRY_RUN']} | AUTO_BUY: {c['AUTO_BUY']} | SLIPPAGE: {c['SLIPPAGE_BPS']} bps | TIMEOUT: {c['SWAP_TIMEOUT']}s",
         f"• INVEST: {c['INVEST_MODE']} | PCT: {c['INVEST_PCT']}% | RES: {c['RESERVE_SOL']} | MIN/MAX: {c['MIN_BUY_SOL']}/{c['MAX_BUY_SOL']}",
         f"• TP: {c['TP_PCT']}% | PARTIAL: {c['PARTIAL_ENABLED']} (TP1 {c['TP1_PCT']}%/{c['TP1_SELL_PCT']}% | TP2 {c['TP2_PCT']}%/{c['TP2_SELL_PCT']}%)",
-        f"• BE_after_TP1: {c['BREAKEVEN_AFTER_TP1']} | TRAIL_after_TP1: {c['TRAIL_AFTER_TP1_PCT']}% | SL: {c['STOP_LOSS_PCT']}%",
+        f"• BE_after_TP1: {c['BREAKEVEN_AFTER_TP1']} | TRAIL_after_TP1: {c['TRAIL_AFTER_TP1_PCT']}% | SL: {c['STOP_LOSS_PCT']}% | EXIT_POLL: {c['EXIT_POLL_SEC']}s",
         f"• INTERVAL: {c['SCAN_INTERVAL']}s | TIMEOUT: {c['HTTP_TIMEOUT']}s",
     ]
     return "\n".join(lines)
@@ -128,64 +128,162 @@ def start_telegram():
         on_button=_on_button,
     )
     tg.start()
-    tg.safe_broadcast("🚀 NeoAutoSniper boot OK.\n" + settings_text(), parse_mode="HTML")
+    tg.safe_broadcast("🚀 NeoAutoSniper boot OK.\n" + settings_text(), parse_mode="HTML", priority=PRIO_INFO)
 
 # ===== Trading / Wallet =====
 trader = JupiterTrader()
 
+# DRY_RUN: simulierte Fills (Impact, Slippage, Fees, Latenz) statt nur Buchung zum DexScreener-Preis
+PAPER_TRADING = _as_int(os.getenv("PAPER_TRADING", "1"), 1)
+_paper: Optional[PaperTrader] = (
+    PaperTrader(price=lambda m: ds_price_native_sol(m), depth=lambda m: _pool_depth_sol(m))
+    if PAPER_TRADING == 1 else None
+)
+
+def _trader():
+    # /dryrun schaltet zur Laufzeit um
+    return _paper if (CONFIG["DRY_RUN"] == 1 and _paper is not None) else trader
+
 # ===== Positions-Store =====
-PORT_PATH = "positions.json"
-_lock = threading.Lock()
+PORT_PATH = os.getenv("POSITIONS_PATH", "positions.json")
+POSITIONS_BACKEND = os.getenv("POSITIONS_BACKEND", "json").lower()   # 'json' oder 'sqlite'
+_FSYNC = os.getenv("POSITIONS_FSYNC", "interval").lower()
+
+def _make_position_store():
+    if POSITIONS_BACKEND == "sqlite":
+        return SqliteStore(os.getenv("POSITIONS_DB", "positions.db"), fsync=_FSYNC, import_json=PORT_PATH)
+    return JsonFileStore(PORT_PATH, fsync=_FSYNC, fsync_interval=_as_float(os.getenv("POSITIONS_FSYNC_SEC", "5"), 5.0))
+
+_book = PositionBook(
+    _make_position_store(),
+    flush_interval=_as_float(os.getenv("POSITIONS_FLUSH_MS", "500"), 500.0) / 1000.0,
+)
 
 def _load_positions() -> List[Dict[str, Any]]:
-    try:
-        with open(PORT_PATH, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return []
+    return _book.list()
 
 def _save_positions(items: List[Dict[str, Any]]):
-    try:
-        with open(PORT_PATH, "w", encoding="utf-8") as f:
-            json.dump(items, f, ensure_ascii=False, indent=2)
-    except Exception:
-        pass
+    _book.replace_all(items)
+
+# Laufende Käufe: mint -> Position (vor dem Senden reserviert, landet erst nach Bestätigung im Buch)
+_pending_buys: Dict[str, Dict[str, Any]] = {}
+_tx_lock = threading.Lock()
 
 def _has_position(mint: str) -> bool:
-    with _lock:
-        return any(p.get("mint")==mint for p in _load_positions())
+    return _book.has(mint) or mint in _pending_buys
 
 def _add_position(pos: Dict[str, Any]):
-    with _lock:
-        items = _load_positions()
-        items.append(pos)
-        _save_positions(items)
+    _book.add(pos)
+    trader.balances.watch(pos["mint"])
+    _exits.track(pos)
+    if _stream: _stream.watch(pos["mint"])
+    _exit_wake.set()
 
 def _update_position(mint: str, updates: Dict[str, Any]):
-    with _lock:
-        items = _load_positions()
-        for p in items:
-            if p.get("mint")==mint:
-                p.update(updates)
-        _save_positions(items)
+    _book.update(mint, updates)
 
 def _remove_position(mint: str):
-    with _lock:
-        items = [p for p in _load_positions() if p.get("mint")!=mint]
-        _save_positions(items)
+    _book.remove(mint)
+    trader.balances.unwatch(mint)
+    _exits.untrack(mint)
+    if _stream: _stream.unwatch(mint)
+
+def _record_event(mint: str, kind: str, **fields):
+    _book.record_event(mint, kind, **fields)
+
+def _cached_token_raw(t, mint: str) -> int:
+    # Bestand aus dem Balance-Cache ohne RPC (0, wenn nichts gecacht ist)
+    ent = t.balances.get_token(mint, float("inf"))
+    return ent[0] if ent else 0
+
+def _landed_by_balance(t, mint: str, before: int, bought: bool) -> bool:
+    # Ausgang einer TX offen (Timeout ohne Befund): am frischen Token-Bestand ablesen, ob sie gelandet ist
+    try:
+        now, _ = t.get_token_raw(mint, max_age=0)
+    except Exception as e:
+        print(f"[TX] Bestand {mint[:6]}… nicht lesbar: {e}")
+        return False
+    return now > before if bought else now < before
+
+def _pnl_text() -> str:
+    store = _book.store
+    if not hasattr(store, "pnl_summary"):
+        return "PnL-Historie nur mit POSITIONS_BACKEND=sqlite."
+    s = store.pnl_summary()
+    lines = [
+        "<b>PnL (realisiert, geschätzt)</b>",
+        f"• Geschlossen: {s['closed']} | Gewinner: {s['wins']} | Verlierer: {s['losses']}",
+        f"• PnL: {s['pnl_sol']:+.6f} SOL bei {s['cost_sol']:.6f} SOL Einsatz",
+    ]
+    # Paper-/Dry-Run-Trades getrennt, nie mit Live vermischt
+    for mode, m in sorted(s["by_mode"].items()):
+        if mode != "live":
+            lines.append(f"• {mode}: {m['closed']} Trades ({m['wins']}/{m['losses']}) | PnL {m['pnl_sol']:+.6f} SOL bei {m['cost_sol']:.6f} SOL")
+    for e in store.history(limit=10):
+        ts = datetime.fromtimestamp(e["ts"], tz=timezone.utc).strftime("%m-%d %H:%M")
+        tag = f" [{e['note']}]" if e.get("note") else ""
+        lines.append(f"• {ts} {e['kind']} {e['mint'][:6]}… {e.get('pct') or 0:.0f}% | {e.get('sol') or 0:.6f} SOL{tag}")
+    return "\n".join(lines)
 
 def _list_positions_text() -> str:
     items = _load_positions()
     if not items:
         return "Keine offenen Positionen."
+    snap = ds_prices([p["mint"] for p in items])
     lines = ["<b>Offene Positionen</b>"]
     for p in items:
+        entry = float(p.get("entry_price_sol", 0) or 0)
+        now = snap.get(p["mint"])
+        chg = f" | now={now:.10f} ({(now/entry - 1.0)*100.0:+.2f}%)" if (now and entry > 0) else ""
         lines.append(
             f"• {p.get('symbol','?')} ({p['mint'][:6]}…): "
-            f"entry={p.get('entry_price_sol',0):.10f} SOL | tp1={p.get('tp1_hit',False)} | qty≈{p.get('qty_est',0):.6f}"
+            f"entry={entry:.10f} SOL{chg} | tp1={p.get('tp1_hit',False)} | qty≈{p.get('qty_est',0):.6f}"
         )
     return "\n".join(lines)
 
+def _stats_text() -> str:
+    ps = _prices.stats()
+    es = _exits.stats()
+    xs = _exit_exec.stats()
+    qs = trader.quotes.stats()
+    cs = _trader().tracker.stats()
+    bs = trader.balances.stats()
+    rpc_lines = [
+        f"• RPC {r['url'][:40]}: {'ok' if r['healthy'] else 'Cooldown'} | "
+        f"{(str(round(r['ewma_ms'])) + ' ms') if r['ewma_ms'] is not None else '—'} | "
+        f"Fehler {r['errors']}/{r['calls']} | zuerst bestätigt {r['first_status']}"
+        for r in trader.rpc.stats()
+    ]
+    bal_age = f"{bs['sol_age']:.1f}s" if bs["sol_age"] is not None else "—"
+    ats = trader.atas.stats()
+    tick_age = f"{es['last_tick_age']:.1f}s" if es["last_tick_age"] is not None else "—"
+    lines = [
+        "<b>Stats</b>",
+        f"• Preis-Cache: {ps['size']}/{ps['max_size']} | TTL {ps['ttl']:.1f}s | hits {ps['hits']} | miss {ps['misses']} | shared {ps['shared']} | evict {ps['evictions']}",
+        f"• Hit-Rate: {ps['hit_rate']*100:.1f}% | Ø Alter Hit {ps['avg_hit_age']:.2f}s | max Alter {ps['max_age']:.1f}s",
+        f"• Quotes: {qs['size']} warm | hits {qs['hits']} | miss {qs['misses']} (abgelaufen {qs['expired']}) | abgewartet {qs['waited']} | Hit-Rate {qs['hit_rate']*100:.1f}% | Ø Alter {qs['avg_age']:.2f}s | max {qs['max_age']:.2f}s",
+        f"• ATA-Cache: {ats['known']} bekannt | hits {ats['hits']} | miss {ats['misses']} | geprüft {ats['checked']} | angelegt {ats['created']}",
+        f"• TX-Bestätigung: offen {cs['pending']} (Käufe {len(_pending_buys)}) | ok {cs['confirmed']} | fehlgeschl. {cs['failed']} | abgelaufen {cs['timeouts']} | unbekannt {cs['unknown']} | Ø {cs['avg_confirm_s']:.1f}s",
+        f"• Balances: SOL-Alter {bal_age} | Token {bs['tokens']}/{bs['watched']} beobachtet | TTL {bs['ttl']:.0f}s | Hit-Rate {bs['hit_rate']*100:.1f}% | invalidiert {bs['invalidations']} | Refresh {bs['refreshes']}",
+        f"• Exit-Engine: {es['tracked']} Pos. | Ticks {es['ticks']} | ausgewertet {es['evaluated']} | gefeuert {es['fired']} | letzter Tick {tick_age}",
+        f"• Exit-Ausführung: {xs['workers']} Worker | laufend {xs['in_flight']} | Queue {xs['queued']} | zurückgestellt {xs['deferred']} | Ø Wartezeit {xs['avg_wait']*1000:.0f} ms | max {xs['max_wait']*1000:.0f} ms",
+    ] + rpc_lines
+    if _paper and CONFIG["DRY_RUN"] == 1:
+        pp = _paper.stats()
+        lines.append(f"• Paper: {pp['sol']:.4f} SOL | {pp['holdings']} Bestände | Fills {pp['fills']} | Slippage-Abbrüche {pp['slippage_fails']} | Fees {pp['fees_sol']:.5f} SOL | Ø Impact {pp['avg_impact_bps']:.0f} bps")
+    if tg:
+        ob = tg.outbox.stats()
+        ds = tg.dispatch_stats()
+        lines.append(f"• Telegram-Outbox: Queue {'/'.join(str(n) for n in ob['queued'])} | gesendet {ob['sent']} | zusammengefasst {ob['merged']} | ersetzt {ob['replaced']} | verworfen {ob['dropped']} | 429 {ob['rate_limited']}")
+        lines.append(f"• Befehle: laufend {ds['in_flight']} | gesamt {ds['dispatched']} | Fehler {ds['failed']}")
+    if _stream:
+        ss = _stream.stats()
+        lines.append(f"• Stream: {'verbunden' if ss['connected'] else 'getrennt'} | {ss['streams']} Pools | {ss['unsupported']} nur Polling | Ticks {ss['ticks']} | Reconnects {ss['reconnects']}")
+    if _rec:
+        rs = _rec.stats()
+        lines.append(f"• Aufzeichnung: {rs['records']} Records | {rs['segments']} Segmente | Queue {rs['queued']} | verworfen {rs['dropped']}")
+    return "\n".join(lines)
+
 # ===== DexScreener =====
 def ds_pairs_for_mint(mint: str) -> List[Dict[str, Any]]:
     try:
@@ -197,29 +295,48 @@ def ds_pairs_for_mint(mint: str) -> List[Dict[str, Any]]:
     except Exception:
         return []
 
+# optionale Aufzeichnung von Scans und Preisen für replay.py (RECORD_DIR)
+_rec = replay.recorder_from_env()
+
+_oracle = PriceOracle(chain="solana", timeout=CONFIG["HTTP_TIMEOUT"])
+
+def ds_price_snapshot(mints: List[str]) -> PriceSnapshot:
+    snap = _oracle.fetch(mints, timeout=CONFIG["HTTP_TIMEOUT"])
+    if _rec: _rec.prices(snap.prices)
+    return snap
+
+# Gemeinsamer Preis-Cache für Buy-Sizing, Exit-Engine und /positions
+_prices = PriceCache(
+    lambda mints: ds_price_snapshot(mints).prices,
+    ttl=CONFIG["PRICE_TTL"],
+    max_size=_as_int(os.getenv("PRICE_CACHE_SIZE", "2048"), 2048),
+)
+
+def _pool_depth_sol(mint: str) -> Optional[float]:
+    # SOL-Seite des liquidesten SOL-Pools: liquidity.usd / 2 in SOL (über priceUsd/priceNative)
+    best = None
+    for p in ds_pairs_for_mint(mint):
+        if ((p.get("quoteToken") or {}).get("symbol") or "").upper() != "SOL":
+            continue
+        if best is None or _num(p, "liquidity", "usd") > _num(best, "liquidity", "usd"):
+            best = p
+    if not best:
+        return None
+    native, usd = _num(best, "priceNative"), _num(best, "priceUsd")
+    if native <= 0 or usd <= 0:
+        return None
+    return _num(best, "liquidity", "usd") / 2.0 / (usd / native)
+
 def ds_price_native_sol(mint: str) -> Optional[float]:
-    pairs = ds_pairs_for_mint(mint)
-    # bevorzugt SOL-Quote
-    for p in pairs:
-        q = ((p.get("quoteToken") or {}).get("symbol") or "").upper()
-        if q == "SOL":
-            pr = p.get("priceNative")
-            try:
-                return float(pr)
-            except Exception:
-                pass
-    # fallback: erster Pair
-    if pairs:
-        pr = pairs[0].get("priceNative")
-        try:
-            return float(pr)
-        except Exception:
-            return None
-    return None
+    return _prices.get(mint, max_age=CONFIG["PRICE_TTL"])
+
+def ds_prices(mints: List[str]) -> PriceSnapshot:
+    return _prices.get_many(mints, max_age=CONFIG["PRICE_TTL"])
 
 # ===== Invest-Sizing =====
-def compute_invest_amount_sol() -> float:
-    bal = trader.get_sol_balance()
+def compute_invest_amount_sol(bal: Optional[float] = None) -> float:
+    if bal is None:
+        bal = _trader().get_sol_balance()
     avail = max(0.0, bal - CONFIG["RESERVE_SOL"])
     if CONFIG["INVEST_MODE"] == "pct":
         amt = avail * (CONFIG["INVEST_PCT"]/100.0)
@@ -237,7 +354,7 @@ def _on_button(chat_id: int, text: str):
     elif t == "settings":
         tg.safe_send(chat_id, settings_text(), parse_mode="HTML")
     elif t == "wallet":
-        tg.safe_send(chat_id, trader.describe_wallet(), parse_mode="HTML", disable_web_page_preview=True)
+        tg.safe_send(chat_id, _trader().describe_wallet(), parse_mode="HTML", disable_web_page_preview=True)
     elif t == "fund":
         addr = trader.public_key or "—"
         tg.safe_send(chat_id, f"Einzahlungs-Adresse (SOL): <code>{addr}</code>", parse_mode="HTML")
@@ -264,7 +381,7 @@ def _on_command(chat_id: int, cmd: str, args: List[str]):
             "• /dryrun on|off | /interval <sec>\n"
             "• /buy <MINT> [AMOUNT_SOL]\n"
             "• /sell <MINT> <PCT>\n"
-            "• /positions\n"
+            "• /positions | /stats | /scanstats | /pnl\n"
         )
         return
 
@@ -272,6 +389,18 @@ def _on_command(chat_id: int, cmd: str, args: List[str]):
         tg.safe_send(chat_id, _list_positions_text(), parse_mode="HTML")
         return
 
+    if c == "/pnl":
+        tg.safe_send(chat_id, _pnl_text(), parse_mode="HTML")
+        return
+
+    if c == "/scanstats":
+        tg.safe_send(chat_id, _scanstats_text(), parse_mode="HTML")
+        return
+
+    if c == "/stats":
+        tg.safe_send(chat_id, _stats_text(), parse_mode="HTML")
+        return
+
     if c == "/set" and len(args) >= 2:
         k, v = args[0].lower(), args[1]
         try:
@@ -328,21 +457,29 @@ def _on_command(chat_id: int, cmd: str, args: List[str]):
     if c == "/sell" and len(args) >= 2:
         mint = args[0]
         pct = _as_float(args[1], 0.0)
-        _handle_sell(mint, pct, chat_id)
+        if not _exit_exec.acquire(mint):
+            tg.safe_send(chat_id, f"⏳ Für {mint[:6]}… läuft bereits ein Verkauf.")
+            return
+        try:
+            _handle_sell(mint, pct, chat_id, on_done=lambda ok, err: _exit_exec.release(mint))
+        except Exception:
+            _exit_exec.release(mint)
+            raise
         return
 
     tg.safe_send(chat_id, "Unbekannter Befehl. /help")
 
 # ===== BUY / SELL =====
 def _handle_buy(mint: str, chat_id: Optional[int] = None, amount_override: Optional[float] = None, symbol_hint: Optional[str] = None):
-    # Amount bestimmen
+    # Amount bestimmen (eine Balance-Abfrage für Sizing und Reserve, aus dem Cache)
+    t = _trader()
+    bal = t.get_sol_balance()
     if amount_override is not None and amount_override > 0:
         invest_sol = amount_override
     else:
-        invest_sol = compute_invest_amount_sol()
+        invest_sol = compute_invest_amount_sol(bal)
 
     # Reserve prüfen
-    bal = trader.get_sol_balance()
     if bal - invest_sol < CONFIG["RESERVE_SOL"]:
         if tg and chat_id: tg.safe_send(chat_id, f"⚠️ Zu wenig SOL nach Reserve. Balance={bal:.4f} SOL, Reserve={CONFIG['RESERVE_SOL']}, Buy={invest_sol:.4f}")
         return
@@ -356,16 +493,6 @@ def _handle_buy(mint: str, chat_id: Optional[int] = None, amount_override: Optio
     symbol = symbol_hint or mint[:6]
     qty_est = (invest_sol / price) if price > 0 else 0.0
 
-    if CONFIG["DRY_RUN"] == 1:
-        msg = f"🧪 DRY_RUN – BUY {invest_sol:.6f} SOL -> {symbol} ({mint[:6]}…), entry≈{price:.10f} SOL, qty≈{qty_est:.6f}"
-        if tg and chat_id: tg.safe_send(chat_id, msg, disable_web_page_preview=True)
-    else:
-        # Slippage/Timeout live in Trader übernehmen
-        trader.slippage_bps = CONFIG["SLIPPAGE_BPS"]
-        trader.swap_timeout = CONFIG["SWAP_TIMEOUT"]
-        res = trader.buy_with_sol(mint, invest_sol)
-        if tg and chat_id: tg.safe_send(chat_id, res, disable_web_page_preview=True)
-
     pos = {
         "mint": mint, "symbol": symbol,
         "entry_price_sol": price, "qty_est": qty_est,
@@ -373,83 +500,225 @@ def _handle_buy(mint: str, chat_id: Optional[int] = None, amount_override: Optio
         "high_after_tp1": 0.0, "stop_price": 0.0,
         "opened_at": int(time.time()),
     }
+
+    if CONFIG["DRY_RUN"] == 1 and _paper is None:
+        msg = f"🧪 DRY_RUN – BUY {invest_sol:.6f} SOL -> {symbol} ({mint[:6]}…), entry≈{price:.10f} SOL, qty≈{qty_est:.6f}"
+        if tg and chat_id: tg.safe_send(chat_id, msg, disable_web_page_preview=True)
+        _open_position(pos, invest_sol, chat_id, note="dry_run")
+        return
+
+    # Slippage/Timeout live in Trader übernehmen
+    t.slippage_bps = CONFIG["SLIPPAGE_BPS"]
+    t.swap_timeout = CONFIG["SWAP_TIMEOUT"]
+
+    held_before = _cached_token_raw(t, mint)
+
+    def done(sig: str, ok: bool, err: Optional[str]):
+        if err == UNKNOWN:
+            ok = _landed_by_balance(t, mint, held_before, bought=True)
+            print(f"[BUY] {symbol} ({mint[:6]}…) Status unbekannt – laut Bestand {'gelandet' if ok else 'nicht gelandet'}")
+        with _tx_lock:
+            p = _pending_buys.pop(mint, None)
+        if p is None:
+            return
+        if ok:
+            f = t.fill(sig)
+            if f:
+                # Paper: tatsächlicher Fill statt DexScreener-Preis
+                p["entry_price_sol"], p["qty_est"] = f["price"], f["qty"]
+            _open_position(p, invest_sol, chat_id, tx=sig, note="paper" if t is _paper else None)
+        else:
+            print(f"[BUY] {symbol} ({mint[:6]}…) fehlgeschlagen: {err}")
+            if tg and chat_id: tg.safe_send(chat_id, f"❌ BUY {symbol} ({mint[:6]}…) nicht bestätigt: {err}")
+
+    # Mint vor dem Senden reservieren (prüfen + eintragen atomar): ein zweiter Kauf derselben Mint
+    # (/buy parallel zum Auto-Buy) wird abgelehnt; der Lock deckt nur die Dict-Operationen ab
+    with _tx_lock:
+        busy = mint in _pending_buys
+        if not busy:
+            _pending_buys[mint] = pos
+    if busy:
+        if tg and chat_id: tg.safe_send(chat_id, f"⏳ Für {mint[:6]}… läuft bereits ein Kauf.")
+        return
+    try:
+        sig, res = t.submit_buy(mint, invest_sol, on_done=done)
+    except Exception:
+        with _tx_lock:
+            _pending_buys.pop(mint, None)
+        raise
+    if not sig:
+        with _tx_lock:
+            _pending_buys.pop(mint, None)
+    if tg and chat_id: tg.safe_send(chat_id, res, disable_web_page_preview=True)
+
+def _open_position(pos: Dict[str, Any], invest_sol: float, chat_id: Optional[int] = None,
+                   tx: Optional[str] = None, note: Optional[str] = None):
     _add_position(pos)
+    _record_event(pos["mint"], "BUY", pct=100.0, price_sol=pos["entry_price_sol"], sol=invest_sol, tx=tx, note=note)
     if tg and chat_id:
-        tg.safe_send(chat_id, f"📌 Position angelegt: {symbol} ({mint[:6]}…), entry≈{price:.10f} SOL", parse_mode="HTML")
-
-def _handle_sell(mint: str, pct: float, chat_id: Optional[int] = None):
+        tg.safe_send(chat_id, f"📌 Position angelegt: {pos['symbol']} ({pos['mint'][:6]}…), entry≈{pos['entry_price_sol']:.10f} SOL", parse_mode="HTML")
+
+def _ledger_sell(mint: str, pct: float, kind: str, note: Optional[str] = None, tx: Optional[str] = None,
+                 fill: Optional[Dict[str, Any]] = None):
+    # Erlös schätzen (Restmenge * Anteil * aktueller Preis) und Restmenge fortschreiben; Paper: echter Fill
+    pos = _book.get(mint) or {}
+    qty = float(pos.get("qty_est", 0.0) or 0.0)
+    sold = qty * min(pct, 100.0) / 100.0
+    if fill:
+        sold, price, sol = fill["qty"], fill["price"], fill["sol"]
+    else:
+        price = ds_price_native_sol(mint) or 0.0
+        sol = sold * price
+    _record_event(mint, kind, pct=pct, price_sol=price, sol=sol, tx=tx, note=note)
+    if pos and pct < 99.9:
+        _update_position(mint, {"qty_est": max(0.0, qty - sold)})
+
+def _handle_sell(mint: str, pct: float, chat_id: Optional[int] = None, kind: str = "SELL",
+                 on_done: Optional[Callable[[bool, Optional[str]], None]] = None):
+    # Live: kehrt nach dem Senden zurück; Ledger/Position werden erst bei Bestätigung fortgeschrieben
     if pct <= 0:
         if tg and chat_id: tg.safe_send(chat_id, "⚠️ Prozent muss > 0 sein.")
+        if on_done: on_done(False, "pct <= 0")
         return
-    if CONFIG["DRY_RUN"] == 1:
+    if CONFIG["DRY_RUN"] == 1 and _paper is None:
+        _ledger_sell(mint, pct, kind, note="dry_run")
         if tg and chat_id: tg.safe_send(chat_id, f"🧪 DRY_RUN SELL {pct:.2f}% {mint[:6]}…")
+        if on_done: on_done(True, None)
         return
-    trader.slippage_bps = CONFIG["SLIPPAGE_BPS"]
-    trader.swap_timeout = CONFIG["SWAP_TIMEOUT"]
-    res = trader.sell_to_sol(mint, pct)
+    t = _trader()
+    t.slippage_bps = CONFIG["SLIPPAGE_BPS"]
+    t.swap_timeout = CONFIG["SWAP_TIMEOUT"]
+    try:
+        held_before = t.get_token_raw(mint)[0]   # liest submit_sell ohnehin (danach aus dem Cache)
+    except Exception:
+        held_before = 0
+
+    def done(sig: str, ok: bool, err: Optional[str]):
+        if err == UNKNOWN:
+            # nicht blind wiederholen: ein später gelandeter Verkauf würde sonst doppelt verkaufen
+            ok = held_before > 0 and _landed_by_balance(t, mint, held_before, bought=False)
+            print(f"[SELL] {kind} {mint[:6]}… Status unbekannt – laut Bestand {'gelandet' if ok else 'nicht gelandet'}")
+            err = None if ok else err
+        if ok:
+            _ledger_sell(mint, pct, kind, tx=sig, fill=t.fill(sig), note="paper" if t is _paper else None)
+            if pct >= 99.9:
+                _remove_position(mint)
+            if tg and chat_id: tg.safe_send(chat_id, f"✅ SELL {pct:.2f}% {mint[:6]}… bestätigt")
+        else:
+            print(f"[SELL] {kind} {mint[:6]}… fehlgeschlagen: {err}")
+            if tg and chat_id: tg.safe_send(chat_id, f"❌ SELL {pct:.2f}% {mint[:6]}… nicht bestätigt: {err}")
+        if on_done: on_done(ok, err)
+
+    sig, res = t.submit_sell(mint, pct, on_done=done)
     if tg and chat_id: tg.safe_send(chat_id, res, disable_web_page_preview=True)
-    if pct >= 99.9:
-        _remove_position(mint)
+    if sig is None and on_done:
+        on_done(False, res.splitlines()[0] if res else None)
 
 # ===== Scan / Filter =====
+_scan_pool = ThreadPoolExecutor(max_workers=max(1, _as_int(os.getenv("SCAN_WORKERS", "8"), 8)), thread_name_prefix="scan")
+
 def _http_get(url: str, params=None, timeout=15):
     try:
-        return requests.get(url, params=params or {}, timeout=timeout)
+        return get_session("dexscreener").get(url, params=params or {}, timeout=timeout)
+    except Exception:
+        return None
+
+def _fetch_source(url: str, timeout: int, cancel: threading.Event, scan_id: Optional[int] = None) -> Optional[List[Dict[str, Any]]]:
+    # Streamt den Body, damit ein abgebrochener Scan laufende Downloads wirklich beendet
+    if cancel.is_set():
+        return None
+    try:
+        r = get_session("dexscreener").get(url, timeout=timeout, stream=True)
     except Exception:
+        print(f"[SCAN] {url} -> ERR")
+        return None
+    try:
+        if r.status_code != 200:
+            print(f"[SCAN] {url} -> {r.status_code}")
+            return None
+        buf = bytearray()
+        for chunk in r.iter_content(chunk_size=64 * 1024):
+            if cancel.is_set():
+                return None
+            buf += chunk
+        if _rec: _rec.scan(url, bytes(buf), scan_id)
+        return parse_pairs(bytes(buf))
+    except Exception as e:
+        print(f"[SCAN] {url} -> ERR {e}")
         return None
+    finally:
+        r.close()
 
-def fetch_pairs() -> List[Dict[str, Any]]:
+def fetch_pairs() -> List[PairSnapshot]:
     timeout = CONFIG["HTTP_TIMEOUT"]
-    urls = [
-        "https://api.dexscreener.com/latest/dex/search?q=solana",
-        "https://api.dexscreener.com/latest/dex/search?q=SOL",
-        "https://api.dexscreener.com/latest/dex/search?q=SOL/USDC",
-    ]
+    urls = list(CONFIG["SCAN_SOURCES"])
+    max_items = CONFIG["STRAT_MAX_ITEMS"]
     uniq = {}
     raw_count = 0
-    for url in urls:
-        r = _http_get(url, timeout=timeout)
-        if not r or r.status_code != 200:
-            print(f"[SCAN] {url} -> {r.status_code if r else 'ERR'}")
-            continue
-        arr = (r.json() or {}).get("pairs") or []
+    scan_id = _rec.next_scan_id() if _rec else None
+
+    def _merge(arr: List[Dict[str, Any]]):
+        # Roh-Dicts werden hier einmal in PairSnapshots überführt und danach verworfen
+        nonlocal raw_count
         raw_count += len(arr)
         for p in arr:
             pid = p.get("pairAddress") or p.get("url")
             if pid and pid not in uniq:
-                uniq[pid] = p
-        time.sleep(0.2)
-        if len(uniq) >= CONFIG["STRAT_MAX_ITEMS"]:
-            break
+                uniq[pid] = PairSnapshot.from_pair(p)
+
+    if CONFIG["SCAN_CONCURRENT"] == 1 and len(urls) > 1:
+        # Alle Quellen gleichzeitig, Merge in Ankunftsreihenfolge, Rest bei MAX_ITEMS abbrechen
+        cancel = threading.Event()
+        futs = [_scan_pool.submit(_fetch_source, u, timeout, cancel, scan_id) for u in urls]
+        try:
+            for f in as_completed(futs):
+                arr = f.result()
+                if arr:
+                    _merge(arr)
+                if len(uniq) >= max_items:
+                    break
+        finally:
+            cancel.set()
+            for f in futs:
+                f.cancel()
+    else:
+        for url in urls:
+            r = _http_get(url, timeout=timeout)
+            if not r or r.status_code != 200:
+                print(f"[SCAN] {url} -> {r.status_code if r else 'ERR'}")
+                continue
+            if _rec: _rec.scan(url, r.content, scan_id)
+            _merge(parse_pairs(r.content))
+            time.sleep(0.2)
+            if len(uniq) >= max_items:
+                break
     pairs = list(uniq.values())
     print(f"[SCAN] collected {len(pairs)} unique pairs from {raw_count} raw results")
     return pairs
 
-def filter_pairs(pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def filter_pairs(pairs: List[PairSnapshot]) -> List[PairSnapshot]:
     chain = CONFIG["STRAT_CHAIN"]
     strict = CONFIG["STRICT_QUOTE"] == 1
     quote = CONFIG["STRAT_QUOTE"].upper()
 
-    sol = [p for p in pairs if (p.get("chainId") or "").lower() == chain or "/solana/" in (p.get("url") or "").lower()]
+    sol = [p for p in pairs if p.chain_id == chain or p.url_sol]
     print(f"[SCAN] after chain filter: {len(sol)} pairs")
     if strict and quote != "ANY":
-        sol = [p for p in sol if ((p.get("quoteToken") or {}).get("symbol") or "").upper() == quote]
+        sol = [p for p in sol if (p.quote_symbol or "").upper() == quote]
         print(f"[SCAN] after quote filter: {len(sol)} pairs (quote={quote})")
     else:
         print(f"[SCAN] quote filter disabled (STRICT_QUOTE={CONFIG['STRICT_QUOTE']}) -> {len(sol)} pairs")
 
     if CONFIG["MAX_AGE_MIN"] > 0:
-        sol = [p for p in sol if _age_minutes(p) <= CONFIG["MAX_AGE_MIN"]]
+        now_us = _now_us()
+        sol = [p for p in sol if p.age_minutes(now_us) <= CONFIG["MAX_AGE_MIN"]]
         print(f"[SCAN] after age filter: {len(sol)} pairs (≤ {CONFIG['MAX_AGE_MIN']}m)")
     return sol
 
-def apply_strategy(pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+def apply_strategy(pairs: List[PairSnapshot]) -> List[tuple]:
     out = []
     for p in pairs:
-        liq   = _num(p, "liquidity", "usd")
-        fdv   = _num(p, "fdv")
-        vol5  = _num(p, "volume", "m5") or _num(p, "volume", "h5")
-        bestv = _best_vol(p)
+        liq, fdv, vol5, bestv = p.liq, p.fdv, p.vol5, p.best_vol
         if liq < CONFIG["STRAT_LIQ_MIN"]: continue
         if fdv and CONFIG["STRAT_FDV_MAX"] and fdv > CONFIG["STRAT_FDV_MAX"]: continue
         if vol5 < CONFIG["STRAT_VOL5M_MIN"]: continue
@@ -459,71 +728,231 @@ def apply_strategy(pairs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     out.sort(key=lambda t: (-t[1], t[2], -t[4]))
     return out
 
-# ===== Partial-TP Engine (unverändert, nutzt /sell) =====
+# ===== Inkrementeller Scan =====
+_seen = SeenPairIndex(
+    max_size=_as_int(os.getenv("SEEN_MAX", "20000"), 20000),
+    ttl=_as_float(os.getenv("SEEN_TTL", "600"), 600.0),
+    rescore_pct=_as_float(os.getenv("RESCORE_PCT", "5"), 5.0),
+)
+
+def _scan_signature() -> tuple:
+    c = CONFIG
+    return (c["STRAT_CHAIN"], c["STRICT_QUOTE"], c["STRAT_QUOTE"], c["MAX_AGE_MIN"],
+            c["STRAT_LIQ_MIN"], c["STRAT_FDV_MAX"], c["STRAT_VOL5M_MIN"], c["STRAT_VOL_BEST_MIN"])
+
+def _scan_engine() -> str:
+    return "numpy" if (CONFIG["SCAN_ENGINE"] == "numpy" and vector_engine.HAVE_NUMPY) else "python"
+
+def _score_pairs(pairs: List[PairSnapshot]) -> List[tuple]:
+    if _scan_engine() == "numpy":
+        return vector_engine.filter_and_rank(pairs, CONFIG)
+    return apply_strategy(filter_pairs(pairs))
+
+def scan_pairs(raw: List[PairSnapshot]) -> List[tuple]:
+    # filter_pairs + apply_strategy, aber nur für neue/veränderte Pairs; Rest aus dem Index
+    if CONFIG["SCAN_INCREMENTAL"] != 1:
+        return _score_pairs(raw)
+    sig = _scan_signature()
+    fresh, known = _seen.partition(raw, sig)
+    scored = {id(t[0]): t[1:] for t in _score_pairs(fresh)}
+    for p in fresh:
+        _seen.store(p, scored.get(id(p)), sig)
+    max_age = CONFIG["MAX_AGE_MIN"]
+    now_us = _now_us()
+    out = []
+    for p in raw:
+        v = scored.get(id(p))
+        if v is None:
+            v = known.get(p.pid)
+            # Alter wächst: bekannte Treffer müssen den Age-Filter weiter bestehen
+            if v is not None and max_age > 0 and p.age_minutes(now_us) > max_age:
+                v = None
+        if v is not None:
+            out.append((p,) + v)
+    out.sort(key=lambda t: (-t[1], t[2], -t[4]))
+    last = _seen.last
+    print(f"[SCAN] incremental: new={last['new']} rescored={last['rescored']} skipped={last['skipped']} hits={len(out)}")
+    return out
+
+def _scanstats_text() -> str:
+    st = _seen.stats()
+    l, t = st["last"], st["totals"]
+    return "\n".join([
+        "<b>Scan-Index</b>",
+        f"• Modus: {'inkrementell' if CONFIG['SCAN_INCREMENTAL'] == 1 else 'voll'} | Index {st['size']}/{st['max_size']} | TTL {st['ttl']:.0f}s | Rescore ab {st['rescore_pct']}%",
+        f"• Letzter Scan: neu {l['new']} | neu bewertet {l['rescored']} | übersprungen {l['skipped']}",
+        f"• Gesamt ({t['scans']} Scans): neu {t['new']} | neu bewertet {t['rescored']} | übersprungen {t['skipped']} | verdrängt {t['evictions']}",
+    ]) + "\n\n" + _strategies_text()
+
+# ===== Partial-TP Engine (Trigger-Index, Ticks aus Batch-Poll) =====
+_EXIT_MSG = {
+    "SL":    lambda g: f"🛑 SL ausgelöst {g.symbol} {g.change_pct:.2f}%",
+    "TP1":   lambda g: f"✅ TP1 {g.symbol} +{g.change_pct:.2f}% → verkauft {g.pct}%",
+    "TRAIL": lambda g: f"🔻 Trailing-Exit {g.symbol} bei {g.drop_pct:.2f}% unter Hoch",
+    "TP2":   lambda g: f"🎯 TP2 {g.symbol} +{g.change_pct:.2f}% → geschlossen",
+    "TP":    lambda g: f"🎯 TP {g.symbol} +{g.change_pct:.2f}% → geschlossen",
+}
+
+_exit_fails: Dict[str, int] = {}
+
+def _execute_exit(sig: ExitSignal, release: Callable[[], None]):
+    # läuft im Exit-Worker-Pool; release() gibt die Mint nach Bestätigung/Fehlschlag wieder frei
+    if not _book.has(sig.mint):
+        # zurückgestelltes Signal einer inzwischen geschlossenen Position (z. B. nach /sell 100)
+        print(f"[EXIT] {sig.kind} {sig.symbol}: Position bereits geschlossen – Signal verworfen")
+        _exit_fails.pop(sig.mint, None)
+        release()
+        return
+
+    def done(ok: bool, err: Optional[str]):
+        try:
+            _finish_exit(sig, ok, err)
+        finally:
+            release()
+
+    _handle_sell(sig.mint, sig.pct, None, kind=sig.kind, on_done=done)
+
+def _finish_exit(sig: ExitSignal, ok: bool, err: Optional[str]):
+    if not ok:
+        n = _exit_fails.get(sig.mint, 0) + 1
+        _exit_fails[sig.mint] = n
+        if n <= CONFIG["EXIT_RETRIES"]:
+            # Trigger aus dem Buch neu scharf schalten -> nächster Tick versucht es erneut
+            pos = _book.get(sig.mint)
+            if pos: _exits.track(pos)
+            if tg: tg.safe_broadcast(f"⚠️ {sig.kind} {sig.symbol}: Verkauf fehlgeschlagen ({err}) – Versuch {n}/{CONFIG['EXIT_RETRIES']}")
+            return
+        if tg: tg.safe_broadcast(f"❌ {sig.kind} {sig.symbol}: Verkauf {n}x fehlgeschlagen – Position wird ausgebucht")
+    _exit_fails.pop(sig.mint, None)
+    if sig.closes:
+        _remove_position(sig.mint)
+    elif sig.updates:
+        _update_position(sig.mint, sig.updates)
+    if ok and tg: tg.safe_broadcast(_EXIT_MSG[sig.kind](sig))
+
+# Exits parallel (SL/TRAIL vor TPs), höchstens ein laufender Verkauf je Mint
+_exit_exec = ExitExecutor(_execute_exit, workers=CONFIG["EXIT_WORKERS"])
+_exits = ExitEngine(CONFIG, on_signal=_exit_exec.submit, on_update=lambda mint, upd: _book.update(mint, upd))
+_exit_wake = threading.Event()
+
+# ===== Streaming-Preise (RPC-Websocket, optional) =====
+def _resolve_pool(mint: str):
+    # liquidester SOL-Pool des Tokens laut DexScreener -> (pairAddress, dexId)
+    best = None
+    for p in ds_pairs_for_mint(mint):
+        if (p.get("baseToken") or {}).get("address") != mint:
+            continue
+        if ((p.get("quoteToken") or {}).get("symbol") or "").upper() != "SOL":
+            continue
+        if best is None or _num(p, "liquidity", "usd") > _num(best, "liquidity", "usd"):
+            best = p
+    return (best.get("pairAddress"), best.get("dexId")) if best else None
+
+def _on_stream_tick(mint: str, price: float):
+    if _rec: _rec.prices({mint: price})
+    _prices.put(mint, price)
+    _exits.submit({mint: price})
+
+_stream: Optional[StreamingPriceFeed] = (
+    StreamingPriceFeed(trader.rpc_url, resolver=_resolve_pool, on_tick=_on_stream_tick)
+    if CONFIG["PRICE_STREAM"] == 1 else None
+)
+
 def _check_positions_loop():
+    # Liefert nur noch Preis-Ticks; ausgewertet wird im Exit-Engine-Thread
+    _exits.start()
     while True:
         try:
-            items = _load_positions()
-            for p in items:
-                mint = p["mint"]
-                entry = float(p.get("entry_price_sol", 0.0) or 0.0)
-                if entry <= 0:
-                    continue
-                price = ds_price_native_sol(mint)
-                if price is None or price <= 0:
-                    continue
-                change_pct = (price/entry - 1.0) * 100.0
-
-                # SL
-                if CONFIG["STOP_LOSS_PCT"] > 0 and change_pct <= -CONFIG["STOP_LOSS_PCT"]:
-                    _handle_sell(mint, 100.0, None)
-                    _remove_position(mint)
-                    if tg: tg.safe_broadcast(f"🛑 SL ausgelöst {p.get('symbol','?')} {change_pct:.2f}%")
-                    continue
-
-                if CONFIG["PARTIAL_ENABLED"] == 1:
-                    # TP1
-                    if not p.get("tp1_hit", False) and change_pct >= CONFIG["TP1_PCT"]:
-                        frac_pct = max(0.0, min(100.0, CONFIG["TP1_SELL_PCT"]))
-                        _handle_sell(mint, frac_pct, None)
-                        _update_position(mint, {"tp1_hit": True, "high_after_tp1": price})
-                        if CONFIG["BREAKEVEN_AFTER_TP1"] == 1:
-                            _update_position(mint, {"stop_price": entry})
-                        if tg: tg.safe_broadcast(f"✅ TP1 {p.get('symbol','?')} +{change_pct:.2f}% → verkauft {frac_pct}%")
-                        continue
-
-                    # Trailing nach TP1
-                    if p.get("tp1_hit", False):
-                        hi = float(p.get("high_after_tp1", 0.0) or 0.0)
-                        if price > hi:
-                            _update_position(mint, {"high_after_tp1": price})
-                            hi = price
-                        trail = CONFIG["TRAIL_AFTER_TP1_PCT"]
-                        if trail > 0 and hi > 0:
-                            drop_pct = (price/hi - 1.0)*100.0
-                            if drop_pct <= -trail:
-                                _handle_sell(mint, 100.0, None)
-                                _remove_position(mint)
-                                if tg: tg.safe_broadcast(f"🔻 Trailing-Exit {p.get('symbol','?')} bei {drop_pct:.2f}% unter Hoch")
-                                continue
-
-                    # TP2 (Rest)
-                    if p.get("tp1_hit", False) and change_pct >= CONFIG["TP2_PCT"]:
-                        frac_pct = max(0.0, min(100.0, CONFIG["TP2_SELL_PCT"]))
-                        _handle_sell(mint, frac_pct, None)
-                        _remove_position(mint)
-                        if tg: tg.safe_broadcast(f"🎯 TP2 {p.get('symbol','?')} +{change_pct:.2f}% → geschlossen")
-                        continue
-                else:
-                    if CONFIG["TP_PCT"] > 0 and change_pct >= CONFIG["TP_PCT"]:
-                        _handle_sell(mint, 100.0, None)
-                        _remove_position(mint)
-                        if tg: tg.safe_broadcast(f"🎯 TP {p.get('symbol','?')} +{change_pct:.2f}% → geschlossen")
-
+            mints = _exits.mints()
+            if mints:
+                _exits.submit(_prices.get_many(mints, max_age=min(CONFIG["PRICE_TTL"], CONFIG["EXIT_POLL_SEC"])).prices)
         except Exception as e:
             print("[TP-ENGINE] ERR:", e)
-
-        time.sleep(10)
+        _exit_wake.wait(max(0.5, CONFIG["EXIT_POLL_SEC"]))
+        _exit_wake.clear()
+
+def _prepare_candidates(signals: List[Dict[str, Any]]):
+    # Top-N Kandidaten im Hintergrund vorbereiten: ATA-Check (optional anlegen) und Quote,
+    # damit der Buy direkt swappen kann
+    n = CONFIG["PREQUOTE_TOP_N"]
+    if n <= 0 or CONFIG["DRY_RUN"] == 1 or not signals:
+        return
+    mints = [s["address"] for s in signals[:n] if not _has_position(s["address"])]
+    if not mints:
+        return
+    trader.slippage_bps = CONFIG["SLIPPAGE_BPS"]
+    trader.swap_timeout = CONFIG["SWAP_TIMEOUT"]
+    trader.prepare_atas_async(mints)
+    if CONFIG["AUTO_BUY"] == 1:
+        trader.prequote_async(mints, compute_invest_amount_sol())
+
+# ===== Strategien =====
+class ScannerStrategy(Strategy):
+    """Der eingebaute Scanner (fetch_pairs + Filter/Ranking) als registrierte Strategie."""
+    name = "scanner"
+
+    def fetch_candidates(self) -> List[PairSnapshot]:
+        return fetch_pairs()
+
+    def filter_candidates(self, raw: List[PairSnapshot]) -> List[Dict[str, Any]]:
+        return [{
+            "strategy": self.name, "symbol": p.base_symbol or (p.base_address or "")[:6],
+            "address": p.base_address, "pair": p.pair_address,
+            "liq_usd": liq, "fdv": fdv, "vol5m": vol5, "best_vol": bestv,
+            "price": p.price_usd, "source": "dexscreener", "snap": p,
+        } for (p, liq, fdv, vol5, bestv) in scan_pairs(raw) if p.base_address]
+
+def _enabled_strategies(state: Optional[Dict[str, Any]] = None) -> List[str]:
+    # runtime_state "strategies": [...] > STRATEGIES_ENABLED (ENV) > nur der eingebaute Scanner
+    st = state if state is not None else runtime_state.get_state()
+    names = st.get("strategies")
+    if not isinstance(names, list):
+        names = [n.strip() for n in (os.getenv("STRATEGIES_ENABLED") or "scanner").split(",")]
+    return [n.lower() for n in names if n]
+
+def _on_signals(signals: List[Dict[str, Any]]):
+    # läuft nach jedem Strategie-Lauf mit dem zusammengeführten, gerankten Signal-Stream
+    top = signals[:5]
+    _prepare_candidates(signals)
+    if tg:
+        if top:
+            rows = [_fmt_signal(s) for s in top]
+            if CONFIG["DRY_RUN"] == 1: rows.append("\n[MODE] DRY_RUN aktiv – " + ("Paper-Trading." if _paper else "keine Käufe."))
+            tg.safe_broadcast("🎯 Treffer (Top 5):\n" + "\n".join(rows), parse_mode="HTML", disable_web_page_preview=False,
+                              priority=PRIO_DIGEST, key="scan")
+        else:
+            tg.safe_broadcast("✅ [HITS] keine Treffer im aktuellen Scan.", priority=PRIO_DIGEST, key="scan")
+    else:
+        print("[HITS]", len(top))
+
+    # Auto-Buy Top-1
+    if CONFIG["AUTO_BUY"] == 1 and top:
+        s = top[0]
+        mint = s["address"]
+        if mint and not _has_position(mint):
+            _handle_buy(mint, None, None, s.get("symbol") or mint[:6])
+
+_engine = StrategyEngine(_on_signals, max_age=lambda: max(60, 3 * CONFIG["SCAN_INTERVAL"]))
+_engine.add(ScannerStrategy(), interval=lambda: max(5, CONFIG["SCAN_INTERVAL"]),
+            timeout=_as_float(os.getenv("STRAT_SCANNER_TIMEOUT"), 2 * CONFIG["HTTP_TIMEOUT"] + 5))
+for _name, _cls in STRATEGIES.items():
+    _key = _name.upper()
+    _engine.add(_cls(),
+                interval=_as_float(os.getenv(f"STRAT_{_key}_INTERVAL"), 0) or (lambda: max(5, CONFIG["SCAN_INTERVAL"])),
+                timeout=_as_float(os.getenv(f"STRAT_{_key}_TIMEOUT"), CONFIG["HTTP_TIMEOUT"] + 5))
+_engine.set_enabled(_enabled_strategies())
+runtime_state.subscribe(lambda old, new: _engine.set_enabled(_enabled_strategies(new)))
+
+def _strategies_text() -> str:
+    lines = ["<b>Strategien</b>"]
+    for n, st in _engine.stats().items():
+        age = f"{st['last_run_age']:.0f}s" if st["last_run_age"] is not None else "—"
+        lines.append(
+            f"• {n}: {'aktiv' if st['enabled'] else 'aus'} | alle {st['interval']:.0f}s, Timeout {st['timeout']:.0f}s | "
+            f"Läufe {st['runs']} (Fehler {st['errors']}, Timeouts {st['timeouts']}) | "
+            f"Latenz {st['last_latency']:.2f}s (Ø {st['avg_latency']:.2f}s) | Treffer {st['last_hits']} (gesamt {st['hits_total']}) | zuletzt vor {age}"
+        )
+    return "\n".join(lines)
 
 # ===== Main Loop =====
 def main():
@@ -531,45 +960,22 @@ def main():
     print(settings_text())
     start_telegram()
 
+    for p in _load_positions():
+        _exits.track(p)
+        if _stream: _stream.watch(p["mint"])
+    if _stream: _stream.start()
     threading.Thread(target=_check_positions_loop, daemon=True).start()
 
-    last_scan = 0.0
-    while True:
-        try:
-            if _force_scan.is_set():
-                _force_scan.clear()
-                last_scan = 0.0
-            now = time.time()
-            if now - last_scan < max(5, CONFIG["SCAN_INTERVAL"]):
-                time.sleep(1); continue
-            last_scan = now
-
-            raw = fetch_pairs()
-            pool = filter_pairs(raw)
-            hits = apply_strategy(pool)
-            top  = hits[:5]
-
-            if tg:
-                if top:
-                    rows = [_fmt_pair(p, liq, fdv, vol5, bestv) for (p, liq, fdv, vol5, bestv) in top]
-                    if CONFIG["DRY_RUN"] == 1: rows.append("\n[MODE] DRY_RUN aktiv – keine Käufe.")
-                    tg.safe_broadcast("🎯 Treffer (Top 5):\n" + "\n".join(rows), parse_mode="HTML", disable_web_page_preview=False)
-                else:
-                    tg.safe_broadcast("✅ [HITS] keine Treffer im aktuellen Scan.")
-            else:
-                print("[HITS]", len(top))
-
-            # Auto-Buy Top-1
-            if CONFIG["AUTO_BUY"] == 1 and top:
-                p, liq, fdv, vol5, bestv = top[0]
-                mint = (p.get("baseToken") or {}).get("address")
-                symbol = (p.get("baseToken") or {}).get("symbol") or mint[:6]
-                if mint and not _has_position(mint):
-                    _handle_buy(mint, None, None, symbol)
+    # Änderungen an runtime_state.json von außen (z. B. "strategies") ohne Neustart übernehmen
+    runtime_state.start_watcher()
 
-        except Exception as e:
-            print("[ERR]", e)
-            time.sleep(2)
+    # jede aktive Strategie läuft in ihrem eigenen Takt; der Main-Thread reicht nur Refreshes weiter
+    print(f"[STRAT] aktiv: {', '.join(_engine.enabled()) or '—'}")
+    _engine.start()
+    while True:
+        _force_scan.wait()
+        _force_scan.clear()
+        _engine.trigger()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,153 @@
+# confirm_tracker.py — Bestätigung gesendeter Transaktionen im Hintergrund
+# - Signaturen werden eingereiht, ein Thread pollt sie gebündelt per getSignatureStatuses (max. 256 je Call),
+#   über den RpcPool an mehrere Endpoints – die erste Meldung zählt
+# - Callback on_done(sig, ok, err) bei confirmed/finalized, bei Fehler in der TX oder nach Timeout
+# - Nach dem Timeout: letzte Abfrage mit searchTransactionHistory; solange lastValidBlockHeight nicht
+#   überschritten ist, kann die TX noch landen -> weiter verfolgen. Danach err=EXPIRED (sicher nicht
+#   gelandet), ohne bekannte Blockhöhe err=UNKNOWN (Ausgang offen, Aufrufer prüft selbst)
+# - Swaps kehren direkt nach dem Senden zurück; Scan und Exits laufen weiter
+import threading, time
+from typing import Callable, Dict, Any, Optional, List
+
+from rpc_pool import RpcPool
+
+_DONE = ("confirmed", "finalized")
+
+EXPIRED = "expired"   # Blockhash abgelaufen, TX nicht gelandet
+UNKNOWN = "unknown"   # Timeout ohne Befund, TX kann noch gelandet sein
+
+class _Pending:
+    __slots__ = ("sig", "on_done", "deadline", "added", "last_valid")
+
+    def __init__(self, sig: str, on_done: Callable[[str, bool, Optional[str]], None], deadline: float,
+                 last_valid: Optional[int] = None):
+        self.sig = sig
+        self.on_done = on_done
+        self.deadline = deadline
+        self.added = time.time()
+        self.last_valid = last_valid
+
+class ConfirmationTracker:
+    def __init__(self, rpc: RpcPool, poll_interval: float = 0.5, timeout: float = 45.0, batch_size: int = 256):
+        self.rpc = rpc
+        self.poll_interval = float(poll_interval)
+        self.timeout = float(timeout)
+        self.batch_size = max(1, min(256, int(batch_size)))
+        self._lock = threading.Lock()
+        self._pending: Dict[str, _Pending] = {}
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.confirmed = self.failed = self.timeouts = self.unknown = self.polls = 0
+        self._latency_sum = 0.0
+
+    # ---------- Public ----------
+    def track(self, sig: str, on_done: Callable[[str, bool, Optional[str]], None], timeout: Optional[float] = None,
+              last_valid_height: Optional[int] = None):
+        with self._lock:
+            self._pending[sig] = _Pending(sig, on_done, time.time() + (timeout or self.timeout), last_valid_height)
+        self._start()
+        self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._pending),
+                "confirmed": self.confirmed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "unknown": self.unknown,
+                "polls": self.polls,
+                "avg_confirm_s": self._latency_sum / self.confirmed if self.confirmed else 0.0,
+            }
+
+    # ---------- Intern ----------
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tx-confirm", daemon=True)
+                self._thread.start()
+
+    def _statuses(self, sigs: List[str], history: bool = False) -> List[Optional[Dict[str, Any]]]:
+        return self.rpc.signature_statuses(sigs, search_history=history)
+
+    def _block_height(self) -> Optional[int]:
+        try:
+            return int(self.rpc.call("getBlockHeight", [{"commitment": "confirmed"}]))
+        except Exception as e:
+            print(f"[CONFIRM] getBlockHeight ERR: {e}")
+            return None
+
+    def _settle_overdue(self, overdue: List[_Pending], done: List[tuple]):
+        # Blockhöhe vor dem Status holen: ist sie schon über lastValidBlockHeight und die TX
+        # auch in der History nicht zu finden, kann sie nicht mehr landen
+        height = self._block_height() if any(p.last_valid for p in overdue) else None
+        values: List[Optional[Dict[str, Any]]] = [None] * len(overdue)
+        for i in range(0, len(overdue), self.batch_size):
+            chunk = overdue[i:i + self.batch_size]
+            try:
+                values[i:i + len(chunk)] = self._statuses([p.sig for p in chunk], history=True)
+            except Exception as e:
+                print(f"[CONFIRM] getSignatureStatuses (History) ERR: {e}")
+        now = time.time()
+        for p, v in zip(overdue, values):
+            if v and v.get("err") is not None:
+                done.append((p, False, str(v["err"])))
+            elif v and v.get("confirmationStatus") in _DONE:
+                done.append((p, True, None))
+            elif v or (p.last_valid and height is not None and height <= p.last_valid):
+                p.deadline = now + max(2.0, 4 * self.poll_interval)   # kann noch landen
+            elif p.last_valid and height is not None:
+                done.append((p, False, EXPIRED))
+            else:
+                done.append((p, False, UNKNOWN))
+
+    def _run(self):
+        while True:
+            with self._lock:
+                items = list(self._pending.values())
+            if not items:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            done: List[tuple] = []   # (pending, ok, err)
+            overdue: List[_Pending] = []
+            for i in range(0, len(items), self.batch_size):
+                chunk = items[i:i + self.batch_size]
+                try:
+                    values = self._statuses([p.sig for p in chunk])
+                    self.polls += 1
+                except Exception as e:
+                    print(f"[CONFIRM] getSignatureStatuses ERR: {e}")
+                    values = [None] * len(chunk)
+                now = time.time()
+                for p, v in zip(chunk, values):
+                    if v and v.get("err") is not None:
+                        done.append((p, False, str(v["err"])))
+                    elif v and v.get("confirmationStatus") in _DONE:
+                        done.append((p, True, None))
+                    elif now > p.deadline:
+                        overdue.append(p)
+            if overdue:
+                self._settle_overdue(overdue, done)
+            with self._lock:
+                for p, ok, err in done:
+                    self._pending.pop(p.sig, None)
+                    if ok:
+                        self.confirmed += 1
+                        self._latency_sum += time.time() - p.added
+                    elif err == EXPIRED:
+                        self.timeouts += 1
+                    elif err == UNKNOWN:
+                        self.unknown += 1
+                    else:
+                        self.failed += 1
+            for p, ok, err in done:
+                try:
+                    p.on_done(p.sig, ok, err)
+                except Exception as e:
+                    print(f"[CONFIRM] Callback {p.sig[:8]}… ERR: {e}")
+            time.sleep(self.poll_interval)
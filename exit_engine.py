@@ -0,0 +1,330 @@
+# exit_engine.py — Exit-Trigger-Index: ein Preis-Tick wertet nur Positionen aus, deren Trigger er kreuzt
+# - Pro Position absolute Trigger-Preise (SL, TP1, TP2/TP, Trailing-Stop, neues Hoch nach TP1)
+# - Ticks kommen aus Batch-Polls oder einem Stream, Verarbeitung in einem eigenen Thread
+# - Die eigentliche Entscheidung entspricht 1:1 der bisherigen Partial-TP-Logik
+# - ExitExecutor führt Signale parallel aus (begrenzter Pool, SL vor TP, ein Verkauf je Mint)
+import bisect, itertools, queue, threading, time
+from typing import Dict, Any, Optional, List, Callable, NamedTuple
+
+_EPS = 1e-9   # Sicherheitsmarge: Level nur als Vorfilter, Entscheidung über die %-Formeln
+
+_CFG_KEYS = (
+    "STOP_LOSS_PCT", "PARTIAL_ENABLED", "TP1_PCT", "TP1_SELL_PCT", "TP2_PCT",
+    "TP2_SELL_PCT", "BREAKEVEN_AFTER_TP1", "TRAIL_AFTER_TP1_PCT", "TP_PCT",
+)
+
+class ExitSignal(NamedTuple):
+    mint: str
+    symbol: str
+    kind: str           # SL | TP1 | TRAIL | TP2 | TP
+    pct: float          # zu verkaufender Anteil in %
+    price: float
+    change_pct: float   # ggü. Entry
+    drop_pct: float     # ggü. Hoch nach TP1 (nur TRAIL)
+    closes: bool        # Position danach geschlossen
+    updates: Dict[str, Any]
+
+class _Tracked:
+    __slots__ = ("mint", "symbol", "entry", "tp1_hit", "high", "down", "up")
+
+    def __init__(self, pos: Dict[str, Any]):
+        self.mint = pos["mint"]
+        self.symbol = pos.get("symbol", "?")
+        self.entry = float(pos.get("entry_price_sol", 0.0) or 0.0)
+        self.tp1_hit = bool(pos.get("tp1_hit", False))
+        self.high = float(pos.get("high_after_tp1", 0.0) or 0.0)
+        self.down: List[float] = []   # aufsteigend sortiert; feuert bei price <= level
+        self.up: List[float] = []     # aufsteigend sortiert; feuert bei price >= level
+
+    def reindex(self, cfg: Dict[str, Any]):
+        down, up = [], []
+        e = self.entry
+        if cfg["STOP_LOSS_PCT"] > 0:
+            down.append(e * (1.0 - cfg["STOP_LOSS_PCT"] / 100.0))
+        if cfg["PARTIAL_ENABLED"] == 1:
+            if not self.tp1_hit:
+                up.append(e * (1.0 + cfg["TP1_PCT"] / 100.0))
+            else:
+                up.append(e * (1.0 + cfg["TP2_PCT"] / 100.0))
+                if self.high > 0:
+                    up.append(self.high)   # neues Hoch verschiebt den Trailing-Stop
+                    if cfg["TRAIL_AFTER_TP1_PCT"] > 0:
+                        down.append(self.high * (1.0 - cfg["TRAIL_AFTER_TP1_PCT"] / 100.0))
+                else:
+                    up.append(0.0)         # noch kein Hoch bekannt -> nächster Tick setzt es
+        elif cfg["TP_PCT"] > 0:
+            up.append(e * (1.0 + cfg["TP_PCT"] / 100.0))
+        down.sort()
+        up.sort()
+        self.down, self.up = down, up
+
+    def crosses(self, price: float) -> bool:
+        # höchster Down-Trigger >= price  oder  niedrigster Up-Trigger <= price
+        if self.down and bisect.bisect_left(self.down, price * (1.0 - _EPS)) < len(self.down):
+            return True
+        if self.up and bisect.bisect_right(self.up, price * (1.0 + _EPS)) > 0:
+            return True
+        return False
+
+class ExitEngine:
+    """
+    Hält die getrackten Positionen mit ihren Trigger-Leveln und verarbeitet Ticks
+    (mint -> Preis in SOL). on_signal(ExitSignal) führt den Exit aus,
+    on_update(mint, dict) persistiert Zustandsänderungen (neues Hoch).
+    """
+
+    def __init__(self, cfg: Dict[str, Any],
+                 on_signal: Callable[[ExitSignal], None],
+                 on_update: Optional[Callable[[str, Dict[str, Any]], None]] = None):
+        self.cfg = cfg
+        self.on_signal = on_signal
+        self.on_update = on_update
+        self._lock = threading.RLock()
+        self._pos: Dict[str, _Tracked] = {}
+        self._cfg_sig = self._signature()
+        self._ticks: "queue.Queue[Dict[str, float]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self.ticks = self.evaluated = self.fired = 0
+        self.last_tick_at = 0.0
+
+    def _signature(self):
+        return tuple(self.cfg[k] for k in _CFG_KEYS)
+
+    # ---------- Positionen ----------
+    def track(self, pos: Dict[str, Any]):
+        if not pos.get("mint"):
+            return
+        t = _Tracked(pos)
+        if t.entry <= 0:
+            return
+        t.reindex(self.cfg)
+        with self._lock:
+            self._pos[t.mint] = t
+
+    def untrack(self, mint: str):
+        with self._lock:
+            self._pos.pop(mint, None)
+
+    def mints(self) -> List[str]:
+        with self._lock:
+            return list(self._pos)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._pos)
+
+    def _maybe_reindex(self):
+        sig = self._signature()
+        if sig != self._cfg_sig:
+            self._cfg_sig = sig
+            for t in self._pos.values():
+                t.reindex(self.cfg)
+
+    # ---------- Ticks ----------
+    def submit(self, prices: Dict[str, float]):
+        """Ticks einreihen (Batch-Poll oder Stream); Verarbeitung im Engine-Thread."""
+        if prices:
+            self._ticks.put(dict(prices))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="exit-engine", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = self._ticks.get()
+            # aufgelaufene Ticks zusammenfassen: pro Mint zählt der neueste Preis
+            try:
+                while True:
+                    batch.update(self._ticks.get_nowait())
+            except queue.Empty:
+                pass
+            try:
+                for sig in self.process(batch):
+                    try:
+                        self.on_signal(sig)
+                    except Exception as e:
+                        print(f"[EXIT] {sig.kind} {sig.mint[:6]}… ERR: {e}")
+            except Exception as e:
+                print("[EXIT] ERR:", e)
+
+    def process(self, prices: Dict[str, float]) -> List[ExitSignal]:
+        """Wertet einen Tick-Batch synchron aus und liefert die gefeuerten Signale."""
+        out: List[ExitSignal] = []
+        updates: List[tuple] = []
+        with self._lock:
+            self._maybe_reindex()
+            self.ticks += len(prices)
+            self.last_tick_at = time.time()
+            for mint, price in prices.items():
+                t = self._pos.get(mint)
+                if t is None or price is None or price <= 0 or not t.crosses(price):
+                    continue
+                self.evaluated += 1
+                sig, upd = self._evaluate(t, price)
+                if upd:
+                    updates.append((mint, upd))
+                if sig is not None:
+                    self.fired += 1
+                    if sig.closes:
+                        self._pos.pop(mint, None)
+                    out.append(sig)
+        if self.on_update:
+            for mint, upd in updates:
+                self.on_update(mint, upd)
+        return out
+
+    def _evaluate(self, t: _Tracked, price: float):
+        c = self.cfg
+        entry = t.entry
+        change_pct = (price / entry - 1.0) * 100.0
+
+        # SL
+        if c["STOP_LOSS_PCT"] > 0 and change_pct <= -c["STOP_LOSS_PCT"]:
+            return ExitSignal(t.mint, t.symbol, "SL", 100.0, price, change_pct, 0.0, True, {}), None
+
+        if c["PARTIAL_ENABLED"] == 1:
+            # TP1
+            if not t.tp1_hit and change_pct >= c["TP1_PCT"]:
+                frac_pct = max(0.0, min(100.0, c["TP1_SELL_PCT"]))
+                upd = {"tp1_hit": True, "high_after_tp1": price}
+                if c["BREAKEVEN_AFTER_TP1"] == 1:
+                    upd["stop_price"] = entry
+                t.tp1_hit, t.high = True, price
+                t.reindex(c)
+                return ExitSignal(t.mint, t.symbol, "TP1", frac_pct, price, change_pct, 0.0, False, upd), None
+
+            moved = None
+            # Trailing nach TP1
+            if t.tp1_hit:
+                if price > t.high:
+                    t.high = price
+                    t.reindex(c)
+                    moved = {"high_after_tp1": price}
+                trail = c["TRAIL_AFTER_TP1_PCT"]
+                if trail > 0 and t.high > 0:
+                    drop_pct = (price / t.high - 1.0) * 100.0
+                    if drop_pct <= -trail:
+                        return ExitSignal(t.mint, t.symbol, "TRAIL", 100.0, price, change_pct, drop_pct, True, {}), moved
+
+            # TP2 (Rest)
+            if t.tp1_hit and change_pct >= c["TP2_PCT"]:
+                frac_pct = max(0.0, min(100.0, c["TP2_SELL_PCT"]))
+                return ExitSignal(t.mint, t.symbol, "TP2", frac_pct, price, change_pct, 0.0, True, {}), moved
+            return None, moved
+
+        if c["TP_PCT"] > 0 and change_pct >= c["TP_PCT"]:
+            return ExitSignal(t.mint, t.symbol, "TP", 100.0, price, change_pct, 0.0, True, {}), None
+        return None, None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "tracked": len(self._pos),
+                "ticks": self.ticks,
+                "evaluated": self.evaluated,
+                "fired": self.fired,
+                "last_tick_age": (time.time() - self.last_tick_at) if self.last_tick_at else None,
+            }
+
+# ===== Parallele Ausführung =====
+# kleinere Zahl = dringender: Verluste begrenzen geht vor Gewinne mitnehmen
+EXIT_PRIORITY = {"SL": 0, "TRAIL": 1, "TP2": 2, "TP": 2, "TP1": 3}
+
+class ExitExecutor:
+    """
+    Führt ExitSignale auf einem begrenzten Worker-Pool aus.
+    execute(sig, release) startet den Verkauf und ruft release() auf, sobald er abgeschlossen ist
+    (auch asynchron nach der Bestätigung). Bis dahin ist die Mint gesperrt; weitere Signale
+    für dieselbe Mint warten (das dringendste gewinnt) und laufen nach der Freigabe.
+    """
+
+    def __init__(self, execute: Callable[[ExitSignal, Callable[[], None]], None], workers: int = 4):
+        self.execute = execute
+        self.workers = max(1, int(workers))
+        self._q: "queue.PriorityQueue[tuple]" = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._busy: Dict[str, float] = {}              # mint -> Start der Ausführung
+        self._deferred: Dict[str, ExitSignal] = {}
+        self._threads: List[threading.Thread] = []
+        self.submitted = self.executed = self.deferred = self.replaced = 0
+        self._latency_sum = 0.0
+        self.max_latency = 0.0
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                t = threading.Thread(target=self._run, name=f"exit-exec-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, sig: ExitSignal):
+        self.start()
+        self.submitted += 1
+        self._q.put((EXIT_PRIORITY.get(sig.kind, 9), next(self._seq), time.time(), sig))
+
+    def busy(self, mint: str) -> bool:
+        with self._lock:
+            return mint in self._busy
+
+    def acquire(self, mint: str) -> bool:
+        """Mint für einen manuellen Verkauf sperren (False, wenn bereits ein Verkauf läuft)."""
+        with self._lock:
+            if mint in self._busy:
+                return False
+            self._busy[mint] = time.time()
+            return True
+
+    def release(self, mint: str):
+        with self._lock:
+            self._busy.pop(mint, None)
+            nxt = self._deferred.pop(mint, None)
+        if nxt is not None:
+            self._q.put((EXIT_PRIORITY.get(nxt.kind, 9), next(self._seq), time.time(), nxt))
+
+    def _run(self):
+        while True:
+            _, _, queued_at, sig = self._q.get()
+            with self._lock:
+                if sig.mint in self._busy:
+                    old = self._deferred.get(sig.mint)
+                    if old is None or EXIT_PRIORITY.get(sig.kind, 9) <= EXIT_PRIORITY.get(old.kind, 9):
+                        if old is not None:
+                            self.replaced += 1
+                        self._deferred[sig.mint] = sig
+                    self.deferred += 1
+                    continue
+                self._busy[sig.mint] = time.time()
+                wait = time.time() - queued_at
+                self._latency_sum += wait
+                self.max_latency = max(self.max_latency, wait)
+                self.executed += 1
+            released = threading.Event()
+
+            def release(mint=sig.mint, ev=released):
+                if not ev.is_set():
+                    ev.set()
+                    self.release(mint)
+            try:
+                self.execute(sig, release)
+            except Exception as e:
+                print(f"[EXIT] {sig.kind} {sig.mint[:6]}… ERR: {e}")
+                release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queued": self._q.qsize(),
+                "in_flight": len(self._busy),
+                "deferred_now": len(self._deferred),
+                "submitted": self.submitted,
+                "executed": self.executed,
+                "deferred": self.deferred,
+                "avg_wait": self._latency_sum / self.executed if self.executed else 0.0,
+                "max_wait": self.max_latency,
+            }
@@ -0,0 +1,18 @@
+# http_pool.py — geteilte Keep-Alive-Sessions (ein Connection-Pool pro Dienst)
+import threading, requests
+from requests.adapters import HTTPAdapter
+
+_sessions = {}
+_lock = threading.Lock()
+
+def get_session(name: str = "default", pool_size: int = 16) -> requests.Session:
+    """Liefert eine benannte, prozessweit geteilte Session mit eigenem Connection-Pool."""
+    with _lock:
+        s = _sessions.get(name)
+        if s is None:
+            s = requests.Session()
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+            s.mount("https://", adapter)
+            s.mount("http://", adapter)
+            _sessions[name] = s
+        return s
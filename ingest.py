@@ -0,0 +1,197 @@
+# ingest.py — Feld-projizierender JSON-Ingest für DexScreener-Antworten
+# - "stream": stdlib-Decoder läuft Element für Element durch das pairs-Array (raw_decode),
+#   projiziert jedes Pair sofort auf die benötigten Felder und verwirft den Rest
+# - "orjson": schneller Voll-Parse (nur mit INGEST_BACKEND=orjson und installiertem orjson), danach dieselbe Projektion
+# - "json":   stdlib json.loads + Projektion (Referenz)
+# Benchmark: python ingest.py bench [datei.json ...] [--repeat N]
+import os, sys, json, time, tracemalloc
+from typing import List, Dict, Any, Optional, Iterator
+
+try:
+    import orjson
+    HAVE_ORJSON = True
+except Exception:
+    orjson = None
+    HAVE_ORJSON = False
+
+BACKENDS = ("stream", "orjson", "json")
+
+# Felder, die Filter, Ranking, Anzeige, Auto-Buy und Strategien lesen
+_TOP = ("pairAddress", "url", "chainId", "dexId", "fdv", "pairCreatedAt", "priceNative", "priceUsd")
+_NESTED = {
+    "baseToken": ("address", "symbol"),
+    "quoteToken": ("address", "symbol"),
+    "liquidity": ("usd",),
+    "volume": ("m5", "h5", "m15", "h1", "h6", "h24"),
+}
+
+def project_pair(p: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(p, dict):
+        return None
+    out = {k: p[k] for k in _TOP if k in p}
+    for k, sub in _NESTED.items():
+        v = p.get(k)
+        if isinstance(v, dict):
+            out[k] = {f: v[f] for f in sub if f in v}
+        elif v is not None:
+            out[k] = v   # unerwarteter Typ: unverändert durchreichen wie im Roh-JSON
+    return out
+
+# ===== stdlib-Streaming =====
+_decoder = json.JSONDecoder()
+_WS = " \t\n\r"
+
+def _skip_ws(s: str, i: int) -> int:
+    n = len(s)
+    while i < n and s[i] in _WS:
+        i += 1
+    return i
+
+def _iter_array(s: str, i: int) -> Iterator[Any]:
+    # s[i] == '[': Elemente einzeln dekodieren
+    i = _skip_ws(s, i + 1)
+    if i < len(s) and s[i] == "]":
+        return
+    while True:
+        obj, i = _decoder.raw_decode(s, i)
+        yield obj
+        i = _skip_ws(s, i)
+        if i >= len(s):
+            raise ValueError("unerwartetes Ende im Array")
+        if s[i] == "]":
+            return
+        if s[i] != ",":
+            raise ValueError(f"',' erwartet an Position {i}")
+        i = _skip_ws(s, i + 1)
+
+def _iter_pairs_stream(s: str) -> Iterator[Any]:
+    i = _skip_ws(s, 0)
+    if i >= len(s):
+        return
+    if s[i] == "[":
+        yield from _iter_array(s, i)
+        return
+    if s[i] != "{":
+        raise ValueError("Objekt oder Array erwartet")
+    i = _skip_ws(s, i + 1)
+    if i < len(s) and s[i] == "}":
+        return
+    while True:
+        key, i = _decoder.raw_decode(s, i)
+        i = _skip_ws(s, i)
+        if s[i] != ":":
+            raise ValueError(f"':' erwartet an Position {i}")
+        i = _skip_ws(s, i + 1)
+        if key == "pairs" and s[i] == "[":
+            yield from _iter_array(s, i)
+            return
+        _, i = _decoder.raw_decode(s, i)   # andere Top-Level-Felder (schemaVersion …) überspringen
+        i = _skip_ws(s, i)
+        if s[i] == "}":
+            return
+        i = _skip_ws(s, i + 1)
+
+# ===== Public =====
+def default_backend() -> str:
+    # stream ist Standard (geringster Peak-Speicher, akzeptiert alles, was stdlib akzeptiert);
+    # orjson nur auf ausdrücklichen Wunsch und wenn installiert
+    b = (os.getenv("INGEST_BACKEND") or "stream").lower()
+    if b in BACKENDS and (b != "orjson" or HAVE_ORJSON):
+        return b
+    return "stream"
+
+def _pairs_of(data: Any) -> List[Any]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict) and isinstance(data.get("pairs"), list):
+        return data["pairs"]
+    return []
+
+def parse_pairs(body: bytes, backend: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Antwort-Bytes -> Liste projizierter Pair-Dicts (nur benötigte Felder)."""
+    if not body:
+        return []
+    b = backend or default_backend()
+    if b == "stream":
+        s = body.decode("utf-8") if isinstance(body, (bytes, bytearray)) else body
+        items = _iter_pairs_stream(s)
+    elif b == "orjson":
+        items = _pairs_of(orjson.loads(body))
+    else:
+        items = _pairs_of(json.loads(body))
+    out = []
+    for p in items:
+        q = project_pair(p)
+        if q is not None:
+            out.append(q)
+    return out
+
+# ===== Benchmark =====
+def synthetic_pairs(n: int = 300, seed: int = 42, now_ms: Optional[int] = None) -> List[Dict[str, Any]]:
+    """DexScreener-förmige Roh-Pairs aus einem festen Seed (Benchmarks, reproduzierbar)."""
+    import random
+    rnd = random.Random(seed)
+    now = int(time.time() * 1000) if now_ms is None else now_ms
+    pairs = []
+    for i in range(n):
+        pairs.append({
+            "chainId": "solana", "dexId": "raydium", "url": f"https://dexscreener.com/solana/pair{i}",
+            "pairAddress": f"Pair{i:040d}", "labels": ["v4"],
+            "baseToken": {"address": f"Mint{i:040d}", "name": f"Token {i}", "symbol": f"T{i}"},
+            "quoteToken": {"address": "So11111111111111111111111111111111111111112", "name": "Wrapped SOL", "symbol": "SOL"},
+            "priceNative": f"{rnd.random():.9f}", "priceUsd": f"{rnd.random() * 150:.6f}",
+            "txns": {k: {"buys": rnd.randint(0, 500), "sells": rnd.randint(0, 500)} for k in ("m5", "h1", "h6", "h24")},
+            "volume": {k: round(rnd.random() * 10 ** rnd.randint(2, 7), 2) for k in ("h24", "h6", "h1", "m5")},
+            "priceChange": {k: round(rnd.uniform(-50, 50), 2) for k in ("m5", "h1", "h6", "h24")},
+            "liquidity": {"usd": round(rnd.random() * 1e6, 2), "base": rnd.randint(1, 10 ** 9), "quote": round(rnd.random() * 5000, 3)},
+            "fdv": rnd.randint(10 ** 4, 10 ** 8), "marketCap": rnd.randint(10 ** 4, 10 ** 8),
+            "pairCreatedAt": now - rnd.randint(0, 10 ** 8),
+            "info": {"imageUrl": f"https://cdn.dexscreener.com/{i}.png", "header": f"https://cdn.dexscreener.com/h{i}.png",
+                     "websites": [{"label": "Website", "url": f"https://token{i}.example"}],
+                     "socials": [{"type": "twitter", "url": f"https://x.com/token{i}"}, {"type": "telegram", "url": f"https://t.me/token{i}"}]},
+        })
+    return pairs
+
+def _synthetic_payload(n: int = 300, seed: int = 42) -> bytes:
+    return json.dumps({"schemaVersion": "1.0.0", "pairs": synthetic_pairs(n, seed)}).encode()
+
+def bench(payloads: List[bytes], repeat: int = 20) -> List[Dict[str, Any]]:
+    results = []
+    total_bytes = sum(len(b) for b in payloads)
+    for b in BACKENDS:
+        if b == "orjson" and not HAVE_ORJSON:
+            continue
+        recs = 0
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for body in payloads:
+                recs += len(parse_pairs(body, backend=b))
+        dt = time.perf_counter() - t0
+        tracemalloc.start()
+        for body in payloads:
+            parse_pairs(body, backend=b)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results.append({
+            "backend": b,
+            "mb_per_s": total_bytes * repeat / dt / 1e6,
+            "records_per_s": recs / dt,
+            "ms_per_payload": dt / (repeat * len(payloads)) * 1000,
+            "peak_kb": peak / 1024,
+        })
+    return results
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if not args or args[0] != "bench":
+        print("Usage: python ingest.py bench [datei.json ...] [--repeat N]")
+        sys.exit(1)
+    repeat = 20
+    if "--repeat" in args:
+        repeat = int(args[args.index("--repeat") + 1])
+        del args[args.index("--repeat"):args.index("--repeat") + 2]
+    files = args[1:]
+    payloads = [open(f, "rb").read() for f in files] if files else [_synthetic_payload()]
+    print(f"[INGEST] {len(payloads)} Payload(s), {sum(len(b) for b in payloads) / 1024:.0f} KB, repeat={repeat}, default={default_backend()}")
+    for r in bench(payloads, repeat):
+        print(f"  {r['backend']:7s} {r['mb_per_s']:7.1f} MB/s | {r['records_per_s']:9.0f} rec/s | {r['ms_per_payload']:6.2f} ms/payload | peak {r['peak_kb']:8.0f} KB")
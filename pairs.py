@@ -0,0 +1,136 @@
+# pairs.py — Parsing-Helfer für DexScreener-Pairs (gemeinsam für Scanner, Index und Vektor-Engine)
+from typing import Dict, Any, Optional
+from datetime import datetime, timezone
+
+def _as_int(v, default=0):
+    try:
+        return int(float(str(v).strip().replace("_","").replace(",","").replace("%","")))
+    except Exception:
+        return int(default)
+
+def _as_float(v, default=0.0):
+    try:
+        return float(str(v).strip().replace("_","").replace(",","").replace("%",""))
+    except Exception:
+        return float(default)
+
+def _num(d, *path, default=0.0):
+    cur = d
+    for k in path:
+        if not isinstance(cur, dict) or k not in cur:
+            return float(default)
+        cur = cur[k]
+    try:
+        return float(cur)
+    except Exception:
+        return float(default)
+
+def _best_vol(p: Dict[str, Any]) -> int:
+    vol = p.get("volume") or {}
+    cands = [
+        _as_int(vol.get("m5", 0)), _as_int(vol.get("m15", 0)),
+        _as_int(vol.get("h1", 0)), _as_int(vol.get("h6", 0)),
+        _as_int(vol.get("h24", 0))
+    ]
+    return max(cands) if cands else 0
+
+def _age_minutes(p: Dict[str, Any]) -> int:
+    ts = p.get("pairCreatedAt")
+    try:
+        if ts is None:
+            return 10**9
+        dt = datetime.fromtimestamp(int(ts)/1000.0, tz=timezone.utc)
+        return int((datetime.now(timezone.utc) - dt).total_seconds() // 60)
+    except Exception:
+        return 10**9
+
+# gültiger Bereich für datetime.fromtimestamp (Jahr 1..9999), sonst gilt wie bisher Alter 10**9
+_TS_MIN_MS = -62135596800000
+_TS_MAX_MS = 253402300799000
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+def _created_ms(ts) -> Optional[int]:
+    if ts is None:
+        return None
+    try:
+        t = int(ts)
+    except Exception:
+        return None
+    return t if _TS_MIN_MS < t < _TS_MAX_MS else None
+
+def _now_us(now: Optional[datetime] = None) -> int:
+    d = (now or datetime.now(timezone.utc)) - _EPOCH
+    return (d.days * 86400 + d.seconds) * 1_000_000 + d.microseconds
+
+def _opt_float(v) -> Optional[float]:
+    try:
+        return float(v)
+    except Exception:
+        return None
+
+class PairSnapshot:
+    """
+    Kompakter, einmal beim Ingest geparster Pair-Datensatz: nur die Felder, die
+    Filter, Ranking, Anzeige und Auto-Buy brauchen; das Roh-JSON wird verworfen.
+    liq/fdv/vol5/best_vol entsprechen _num/_best_vol auf dem Roh-Dict.
+    """
+    __slots__ = (
+        "pair_address", "url", "chain_id", "dex_id", "url_sol",
+        "base_address", "base_symbol", "quote_symbol",
+        "liq", "fdv", "vol5", "best_vol", "created_ms",
+        "price_native", "price_usd",
+    )
+
+    def __init__(self, pair_address, url, chain_id, dex_id, base_address, base_symbol, quote_symbol,
+                 liq, fdv, vol5, best_vol, created_ms, price_native=None, price_usd=None):
+        self.pair_address = pair_address
+        self.url = url
+        self.chain_id = chain_id
+        self.dex_id = dex_id
+        self.url_sol = "/solana/" in url.lower()
+        self.base_address = base_address
+        self.base_symbol = base_symbol
+        self.quote_symbol = quote_symbol
+        self.liq = liq
+        self.fdv = fdv
+        self.vol5 = vol5
+        self.best_vol = best_vol
+        self.created_ms = created_ms
+        self.price_native = price_native
+        self.price_usd = price_usd
+
+    @classmethod
+    def from_pair(cls, p: Dict[str, Any]) -> "PairSnapshot":
+        base = p.get("baseToken") or {}
+        quote = p.get("quoteToken") or {}
+        return cls(
+            pair_address=p.get("pairAddress"),
+            url=p.get("url") or "",
+            chain_id=(p.get("chainId") or "").lower(),
+            dex_id=p.get("dexId") or "",
+            base_address=base.get("address"),
+            base_symbol=base.get("symbol"),
+            quote_symbol=quote.get("symbol"),
+            liq=_num(p, "liquidity", "usd"),
+            fdv=_num(p, "fdv"),
+            vol5=_num(p, "volume", "m5") or _num(p, "volume", "h5"),
+            best_vol=_best_vol(p),
+            created_ms=_created_ms(p.get("pairCreatedAt")),
+            price_native=_opt_float(p.get("priceNative")),
+            price_usd=_opt_float(p.get("priceUsd")),
+        )
+
+    @property
+    def pid(self) -> Optional[str]:
+        return self.pair_address or self.url or None
+
+    def age_minutes(self, now_us: Optional[int] = None) -> int:
+        # wie _age_minutes: ganze Minuten seit pairCreatedAt, 10**9 wenn unbekannt
+        if self.created_ms is None:
+            return 10**9
+        if now_us is None:
+            now_us = _now_us()
+        return int(((now_us - self.created_ms * 1000) / 1e6) // 60)
+
+    def __repr__(self):
+        return f"PairSnapshot({self.base_symbol}/{self.quote_symbol} {self.pair_address})"
@@ -0,0 +1,337 @@
+# paper.py — Paper-Trading für DRY_RUN: simulierte Fills hinter der JupiterTrader-Schnittstelle
+# - Preis-Impact nach Constant-Product-Pool (Tiefe aus der Pool-Liquidität), Pool-Fee und Netzwerk-Fee
+# - Latenz bis zum Fill; ändert sich der Preis in der Zeit über SLIPPAGE_BPS hinaus, schlägt der Swap fehl
+# - Virtuelle SOL-Balance und Token-Bestände (optional persistent), keine Chain-Zugriffe
+# ENV: PAPER_START_SOL=10  PAPER_LATENCY_MS=800  PAPER_LATENCY_JITTER_MS=300  PAPER_POOL_FEE_BPS=25
+#      PAPER_FAIL_RATE=0  PAPER_DEFAULT_POOL_SOL=200  PAPER_POOL_TTL_SEC=60  PAPER_STATE_PATH=
+import heapq, itertools, json, os, random, threading, time
+from typing import Callable, Dict, Any, Optional, Tuple, List
+
+from trading import QuoteCache, AtaCache, BalanceCache, LAMPORTS_PER_SOL, _pick_rpc
+from rpc_pool import RpcPool, urls_from_env
+from pairs import _as_float
+
+BASE_FEE_LAMPORTS = 5000
+TOKEN_DECIMALS = 6   # virtuelle Token-Einheit für get_token_raw
+
+_sig_counter = itertools.count(1)
+
+class _PaperTracker:
+    """Gleiche stats() wie ConfirmationTracker; Fills werden nach ihrer Latenz ausgeführt."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cv = threading.Condition(self._lock)
+        self._heap: List[tuple] = []   # (fällig, n, fn)
+        self._n = itertools.count()
+        self._thread: Optional[threading.Thread] = None
+        self.confirmed = self.failed = self.timeouts = self.unknown = self.polls = 0
+        self._latency_sum = 0.0
+
+    def schedule(self, delay: float, fn: Callable[[], None]):
+        with self._cv:
+            heapq.heappush(self._heap, (time.time() + max(0.0, delay), next(self._n), fn))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="paper-fill", daemon=True)
+                self._thread.start()
+            self._cv.notify()
+
+    def done(self, ok: bool, latency: float):
+        with self._lock:
+            if ok:
+                self.confirmed += 1
+                self._latency_sum += latency
+            else:
+                self.failed += 1
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._heap or self._heap[0][0] > time.time():
+                    self._cv.wait(None if not self._heap else max(0.0, self._heap[0][0] - time.time()))
+                _, _, fn = heapq.heappop(self._heap)
+            try:
+                fn()
+            except Exception as e:
+                print(f"[PAPER] Fill ERR: {e}")
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._heap)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "pending": len(self._heap),
+                "confirmed": self.confirmed,
+                "failed": self.failed,
+                "timeouts": self.timeouts,
+                "unknown": self.unknown,
+                "polls": self.polls,
+                "avg_confirm_s": self._latency_sum / self.confirmed if self.confirmed else 0.0,
+            }
+
+class PaperTrader:
+    """
+    price(mint) -> Preis in SOL je Token (z. B. aus dem Preis-Cache)
+    depth(mint) -> SOL-Reserve des Pools (z. B. aus DexScreener-Liquidität), None = unbekannt
+    """
+
+    def __init__(self, price: Callable[[str], Optional[float]], depth: Optional[Callable[[str], Optional[float]]] = None):
+        self.price_fn = price
+        self.depth_fn = depth
+        self.slippage_bps = int(os.getenv("SLIPPAGE_BPS", "100"))
+        self.swap_timeout = int(os.getenv("SWAP_TIMEOUT", "45"))
+        self.priority_lamports = int(os.getenv("JUPITER_PRIORITY_LAMPORTS", "5000"))
+        self.pool_fee_bps = _as_float(os.getenv("PAPER_POOL_FEE_BPS", "25"), 25.0)
+        self.latency = _as_float(os.getenv("PAPER_LATENCY_MS", "800"), 800.0) / 1000.0
+        self.jitter = _as_float(os.getenv("PAPER_LATENCY_JITTER_MS", "300"), 300.0) / 1000.0
+        self.fail_rate = _as_float(os.getenv("PAPER_FAIL_RATE", "0"), 0.0)
+        self.default_pool_sol = _as_float(os.getenv("PAPER_DEFAULT_POOL_SOL", "200"), 200.0)
+        self.pool_ttl = _as_float(os.getenv("PAPER_POOL_TTL_SEC", "60"), 60.0)
+        self.state_path = os.getenv("PAPER_STATE_PATH") or ""
+
+        # dieselben Attribute, die /stats und der Bot beim echten Trader lesen
+        self.rpc = RpcPool(urls_from_env(_pick_rpc()))
+        self.rpc_url = self.rpc.url
+        self.quotes = QuoteCache()
+        self.atas = AtaCache("")
+        self.balances = BalanceCache(ttl=float("inf"))
+        self.tracker = _PaperTracker()
+
+        self._lock = threading.Lock()
+        self._rnd = random.Random()
+        self._pools: Dict[str, Tuple[float, float]] = {}   # mint -> (sol_reserve, ts)
+        self._fills: Dict[str, Dict[str, Any]] = {}
+        self.sol = _as_float(os.getenv("PAPER_START_SOL", "10"), 10.0)
+        self.tokens: Dict[str, float] = {}
+        self.fees_sol = 0.0
+        self.impact_bps_sum = 0.0
+        self.fills = self.slippage_fails = 0
+        self._load()
+        self._sync_balances()
+        print(f"[PAPER] aktiv | {self.sol:.4f} SOL | {len(self.tokens)} Token-Bestände")
+
+    # ---------- Zustand ----------
+    def _load(self):
+        if not self.state_path:
+            return
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                d = json.load(f)
+            self.sol = float(d.get("sol", self.sol))
+            self.tokens = {str(k): float(v) for k, v in (d.get("tokens") or {}).items()}
+            self.fees_sol = float(d.get("fees_sol", 0.0))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[PAPER] {self.state_path} unlesbar: {e}")
+
+    def _save(self):
+        if not self.state_path:
+            return
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"sol": self.sol, "tokens": self.tokens, "fees_sol": self.fees_sol}, f)
+            os.replace(tmp, self.state_path)
+        except Exception as e:
+            print(f"[PAPER] speichern ERR: {e}")
+
+    def _sync_balances(self):
+        self.balances.set_sol(int(self.sol * LAMPORTS_PER_SOL))
+        for m, q in self.tokens.items():
+            self.balances.set_token(m, int(q * 10 ** TOKEN_DECIMALS), TOKEN_DECIMALS)
+
+    # ---------- Wallet ----------
+    @property
+    def public_key(self) -> Optional[str]:
+        return "PAPER"
+
+    def describe_wallet(self) -> str:
+        held = sum(1 for q in self.tokens.values() if q > 0)
+        return (f"Wallet (Paper-Trading)\n• SOL: {self.sol:.6f}\n• Token-Bestände: {held}\n"
+                f"• Fees gesamt: {self.fees_sol:.6f} SOL | Fills {self.fills} | Slippage-Abbrüche {self.slippage_fails}")
+
+    def get_sol_balance(self, max_age: Optional[float] = None) -> float:
+        with self._lock:
+            return self.sol
+
+    def get_token_raw(self, mint: str, max_age: Optional[float] = None) -> Tuple[int, int]:
+        with self._lock:
+            return int(self.tokens.get(mint, 0.0) * 10 ** TOKEN_DECIMALS), TOKEN_DECIMALS
+
+    def get_token_balance(self, mint: str) -> Tuple[float, int, int]:
+        raw, dec = self.get_token_raw(mint)
+        return raw / 10 ** dec, dec, raw
+
+    def refresh_balances(self, mints: Optional[List[str]] = None) -> bool:
+        return True
+
+    # Vorbereitung entfällt (kein Quote-/ATA-Round-Trip im Paper-Modus)
+    def check_atas(self, mints: List[str]) -> Dict[str, bool]:
+        return {m: True for m in mints}
+
+    def prepare_atas_async(self, mints: List[str]):
+        pass
+
+    def prequote_buy(self, out_mint: str, amount_sol: float) -> bool:
+        return False
+
+    def prequote_async(self, out_mints: List[str], amount_sol: float):
+        pass
+
+    def fill(self, sig: str) -> Optional[Dict[str, Any]]:
+        """Ausführungsdaten eines bestätigten Paper-Swaps: side, mint, price, sol, qty, fee_sol, impact_bps."""
+        with self._lock:
+            return self._fills.get(sig)
+
+    # ---------- Markt-Modell ----------
+    def _pool_sol(self, mint: str) -> float:
+        now = time.time()
+        with self._lock:
+            hit = self._pools.get(mint)
+        if hit and now - hit[1] <= self.pool_ttl:
+            return hit[0]
+        depth = None
+        if self.depth_fn:
+            try:
+                depth = self.depth_fn(mint)
+            except Exception as e:
+                print(f"[PAPER] Pool-Tiefe {mint[:6]}… ERR: {e}")
+        depth = depth if depth and depth > 0 else self.default_pool_sol
+        with self._lock:
+            self._pools[mint] = (depth, now)
+        return depth
+
+    def _swap_out(self, mint: str, side: str, amount_in: float) -> Tuple[float, float]:
+        """(out, spot) nach x*y=k mit Pool-Fee; side 'buy': SOL -> Token, 'sell': Token -> SOL."""
+        spot = self.price_fn(mint) or 0.0
+        if spot <= 0:
+            raise RuntimeError("kein Preis")
+        x = self._pool_sol(mint)   # SOL-Reserve
+        y = x / spot               # Token-Reserve
+        net = amount_in * (1.0 - self.pool_fee_bps / 10_000.0)
+        if side == "buy":
+            return y * net / (x + net), spot
+        return x * net / (y + net), spot
+
+    def _tx_fee(self) -> float:
+        return (BASE_FEE_LAMPORTS + self.priority_lamports) / LAMPORTS_PER_SOL
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + self._rnd.uniform(-self.jitter, self.jitter))
+
+    # ---------- Swaps ----------
+    def _submit(self, side: str, mint: str, amount_in: float, label: str,
+                on_done: Optional[Callable[[str, bool, Optional[str]], None]]) -> Tuple[Optional[str], str]:
+        try:
+            expected, _ = self._swap_out(mint, side, amount_in)
+        except Exception as e:
+            return None, f"❌ {label}-Fehler: {e}"
+        sig = f"paper-{side}-{next(_sig_counter):08d}-{self._rnd.getrandbits(32):08x}"
+        min_out = expected * (1.0 - self.slippage_bps / 10_000.0)
+        sent_at = time.time()
+        result: Dict[str, Any] = {}
+        landed = threading.Event()
+
+        def execute():
+            ok, err = self._execute(sig, side, mint, amount_in, min_out, sent_at)
+            result["ok"], result["err"] = ok, err
+            landed.set()
+            if on_done:
+                try:
+                    on_done(sig, ok, err)
+                except Exception as e:
+                    print(f"[PAPER] Callback {sig} ERR: {e}")
+
+        self.tracker.schedule(self._delay(), execute)
+        if on_done:
+            return sig, f"📤 PAPER {label} gesendet ({mint[:6]}…)\nTX: {sig}"
+        if not landed.wait(self.swap_timeout) or not result.get("ok"):
+            return None, f"❌ {label}-Fehler: {result.get('err') or 'timeout'}"
+        f = self.fill(sig) or {}
+        return sig, f"✅ PAPER {label} {f.get('sol', 0.0):.6f} SOL @ {f.get('price', 0.0):.10f} ({mint[:6]}…)\nTX: {sig}"
+
+    def _execute(self, sig: str, side: str, mint: str, amount_in: float, min_out: float, sent_at: float):
+        fee = self._tx_fee()
+        try:
+            out, spot = self._swap_out(mint, side, amount_in)
+        except Exception as e:
+            self.tracker.done(False, 0.0)
+            return False, str(e)
+        with self._lock:
+            # die TX landet auch bei Fehlschlag on-chain -> Netzwerk-Fee fällt immer an
+            self.sol -= fee
+            self.fees_sol += fee
+            if self._rnd.random() < self.fail_rate:
+                err = "simulierter TX-Fehler"
+            elif out < min_out:
+                self.slippage_fails += 1
+                err = f"Slippage-Limit überschritten ({out:.6g} < {min_out:.6g})"
+            elif side == "buy" and self.sol < amount_in:
+                err = "zu wenig SOL"
+            elif side == "sell" and self.tokens.get(mint, 0.0) + 1e-12 < amount_in:
+                err = "zu wenig Token"
+            else:
+                err = None
+            if err is None:
+                if side == "buy":
+                    self.sol -= amount_in
+                    self.tokens[mint] = self.tokens.get(mint, 0.0) + out
+                    sol, qty = amount_in, out
+                else:
+                    left = self.tokens.get(mint, 0.0) - amount_in
+                    if left <= 1e-12:
+                        self.tokens.pop(mint, None)
+                    else:
+                        self.tokens[mint] = left
+                    self.sol += out
+                    sol, qty = out, amount_in
+                price = sol / qty if qty > 0 else 0.0
+                impact = abs(price / spot - 1.0) * 10_000.0
+                self.fills += 1
+                self.impact_bps_sum += impact
+                self._fills[sig] = {"side": side, "mint": mint, "price": price, "sol": sol, "qty": qty,
+                                    "fee_sol": fee + sol * self.pool_fee_bps / 10_000.0, "impact_bps": impact}
+            self._sync_balances()
+            if mint not in self.tokens:
+                self.balances.set_token(mint, 0, TOKEN_DECIMALS)
+            self._save()
+        self.tracker.done(err is None, time.time() - sent_at)
+        return err is None, err
+
+    def buy_with_sol(self, out_mint: str, amount_sol: float) -> str:
+        return self.submit_buy(out_mint, amount_sol)[1]
+
+    def submit_buy(self, out_mint: str, amount_sol: float,
+                   on_done: Optional[Callable[[str, bool, Optional[str]], None]] = None) -> Tuple[Optional[str], str]:
+        if amount_sol <= 0:
+            return None, "⚠️ Amount <= 0."
+        if self.get_sol_balance() < amount_sol + self._tx_fee():
+            return None, f"⚠️ Zu wenig SOL (Paper): {self.get_sol_balance():.6f}"
+        return self._submit("buy", out_mint, float(amount_sol), f"BUY {amount_sol:.6f} SOL", on_done)
+
+    def sell_to_sol(self, in_mint: str, pct: float) -> str:
+        return self.submit_sell(in_mint, pct)[1]
+
+    def submit_sell(self, in_mint: str, pct: float,
+                    on_done: Optional[Callable[[str, bool, Optional[str]], None]] = None) -> Tuple[Optional[str], str]:
+        if pct <= 0:
+            return None, "⚠️ Prozent muss > 0 sein."
+        with self._lock:
+            held = self.tokens.get(in_mint, 0.0)
+        if held <= 0:
+            return None, "⚠️ Kein Token-Bestand."
+        return self._submit("sell", in_mint, held * min(pct, 100.0) / 100.0, f"SELL {pct:.2f}%", on_done)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sol": self.sol,
+                "holdings": sum(1 for q in self.tokens.values() if q > 0),
+                "fills": self.fills,
+                "slippage_fails": self.slippage_fails,
+                "fees_sol": self.fees_sol,
+                "avg_impact_bps": self.impact_bps_sum / self.fills if self.fills else 0.0,
+            }
@@ -0,0 +1,431 @@
+# positions.py — In-Memory-Positionsbuch (Index nach Mint) mit Write-Behind-Persistenz
+import os, json, time, sqlite3, threading, atexit
+from typing import List, Dict, Any, Optional, Iterable
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+def new_trade_id(mint: str) -> str:
+    # eindeutig je Eröffnung: Millisekunden-Zeitstempel plus Mint-Präfix
+    return f"{int(time.time() * 1000):x}-{mint[:8]}"
+
+class JsonFileStore:
+    """
+    Persistiert das ganze Buch als JSON-Array: Temp-Datei + os.replace (atomar).
+    fsync-Policy: always | interval | never. Außer bei never wird die Temp-Datei vor dem Rename
+    immer gesynct (sonst kann nach einem Absturz eine leere positions.json stehen bleiben);
+    interval drosselt nur den Verzeichnis-Sync (max. alle fsync_interval s, Rest per sync()).
+    """
+
+    def __init__(self, path: str, fsync: str = "interval", fsync_interval: float = 5.0):
+        self.path = path
+        self.fsync = fsync if fsync in FSYNC_POLICIES else "interval"
+        self.fsync_interval = float(fsync_interval)
+        self._last_fsync = 0.0
+        self._unsynced = False   # Rename des letzten Writes (interval) noch nicht gesynct
+
+    def _read(self, path: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, list) else None
+        except Exception:
+            return None
+
+    def load(self) -> List[Dict[str, Any]]:
+        items = self._read(self.path)
+        if items is None:
+            # Recovery: Absturz zwischen Schreiben und Rename -> vollständige Temp-Datei übernehmen
+            items = self._read(self.path + ".tmp")
+            if items is not None:
+                print(f"[POS] {self.path} fehlt/defekt – aus {self.path}.tmp wiederhergestellt ({len(items)})")
+        return items or []
+
+    def write(self, items: List[Dict[str, Any]], changed: Iterable[str] = (), removed: Dict[str, Dict[str, Any]] = None):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False, separators=(",", ":"))
+            if self.fsync != "never":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        if self.fsync == "never":
+            return
+        self._unsynced = True
+        self.sync(force=self.fsync == "always")
+
+    def sync_due(self) -> Optional[float]:
+        """Sekunden bis zum fälligen Verzeichnis-Sync (None = nichts offen)."""
+        if not self._unsynced:
+            return None
+        return max(0.0, self._last_fsync + self.fsync_interval - time.time())
+
+    def sync(self, force: bool = False):
+        # Verzeichnis-Sync macht den Rename dauerhaft; interval: höchstens alle fsync_interval s
+        if not self._unsynced or (not force and self.sync_due() > 0):
+            return
+        self._sync_dir()
+        self._last_fsync = time.time()
+        self._unsynced = False
+
+    def _sync_dir(self):
+        try:
+            dfd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_RDONLY)
+            try:
+                os.fsync(dfd)
+            finally:
+                os.close(dfd)
+        except Exception:
+            pass
+
+    def append_events(self, events: List[Dict[str, Any]]):
+        # Fill-/Exit-Ledger gibt es nur im SQLite-Backend
+        pass
+
+    def close(self):
+        self.sync(force=True)
+
+class SqliteStore:
+    """
+    SQLite-Backend (WAL): eine Zeile pro Position (Index auf status), Updates nur
+    für geänderte Mints, dazu ein Append-only-Ledger aller Fills und Exits.
+    """
+
+    _SYNC = {"always": "FULL", "interval": "NORMAL", "never": "OFF"}
+
+    def __init__(self, path: str, fsync: str = "interval", import_json: Optional[str] = None):
+        self.path = path
+        d = os.path.dirname(os.path.abspath(path))
+        os.makedirs(d, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={self._SYNC.get(fsync, 'NORMAL')}")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS positions (
+                mint      TEXT PRIMARY KEY,
+                status    TEXT NOT NULL,
+                symbol    TEXT,
+                opened_at INTEGER,
+                closed_at INTEGER,
+                data      TEXT NOT NULL,
+                trade_id  TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_positions_status ON positions(status);
+            CREATE TABLE IF NOT EXISTS events (
+                id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts        REAL NOT NULL,
+                mint      TEXT NOT NULL,
+                kind      TEXT NOT NULL,
+                pct       REAL,
+                price_sol REAL,
+                sol       REAL,
+                tx        TEXT,
+                note      TEXT,
+                trade_id  TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_events_mint ON events(mint, ts);
+            CREATE INDEX IF NOT EXISTS idx_events_ts ON events(ts);
+        """)
+        self._migrate()
+        if import_json:
+            self._import_json(import_json)
+
+    def _migrate(self):
+        # DBs von vor der Trade-ID: Spalte nachrüsten (alte Zeilen bleiben NULL und zählen je Mint)
+        for table in ("positions", "events"):
+            cols = {r[1] for r in self._db.execute(f"PRAGMA table_info({table})")}
+            if "trade_id" not in cols:
+                self._db.execute(f"ALTER TABLE {table} ADD COLUMN trade_id TEXT")
+        self._db.execute("CREATE INDEX IF NOT EXISTS idx_events_trade ON events(trade_id)")
+
+    def _import_json(self, json_path: str):
+        # Einmalige Migration aus positions.json, solange die DB leer ist
+        if self._db.execute("SELECT 1 FROM positions LIMIT 1").fetchone():
+            return
+        items = JsonFileStore(json_path).load()
+        if items:
+            self.write(items, changed=[p["mint"] for p in items if p.get("mint")])
+            print(f"[POS] {len(items)} Positionen aus {json_path} nach {self.path} übernommen")
+
+    def load(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute("SELECT data FROM positions WHERE status='open' ORDER BY opened_at, rowid").fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def write(self, items: List[Dict[str, Any]], changed: Iterable[str] = (), removed: Dict[str, Dict[str, Any]] = None):
+        by_mint = {p["mint"]: p for p in items if p.get("mint")}
+        now = int(time.time())
+        with self._lock:
+            cur = self._db.cursor()
+            cur.execute("BEGIN")
+            try:
+                for m in changed:
+                    p = by_mint.get(m)
+                    if p is None:
+                        continue
+                    cur.execute(
+                        "INSERT INTO positions(mint, status, symbol, opened_at, data, trade_id) VALUES (?, 'open', ?, ?, ?, ?) "
+                        "ON CONFLICT(mint) DO UPDATE SET status='open', symbol=excluded.symbol, "
+                        "opened_at=excluded.opened_at, closed_at=NULL, data=excluded.data, trade_id=excluded.trade_id",
+                        (m, p.get("symbol"), p.get("opened_at"), json.dumps(p, ensure_ascii=False), p.get("trade_id")),
+                    )
+                for m, p in (removed or {}).items():
+                    cur.execute(
+                        "INSERT INTO positions(mint, status, symbol, opened_at, closed_at, data, trade_id) VALUES (?, 'closed', ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(mint) DO UPDATE SET status='closed', closed_at=excluded.closed_at, data=excluded.data, "
+                        "trade_id=excluded.trade_id",
+                        (m, p.get("symbol"), p.get("opened_at"), now, json.dumps(p, ensure_ascii=False), p.get("trade_id")),
+                    )
+                cur.execute("COMMIT")
+            except Exception:
+                cur.execute("ROLLBACK")
+                raise
+
+    def append_events(self, events: List[Dict[str, Any]]):
+        if not events:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT INTO events(ts, mint, kind, pct, price_sol, sol, tx, note, trade_id) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(e["ts"], e["mint"], e["kind"], e.get("pct"), e.get("price_sol"), e.get("sol"), e.get("tx"), e.get("note"),
+                  e.get("trade_id")) for e in events],
+            )
+
+    # ---------- Auswertung ----------
+    def history(self, mint: Optional[str] = None, since: float = 0.0, limit: int = 50) -> List[Dict[str, Any]]:
+        q = "SELECT ts, mint, kind, pct, price_sol, sol, tx, note, trade_id FROM events WHERE ts >= ?"
+        args: list = [since]
+        if mint:
+            q += " AND mint = ?"
+            args.append(mint)
+        q += " ORDER BY ts DESC, id DESC LIMIT ?"
+        args.append(int(limit))
+        with self._lock:
+            rows = self._db.execute(q, args).fetchall()
+        keys = ("ts", "mint", "kind", "pct", "price_sol", "sol", "tx", "note", "trade_id")
+        return [dict(zip(keys, r)) for r in rows]
+
+    def pnl_summary(self, since: float = 0.0) -> Dict[str, Any]:
+        """
+        Realisierter PnL (SOL) über abgeschlossene Trades: Exit-Erlöse minus BUY-Kosten je Trade-ID
+        (Ledger-Zeilen ohne Trade-ID zählen je Mint). Oberste Ebene: Live-Trades; by_mode trennt
+        live / paper / dry_run nach der Notiz des BUY.
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT COALESCE(e.trade_id, e.mint) AS trade, "
+                "COALESCE(MAX(CASE WHEN e.kind='BUY' THEN COALESCE(e.note, 'live') END), MAX(e.note), 'live'), "
+                "SUM(CASE WHEN e.kind='BUY' THEN e.sol ELSE 0 END), "
+                "SUM(CASE WHEN e.kind!='BUY' THEN e.sol ELSE 0 END) "
+                "FROM events e "
+                "WHERE COALESCE(e.trade_id, e.mint) NOT IN "
+                "(SELECT COALESCE(trade_id, mint) FROM positions WHERE status='open') "
+                "GROUP BY trade HAVING MAX(e.ts) >= ?",
+                (since,),
+            ).fetchall()
+        by_mode: Dict[str, Dict[str, Any]] = {}
+        for _, mode, cost, out in rows:
+            s = by_mode.setdefault(mode, {"closed": 0, "wins": 0, "losses": 0, "pnl_sol": 0.0, "cost_sol": 0.0})
+            pnl = (out or 0.0) - (cost or 0.0)
+            s["closed"] += 1
+            s["wins" if pnl > 0 else "losses"] += 1
+            s["pnl_sol"] += pnl
+            s["cost_sol"] += cost or 0.0
+        summary = dict(by_mode.get("live") or {"closed": 0, "wins": 0, "losses": 0, "pnl_sol": 0.0, "cost_sol": 0.0})
+        summary["by_mode"] = by_mode
+        return summary
+
+    def close(self):
+        with self._lock:
+            try:
+                self._db.close()
+            except Exception:
+                pass
+
+class PositionBook:
+    """
+    Quelle der Wahrheit für offene Positionen. Lesen kostet keinen Disk-Zugriff;
+    Änderungen markieren den Mint als dirty, ein Hintergrund-Thread schreibt
+    gebündelt (flush_interval) über den Store weg.
+    """
+
+    def __init__(self, store, flush_interval: float = 0.5):
+        self.store = store
+        self.flush_interval = max(0.0, float(flush_interval))
+        self._lock = threading.RLock()
+        self._items: Dict[str, Dict[str, Any]] = {}
+        self._changed: set = set()
+        self._removed: Dict[str, Dict[str, Any]] = {}   # mint -> letzter Stand
+        self._events: List[Dict[str, Any]] = []
+        self._last_trade: Dict[str, str] = {}          # mint -> Trade-ID der zuletzt geschlossenen Position
+        self._version = 0
+        self._flushed_version = 0
+        self._flushes = 0
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._closed = False
+        self._flush_lock = threading.Lock()   # Flush-Thread und close() schreiben nie gleichzeitig (<path>.tmp)
+
+        for p in store.load():
+            if p.get("mint"):
+                self._items[p["mint"]] = p
+        print(f"[POS] {len(self._items)} Positionen geladen")
+
+        self._thread = threading.Thread(target=self._flush_loop, name="pos-flush", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # ---------- Lesen ----------
+    def has(self, mint: str) -> bool:
+        with self._lock:
+            return mint in self._items
+
+    def get(self, mint: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            p = self._items.get(mint)
+            return dict(p) if p is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(p) for p in self._items.values()]
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    # ---------- Schreiben ----------
+    def _touch(self, mint: str, removed: Optional[Dict[str, Any]] = None):
+        if removed is not None:
+            self._changed.discard(mint)
+            self._removed[mint] = removed
+        else:
+            self._removed.pop(mint, None)
+            self._changed.add(mint)
+        self._version += 1
+        self._wake.set()
+
+    def add(self, pos: Dict[str, Any]):
+        """Position anlegen/ersetzen; neue Positionen bekommen eine Trade-ID (Nachkauf behält die bestehende)."""
+        with self._lock:
+            p = dict(pos)
+            if not p.get("trade_id"):
+                cur = self._items.get(p["mint"])
+                p["trade_id"] = (cur or {}).get("trade_id") or new_trade_id(p["mint"])
+            self._items[p["mint"]] = p
+            self._touch(p["mint"])
+
+    def update(self, mint: str, updates: Dict[str, Any]) -> bool:
+        with self._lock:
+            p = self._items.get(mint)
+            if p is None:
+                return False
+            p.update(updates)
+            self._touch(mint)
+            return True
+
+    def remove(self, mint: str) -> bool:
+        with self._lock:
+            p = self._items.pop(mint, None)
+            if p is None:
+                return False
+            if p.get("trade_id"):
+                self._last_trade[mint] = p["trade_id"]
+            self._touch(mint, removed=dict(p))
+            return True
+
+    def record_event(self, mint: str, kind: str, **fields):
+        """Fill/Exit ins Ledger (BUY, TP1, TP2, TP, TRAIL, SL, SELL) – geschrieben beim nächsten Flush."""
+        ev = {"ts": time.time(), "mint": mint, "kind": kind}
+        ev.update(fields)
+        with self._lock:
+            if not ev.get("trade_id"):
+                p = self._items.get(mint)
+                ev["trade_id"] = p.get("trade_id") if p is not None else self._last_trade.get(mint)
+            self._events.append(ev)
+            self._version += 1
+            self._wake.set()
+
+    def replace_all(self, items: List[Dict[str, Any]]):
+        with self._lock:
+            for m, p in self._items.items():
+                self._touch(m, removed=dict(p))
+            self._items = {}
+            for p in items:
+                if p.get("mint"):
+                    self._items[p["mint"]] = dict(p)
+                    self._touch(p["mint"])
+
+    # ---------- Persistenz ----------
+    def flush(self) -> bool:
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> bool:
+        with self._lock:
+            if self._version == self._flushed_version:
+                return False
+            version = self._version
+            items = [dict(p) for p in self._items.values()]
+            changed, removed, events = self._changed, self._removed, self._events
+            self._changed, self._removed, self._events = set(), {}, []
+        try:
+            if changed or removed:
+                self.store.write(items, changed=changed, removed=removed)
+        except Exception as e:
+            print(f"[POS] flush ERR: {e}")
+            with self._lock:
+                # beim nächsten Versuch erneut schreiben
+                self._changed |= {m for m in changed if m in self._items}
+                for m, p in removed.items():
+                    if m not in self._items:
+                        self._removed.setdefault(m, p)
+                self._events[:0] = events
+                self._wake.set()
+            return False
+        try:
+            self.store.append_events(events)
+        except Exception as e:
+            print(f"[POS] ledger ERR: {e}")
+            with self._lock:
+                self._events[:0] = events
+                self._wake.set()
+            return False
+        with self._lock:
+            self._flushed_version = max(self._flushed_version, version)
+            self._flushes += 1
+        return True
+
+    def _flush_loop(self):
+        sync_due = getattr(self.store, "sync_due", None)
+        while not self._stop.is_set():
+            # ohne weitere Änderungen den aufgeschobenen Sync des letzten Writes nachholen
+            if not self._wake.wait(sync_due() if sync_due else None):
+                with self._flush_lock:
+                    self.store.sync()
+                continue
+            self._wake.clear()
+            if self.flush_interval:
+                self._stop.wait(self.flush_interval)   # Änderungen bündeln (close() bricht das Warten ab)
+            self.flush()
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+        # erst den Flush-Thread beenden, dann der letzte Flush
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not threading.current_thread():
+            self._thread.join(5.0)
+        self.flush()
+        self.store.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "positions": len(self._items),
+                "version": self._version,
+                "flushed": self._flushed_version,
+                "flushes": self._flushes,
+            }
@@ -0,0 +1,190 @@
+# prices.py — DexScreener-Preisorakel: Preise vieler Mints in wenigen Batch-Requests
+import time, threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Iterable, Callable
+from concurrent.futures import ThreadPoolExecutor
+
+from http_pool import get_session
+
+DS_TOKENS_URL = "https://api.dexscreener.com/tokens/v1/{chain}/{addrs}"
+DS_BATCH_MAX = 30   # DexScreener akzeptiert max. 30 Adressen pro Request
+
+def pick_native_price(pairs: List[Dict[str, Any]]) -> Optional[float]:
+    # bevorzugt SOL-Quote
+    for p in pairs:
+        q = ((p.get("quoteToken") or {}).get("symbol") or "").upper()
+        if q == "SOL":
+            try:
+                return float(p.get("priceNative"))
+            except Exception:
+                pass
+    # fallback: erster Pair
+    if pairs:
+        try:
+            return float(pairs[0].get("priceNative"))
+        except Exception:
+            return None
+    return None
+
+class PriceSnapshot:
+    """Preise (in SOL) mehrerer Mints zu einem gemeinsamen Zeitpunkt."""
+    __slots__ = ("ts", "prices")
+
+    def __init__(self, prices: Dict[str, float], ts: Optional[float] = None):
+        self.prices = prices
+        self.ts = time.time() if ts is None else ts
+
+    def get(self, mint: str) -> Optional[float]:
+        return self.prices.get(mint)
+
+    def __len__(self):
+        return len(self.prices)
+
+class PriceOracle:
+    def __init__(self, chain: str = "solana", timeout: int = 15, batch_size: int = DS_BATCH_MAX, workers: int = 4):
+        self.chain = chain
+        self.timeout = timeout
+        self.batch_size = max(1, min(DS_BATCH_MAX, batch_size))
+        self._pool = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="price")
+
+    def _fetch_batch(self, mints: List[str], timeout: int) -> Dict[str, List[Dict[str, Any]]]:
+        url = DS_TOKENS_URL.format(chain=self.chain, addrs=",".join(mints))
+        try:
+            r = get_session("dexscreener").get(url, timeout=timeout)
+            if r.status_code != 200:
+                print(f"[PRICE] batch({len(mints)}) -> {r.status_code}")
+                return {}
+            data = r.json() or []
+        except Exception as e:
+            print(f"[PRICE] batch({len(mints)}) -> ERR {e}")
+            return {}
+        pairs = data if isinstance(data, list) else (data.get("pairs") or [])
+        wanted = set(mints)
+        by_mint: Dict[str, List[Dict[str, Any]]] = {}
+        for p in pairs:
+            addr = (p.get("baseToken") or {}).get("address")
+            if addr in wanted:
+                by_mint.setdefault(addr, []).append(p)
+        return by_mint
+
+    def fetch(self, mints: Iterable[str], timeout: Optional[int] = None) -> PriceSnapshot:
+        """Ein Snapshot für alle Mints: ceil(n/30) Requests, parallel abgesetzt."""
+        uniq = list(dict.fromkeys(m for m in mints if m))
+        if not uniq:
+            return PriceSnapshot({})
+        t = timeout or self.timeout
+        chunks = [uniq[i:i + self.batch_size] for i in range(0, len(uniq), self.batch_size)]
+        prices: Dict[str, float] = {}
+        for by_mint in self._pool.map(lambda c: self._fetch_batch(c, t), chunks):
+            for mint, pairs in by_mint.items():
+                pr = pick_native_price(pairs)
+                if pr is not None:
+                    prices[mint] = pr
+        return PriceSnapshot(prices)
+
+class _Flight:
+    __slots__ = ("done", "price")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.price: Optional[float] = None
+
+class PriceCache:
+    """
+    Prozessweiter Preis-Cache: TTL pro Eintrag, LRU-Begrenzung und Single-Flight
+    (gleichzeitige Anfragen für denselben Mint teilen sich einen Request).
+    loader(mints) -> {mint: price}
+    """
+
+    def __init__(self, loader: Callable[[List[str]], Dict[str, float]], ttl: float = 5.0, max_size: int = 2048):
+        self._loader = loader
+        self.ttl = float(ttl)
+        self.max_size = max(1, int(max_size))
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()   # mint -> (price, ts)
+        self._inflight: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+        self._hits = self._misses = self._shared = self._evictions = 0
+        self._hit_age_sum = 0.0
+
+    def _put(self, mint: str, price: float, ts: float):
+        self._data[mint] = (price, ts)
+        self._data.move_to_end(mint)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def put(self, mint: str, price: float):
+        """Preis von außen einspeisen (z.B. Streaming-Feed)."""
+        with self._lock:
+            self._put(mint, price, time.time())
+
+    def get(self, mint: str, max_age: Optional[float] = None) -> Optional[float]:
+        return self.get_many([mint], max_age=max_age).get(mint)
+
+    def get_many(self, mints: Iterable[str], max_age: Optional[float] = None) -> PriceSnapshot:
+        ttl = self.ttl if max_age is None else max_age
+        now = time.time()
+        out: Dict[str, float] = {}
+        oldest = now
+        owned: Dict[str, _Flight] = {}
+        waiting: Dict[str, _Flight] = {}
+        with self._lock:
+            for m in dict.fromkeys(m for m in mints if m):
+                ent = self._data.get(m)
+                if ent is not None and now - ent[1] <= ttl:
+                    self._data.move_to_end(m)
+                    out[m] = ent[0]
+                    oldest = min(oldest, ent[1])
+                    self._hits += 1
+                    self._hit_age_sum += now - ent[1]
+                    continue
+                fl = self._inflight.get(m)
+                if fl is not None:
+                    waiting[m] = fl
+                    self._shared += 1
+                else:
+                    fl = self._inflight[m] = _Flight()
+                    owned[m] = fl
+                    self._misses += 1
+
+        if owned:
+            try:
+                loaded = self._loader(list(owned)) or {}
+            except Exception as e:
+                print(f"[PRICE] loader ERR: {e}")
+                loaded = {}
+            ts = time.time()
+            with self._lock:
+                for m, fl in owned.items():
+                    pr = loaded.get(m)
+                    if pr is not None:
+                        self._put(m, pr, ts)
+                        out[m] = pr
+                    fl.price = pr
+                    self._inflight.pop(m, None)
+            for fl in owned.values():
+                fl.done.set()
+
+        for m, fl in waiting.items():
+            fl.done.wait()
+            if fl.price is not None:
+                out[m] = fl.price
+        return PriceSnapshot(out, ts=oldest if out else now)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        with self._lock:
+            ages = [now - ts for (_, ts) in self._data.values()]
+            total = self._hits + self._misses + self._shared
+            return {
+                "size": len(self._data),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "shared": self._shared,
+                "evictions": self._evictions,
+                "hit_rate": (self._hits + self._shared) / total if total else 0.0,
+                "avg_hit_age": self._hit_age_sum / self._hits if self._hits else 0.0,
+                "max_age": max(ages) if ages else 0.0,
+            }
@@ -0,0 +1,364 @@
+# replay.py — Aufzeichnen und Wiederabspielen von Scans und Preis-Ticks
+# - Recorder: hängt rohe DexScreener-Scan-Antworten und Preis-Lookups mit Zeitstempel an
+#   gzip-komprimierte JSONL-Segmente an (Schreiben im Hintergrund-Thread, Rotation nach Zeit)
+# - Replay: spielt die Segmente so schnell wie möglich durch fetch_pairs -> filter_pairs/apply_strategy
+#   (über scan_pairs) und die Partial-TP-Exit-Logik; Uhr und HTTP-Schicht sind virtualisiert
+# ENV (Bot): RECORD_DIR=/data/rec  RECORD_SEGMENT_MIN=60
+# CLI:       python replay.py run DIR [--invest 1.0] [--verbose]
+#            python replay.py info DIR
+import atexit, glob, gzip, json, os, queue, sys, threading, time, zlib
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from pairs import _as_float
+
+# ===== Aufzeichnung =====
+_STOP = {"k": "stop"}   # Queue-Marke: Writer schließt das Segment und endet
+
+class Recorder:
+    """
+    Zeilen: {"t": ts, "k": "scan", "scan": id, "url": ..., "status": 200, "body": "..."}
+            {"t": ts, "k": "price", "prices": {mint: preis_in_sol}}
+    """
+
+    def __init__(self, folder: str, segment_sec: float = 3600.0, max_queue: int = 10000):
+        self.folder = folder
+        self.segment_sec = max(10.0, float(segment_sec))
+        os.makedirs(folder, exist_ok=True)
+        self._q: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max(1, int(max_queue)))
+        self._lock = threading.Lock()
+        self._scan_id = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.records = self.dropped = self.segments = 0
+        self.bytes_in = 0
+        atexit.register(self.close)
+
+    def next_scan_id(self) -> int:
+        with self._lock:
+            self._scan_id += 1
+            return self._scan_id
+
+    def scan(self, url: str, body: bytes, scan_id: Optional[int] = None, status: int = 200):
+        self.bytes_in += len(body or b"")
+        self._put({"t": time.time(), "k": "scan", "scan": scan_id, "url": url, "status": status,
+                   "body": (body or b"").decode("utf-8", errors="replace")})
+
+    def prices(self, prices: Dict[str, float]):
+        if prices:
+            self._put({"t": time.time(), "k": "price", "prices": dict(prices)})
+
+    def _put(self, rec: Dict[str, Any]):
+        # nie blockieren: Scan und Exits sind wichtiger als die Aufzeichnung
+        if self._closed:
+            return
+        try:
+            self._q.put_nowait(rec)
+        except queue.Full:
+            self.dropped += 1
+            return
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="recorder", daemon=True)
+                    self._thread.start()
+
+    def _open(self):
+        name = datetime.now(timezone.utc).strftime("rec-%Y%m%d-%H%M%S.jsonl.gz")
+        self.segments += 1
+        return gzip.open(os.path.join(self.folder, name), "at", encoding="utf-8"), time.time()
+
+    def close(self, timeout: float = 5.0):
+        """Queue leer schreiben und das Segment schließen (sonst fehlt der gzip-Trailer)."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            t = self._thread
+        if t is None:
+            return
+        try:
+            self._q.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("[REC] close: Queue voll – letztes Segment bleibt offen")
+            return
+        t.join(timeout)
+
+    def _run(self):
+        f, opened = self._open()
+        last_flush = time.time()
+        while True:
+            try:
+                rec = self._q.get(timeout=1.0)
+            except queue.Empty:
+                rec = None
+            if rec is _STOP:
+                try:
+                    f.close()
+                except Exception as e:
+                    print(f"[REC] close ERR: {e}")
+                return
+            now = time.time()
+            try:
+                if rec is not None:
+                    if now - opened >= self.segment_sec:
+                        f.close()
+                        f, opened = self._open()
+                    f.write(json.dumps(rec, separators=(",", ":")) + "\n")
+                    self.records += 1
+                if now - last_flush >= 1.0:
+                    # Sync-Flush: nach einem Absturz fehlt höchstens die letzte Sekunde
+                    f.flush()
+                    last_flush = now
+            except Exception as e:
+                print(f"[REC] ERR: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {"records": self.records, "queued": self._q.qsize(), "dropped": self.dropped,
+                "segments": self.segments, "bytes_in": self.bytes_in}
+
+def recorder_from_env() -> Optional[Recorder]:
+    folder = os.getenv("RECORD_DIR") or ""
+    if not folder:
+        return None
+    seg = _as_float(os.getenv("RECORD_SEGMENT_MIN", "60"), 60.0) * 60.0
+    print(f"[REC] Aufzeichnung nach {folder} (Segmente {seg / 60:.0f} min)")
+    return Recorder(folder, segment_sec=seg)
+
+# ===== Lesen =====
+def segment_files(folder: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(folder, "rec-*.jsonl.gz")))
+
+def iter_records(folder: str) -> Iterator[Dict[str, Any]]:
+    """Alle Records in Segment-Reihenfolge; abgeschnittene Segmente (Absturz) enden beim letzten ganzen Record."""
+    for path in segment_files(folder):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        break   # halbe Zeile am Segmentende
+        except (EOFError, OSError, zlib.error) as e:
+            print(f"[REPLAY] {os.path.basename(path)} unvollständig: {e}")
+
+def iter_frames(folder: str) -> Iterator[Dict[str, Any]]:
+    """
+    Fasst die Records zu Frames zusammen:
+    {"k": "scan", "t": ts, "bodies": {url: (status, body)}} oder {"k": "price", "t": ts, "prices": {...}}
+    """
+    cur: Optional[Dict[str, Any]] = None
+    for r in iter_records(folder):
+        if r.get("k") == "scan":
+            if cur is not None and cur["scan"] == r.get("scan") and r.get("scan") is not None:
+                cur["bodies"][r["url"]] = (r.get("status", 200), r.get("body") or "")
+                continue
+            if cur is not None:
+                yield cur
+            cur = {"k": "scan", "t": r["t"], "scan": r.get("scan"),
+                   "bodies": {r["url"]: (r.get("status", 200), r.get("body") or "")}}
+        elif r.get("k") == "price":
+            if cur is not None:
+                yield cur
+                cur = None
+            yield {"k": "price", "t": r["t"], "prices": r.get("prices") or {}}
+    if cur is not None:
+        yield cur
+
+# ===== Virtuelle Uhr / HTTP =====
+class VirtualClock:
+    """Ersatz für das time-Modul in den abgespielten Modulen: sleep() springt, statt zu warten."""
+
+    def __init__(self, t: float = 0.0):
+        self.t = float(t)
+        self.perf_counter = time.perf_counter
+        self.monotonic = self.time
+
+    def time(self) -> float:
+        return self.t
+
+    def sleep(self, sec: float):
+        self.t += max(0.0, float(sec))
+
+    def set(self, t: float):
+        self.t = max(self.t, float(t))
+
+    def now_us(self, now=None) -> int:
+        return int(self.t * 1_000_000)
+
+class _ReplayResponse:
+    def __init__(self, status: int, body: bytes):
+        self.status_code = status
+        self.content = body
+
+    def iter_content(self, chunk_size: int = 65536):
+        for i in range(0, len(self.content), chunk_size):
+            yield self.content[i:i + chunk_size]
+
+    def json(self):
+        return json.loads(self.content)
+
+    def close(self):
+        pass
+
+class ReplaySession:
+    """Beantwortet GETs aus dem aktuellen Frame; unbekannte URLs -> 404 (wie eine ausgefallene Quelle)."""
+
+    def __init__(self):
+        self.bodies: Dict[str, tuple] = {}
+        self.requests = self.misses = 0
+
+    def get(self, url: str, params=None, timeout=None, stream: bool = False, **kw) -> _ReplayResponse:
+        self.requests += 1
+        hit = self.bodies.get(url)
+        if hit is None:
+            self.misses += 1
+            return _ReplayResponse(404, b"")
+        status, body = hit
+        return _ReplayResponse(int(status), body.encode("utf-8") if isinstance(body, str) else body)
+
+# ===== Replay-Treiber =====
+class Replay:
+    """
+    Spielt eine Aufzeichnung durch die Scan-Pipeline und die Exit-Engine des Bots.
+    Auto-Buy wie live (Top-1 je Scan, falls nicht gehalten) mit fester Einsatzgröße;
+    ausgeführt wird virtuell zum letzten bekannten Preis.
+    """
+
+    def __init__(self, folder: str, invest_sol: float = 1.0, verbose: bool = False):
+        self.folder = folder
+        self.invest_sol = float(invest_sol)
+        self.verbose = verbose
+        self.clock = VirtualClock()
+        self.session = ReplaySession()
+        self.positions: Dict[str, Dict[str, Any]] = {}   # mint -> {entry, left, symbol}
+        self.last_price: Dict[str, float] = {}
+        self.result: Dict[str, Any] = {
+            "frames": 0, "scans": 0, "price_frames": 0, "pairs": 0, "hits": 0, "ticks": 0,
+            "buys": 0, "exits": {}, "realized_sol": 0.0,
+        }
+
+    def _install(self):
+        # Uhr und HTTP der abgespielten Module ersetzen (nur in diesem Prozess)
+        os.environ.setdefault("DRY_RUN", "1")
+        import bot, exit_engine, scan_index, vector_engine, http_pool
+        # sequentiell: Merge, Dedup und STRAT_MAX_ITEMS in aufgezeichneter Reihenfolge (wie sweep.py),
+        # nicht in Ankunftsreihenfolge des Thread-Pools -> zwei Replays derselben Daten sind gleich
+        bot.CONFIG["SCAN_CONCURRENT"] = 0
+        bot.time = self.clock
+        bot._now_us = self.clock.now_us
+        vector_engine._now_us = self.clock.now_us
+        scan_index.time = self.clock
+        exit_engine.time = self.clock
+        bot._rec = None
+        with http_pool._lock:
+            http_pool._sessions["dexscreener"] = self.session
+        self.bot = bot
+        self.exits = exit_engine.ExitEngine(bot.CONFIG, on_signal=lambda s: None)
+
+    def _open(self, mint: str, symbol: str, price: float):
+        self.positions[mint] = {"entry": price, "left": 1.0, "symbol": symbol}
+        self.exits.track({"mint": mint, "symbol": symbol, "entry_price_sol": price})
+        self.result["buys"] += 1
+
+    def _fill(self, sig):
+        pos = self.positions.get(sig.mint)
+        if pos is None:
+            return
+        frac = pos["left"] * max(0.0, min(100.0, sig.pct)) / 100.0
+        pos["left"] -= frac
+        self.result["realized_sol"] += self.invest_sol * frac * (sig.price / pos["entry"] - 1.0)
+        self.result["exits"][sig.kind] = self.result["exits"].get(sig.kind, 0) + 1
+        if sig.closes or pos["left"] <= 1e-9:
+            self.positions.pop(sig.mint, None)
+            self.exits.untrack(sig.mint)
+
+    def _tick(self, prices: Dict[str, float]):
+        self.last_price.update(prices)
+        held = {m: p for m, p in prices.items() if m in self.positions}
+        self.result["ticks"] += len(held)
+        for sig in self.exits.process(held):
+            self._fill(sig)
+
+    def _scan(self, frame: Dict[str, Any]):
+        b = self.bot
+        self.session.bodies = frame["bodies"]
+        b.CONFIG["SCAN_SOURCES"] = list(frame["bodies"])
+        raw = b.fetch_pairs()
+        self.clock.t = frame["t"]   # Pausen zwischen den Quellen nicht in Alters-Filter einrechnen (wie sweep.py)
+        hits = b.scan_pairs(raw)
+        self.result["pairs"] += len(raw)
+        self.result["hits"] += len(hits)
+        # Scan-Antworten enthalten Preise aller Pairs -> auch als Ticks für gehaltene Mints
+        self._tick({p.base_address: p.price_native for p in raw if p.base_address and p.price_native})
+        if b.CONFIG["AUTO_BUY"] == 1 and hits:
+            p = hits[0][0]
+            if p.base_address and p.base_address not in self.positions and p.price_native:
+                self._open(p.base_address, p.base_symbol or p.base_address[:6], p.price_native)
+
+    def run(self) -> Dict[str, Any]:
+        first = last = None
+        sink = sys.stdout if self.verbose else open(os.devnull, "w")
+        try:
+            with redirect_stdout(sink):
+                # import bot schreibt [WALLET]/[PAPER]/[POS]-Zeilen -> ebenfalls umgeleitet,
+                # damit stdout von "replay.py run" reines JSON bleibt
+                self._install()
+                t0 = time.perf_counter()
+                for frame in iter_frames(self.folder):
+                    self.clock.set(frame["t"])
+                    first = frame["t"] if first is None else first
+                    last = frame["t"]
+                    self.result["frames"] += 1
+                    if frame["k"] == "scan":
+                        self.result["scans"] += 1
+                        self._scan(frame)
+                    else:
+                        self.result["price_frames"] += 1
+                        self._tick({m: float(p) for m, p in frame["prices"].items() if p})
+        finally:
+            if sink is not sys.stdout:
+                sink.close()
+        wall = time.perf_counter() - t0
+        unrealized = sum(self.invest_sol * pos["left"] * (self.last_price.get(m, pos["entry"]) / pos["entry"] - 1.0)
+                         for m, pos in self.positions.items())
+        r = self.result
+        r.update({
+            "open": len(self.positions),
+            "unrealized_sol": unrealized,
+            "span_sec": (last - first) if first is not None else 0.0,
+            "wall_sec": wall,
+            "speedup": ((last - first) / wall) if first is not None and wall > 0 else 0.0,
+            "pairs_per_sec": r["pairs"] / wall if wall > 0 else 0.0,
+            "http_requests": self.session.requests,
+            "http_misses": self.session.misses,
+        })
+        return r
+
+# ===== CLI =====
+def _info(folder: str) -> Dict[str, Any]:
+    out = {"segments": len(segment_files(folder)), "scans": 0, "price_frames": 0, "first": None, "last": None}
+    for fr in iter_frames(folder):
+        out["scans" if fr["k"] == "scan" else "price_frames"] += 1
+        out["first"] = fr["t"] if out["first"] is None else out["first"]
+        out["last"] = fr["t"]
+    return out
+
+def main(argv: List[str]):
+    if len(argv) < 2 or argv[0] not in ("run", "info"):
+        print("Usage: python replay.py run DIR [--invest SOL] [--verbose] | info DIR")
+        return 2
+    folder = argv[1]
+    if argv[0] == "info":
+        print(json.dumps(_info(folder), indent=2))
+        return 0
+    invest = 1.0
+    if "--invest" in argv:
+        invest = _as_float(argv[argv.index("--invest") + 1], 1.0)
+    res = Replay(folder, invest_sol=invest, verbose="--verbose" in argv).run()
+    print(json.dumps(res, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
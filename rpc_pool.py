@@ -0,0 +1,202 @@
+# rpc_pool.py — Pool mehrerer Solana-RPC-Endpoints mit Latenz-/Fehler-Scoring
+# - Reads gehen an den schnellsten gesunden Endpoint, bei Fehlern weiter zum nächsten
+# - sendTransaction optional parallel an mehrere Endpoints (RPC_BROADCAST=1)
+# - getSignatureStatuses fragt mehrere Endpoints parallel, die erste Meldung zählt
+# ENV: SOLANA_RPC_URLS="https://a,https://b" (sonst Einzel-URL wie bisher)
+import base64, os, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Any, Optional
+
+from http_pool import get_session
+
+class RpcError(RuntimeError):
+    """Fehlerantwort des RPC-Knotens (kein Transportfehler, zählt nicht gegen die Gesundheit)."""
+
+class RpcEndpoint:
+    __slots__ = ("url", "ewma_ms", "err_rate", "calls", "errors", "streak", "cooldown_until", "last_error")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.ewma_ms: Optional[float] = None
+        self.err_rate = 0.0
+        self.calls = self.errors = self.streak = 0
+        self.cooldown_until = 0.0
+        self.last_error = ""
+
+    def healthy(self, now: float) -> bool:
+        return now >= self.cooldown_until
+
+    def score(self) -> float:
+        # ungemessene Endpoints zuerst (einmal proben), sonst Latenz mit Fehler-Aufschlag
+        if self.ewma_ms is None:
+            return 0.0
+        return self.ewma_ms * (1.0 + 4.0 * self.err_rate)
+
+    def ok(self, ms: float, alpha: float):
+        self.calls += 1
+        self.streak = 0
+        self.ewma_ms = ms if self.ewma_ms is None else (1 - alpha) * self.ewma_ms + alpha * ms
+        self.err_rate *= (1 - alpha)
+
+    def fail(self, err: str, alpha: float):
+        self.calls += 1
+        self.errors += 1
+        self.streak += 1
+        self.last_error = err[:200]
+        self.err_rate = (1 - alpha) * self.err_rate + alpha
+        self.cooldown_until = time.time() + min(60.0, 2.0 ** self.streak)
+
+def urls_from_env(default: str) -> List[str]:
+    raw = os.getenv("SOLANA_RPC_URLS") or ""
+    urls = [u.strip() for u in raw.split(",") if u.strip()]
+    return list(dict.fromkeys(urls)) or [default]
+
+class RpcPool:
+    def __init__(self, urls: List[str], timeout: float = 15.0, broadcast: bool = False,
+                 confirm_fanout: int = 2, alpha: float = 0.3):
+        if not urls:
+            raise ValueError("RpcPool braucht mindestens eine URL")
+        self.endpoints = [RpcEndpoint(u) for u in urls]
+        self.timeout = float(timeout)
+        self.broadcast = broadcast
+        self.confirm_fanout = max(1, int(confirm_fanout))
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._exec = ThreadPoolExecutor(max_workers=max(4, 2 * len(urls)), thread_name_prefix="rpc")
+        self._probe_thread: Optional[threading.Thread] = None
+        self.sends = self.send_endpoints = 0
+        self.first_status_by: Dict[str, int] = {}
+
+    # ---------- Auswahl ----------
+    def ranked(self) -> List[RpcEndpoint]:
+        """Gesunde Endpoints nach Score, danach die im Cooldown (als letzter Ausweg)."""
+        now = time.time()
+        with self._lock:
+            order = sorted(enumerate(self.endpoints), key=lambda ie: (not ie[1].healthy(now), ie[1].score(), ie[0]))
+        return [e for _, e in order]
+
+    def best(self) -> RpcEndpoint:
+        return self.ranked()[0]
+
+    @property
+    def url(self) -> str:
+        return self.best().url
+
+    # ---------- Calls ----------
+    def _post(self, ep: RpcEndpoint, method: str, params: list, timeout: Optional[float] = None) -> Any:
+        body = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        t0 = time.perf_counter()
+        try:
+            r = get_session("rpc").post(ep.url, json=body, timeout=timeout or self.timeout)
+            r.raise_for_status()
+            data = r.json()
+        except Exception as e:
+            with self._lock:
+                ep.fail(str(e), self.alpha)
+            raise
+        with self._lock:
+            ep.ok((time.perf_counter() - t0) * 1000.0, self.alpha)
+        if data.get("error"):
+            raise RpcError(data["error"])
+        return data.get("result")
+
+    def call(self, method: str, params: list, timeout: Optional[float] = None) -> Any:
+        """Read an den besten Endpoint; Transportfehler -> nächster Endpoint."""
+        last: Optional[Exception] = None
+        for ep in self.ranked():
+            try:
+                return self._post(ep, method, params, timeout)
+            except RpcError:
+                raise
+            except Exception as e:
+                last = e
+        raise last if last else RuntimeError("kein RPC-Endpoint erreichbar")
+
+    def send_transaction(self, raw_tx: bytes, skip_preflight: bool = False, max_retries: int = 3) -> str:
+        """Signierte TX senden; mit broadcast an alle gesunden Endpoints parallel, erste Signatur zählt."""
+        params = [base64.b64encode(raw_tx).decode(),
+                  {"encoding": "base64", "skipPreflight": skip_preflight,
+                   "preflightCommitment": "confirmed", "maxRetries": max_retries}]
+        ranked = self.ranked()
+        now = time.time()
+        targets = [e for e in ranked if e.healthy(now)] if self.broadcast else []
+        if len(targets) <= 1:
+            self.sends += 1
+            self.send_endpoints += 1
+            return self.call("sendTransaction", params)
+        self.sends += 1
+        self.send_endpoints += len(targets)
+        futs = [self._exec.submit(self._post, ep, "sendTransaction", params) for ep in targets]
+        errors = []
+        for f in as_completed(futs):
+            try:
+                sig = f.result()
+                if sig:
+                    return sig
+            except Exception as e:
+                errors.append(e)
+        # Preflight-Fehler des Knotens direkt durchreichen, sonst den letzten Transportfehler
+        for e in errors:
+            if isinstance(e, RpcError):
+                raise e
+        raise errors[-1] if errors else RuntimeError("sendTransaction ohne Signatur")
+
+    def signature_statuses(self, sigs: List[str], search_history: bool = False) -> List[Optional[Dict[str, Any]]]:
+        """Status je Signatur; mehrere Endpoints parallel, pro Signatur zählt die erste Meldung."""
+        params = [sigs, {"searchTransactionHistory": search_history}]
+        now = time.time()
+        targets = [e for e in self.ranked() if e.healthy(now)][:self.confirm_fanout]
+        if len(targets) <= 1:
+            return ((self.call("getSignatureStatuses", params) or {}).get("value")) or [None] * len(sigs)
+        out: List[Optional[Dict[str, Any]]] = [None] * len(sigs)
+        futs = {self._exec.submit(self._post, ep, "getSignatureStatuses", params): ep for ep in targets}
+        answered = False
+        for f in as_completed(futs):
+            try:
+                values = ((f.result() or {}).get("value")) or []
+            except Exception:
+                continue
+            answered = True
+            for i, v in enumerate(values[:len(sigs)]):
+                if v is not None and out[i] is None:
+                    out[i] = v
+                    with self._lock:
+                        self.first_status_by[futs[f].url] = self.first_status_by.get(futs[f].url, 0) + 1
+            if all(v is not None for v in out):
+                break   # alle gemeldet – langsamere Endpoints nicht abwarten
+        if not answered:
+            raise RuntimeError("getSignatureStatuses: kein Endpoint erreichbar")
+        return out
+
+    # ---------- Gesundheit ----------
+    def probe(self):
+        """Alle Endpoints mit getSlot anpingen (aktualisiert Latenz und Cooldowns)."""
+        futs = [self._exec.submit(self._post, ep, "getSlot", [], min(5.0, self.timeout)) for ep in self.endpoints]
+        for f in futs:
+            try:
+                f.result()
+            except Exception:
+                pass
+
+    def start_probing(self, interval: float = 30.0):
+        if self._probe_thread is None and len(self.endpoints) > 1 and interval > 0:
+            def loop():
+                while True:
+                    self.probe()
+                    time.sleep(interval)
+            self._probe_thread = threading.Thread(target=loop, name="rpc-probe", daemon=True)
+            self._probe_thread.start()
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.time()
+        with self._lock:
+            return [{
+                "url": e.url,
+                "healthy": e.healthy(now),
+                "ewma_ms": e.ewma_ms,
+                "err_rate": e.err_rate,
+                "calls": e.calls,
+                "errors": e.errors,
+                "first_status": self.first_status_by.get(e.url, 0),
+                "last_error": e.last_error,
+            } for e in self.endpoints]
@@ -1,7 +1,9 @@
 
-import json, os
+import copy, json, os, tempfile, threading, time
+from typing import Callable, List, Optional, Tuple
 
 _STATE_FILE = os.getenv("STATE_FILE", "runtime_state.json")
+_CHECK_SEC = max(0.0, float(os.getenv("STATE_CHECK_MS", "250")) / 1000.0)   # wie oft die Datei auf Änderungen geprüft wird
 
 _DEFAULT_STATE = {
     "strategy": (os.getenv("STRATEGY", "dexscreener") or "dexscreener").lower(),
@@ -10,33 +12,118 @@ _DEFAULT_STATE = {
     }
 }
 
-def _read() -> dict:
+# In-Memory-Cache: neu geladen nur wenn sich mtime/inode/size der Datei ändern
+_lock = threading.RLock()
+_cache: Optional[dict] = None
+_sig: Optional[Tuple[int, int, int]] = None
+_checked_at = 0.0
+_subscribers: List[Callable[[dict, dict], None]] = []
+_watcher: Optional[threading.Thread] = None
+
+def _stat_sig() -> Optional[Tuple[int, int, int]]:
+    try:
+        st = os.stat(_STATE_FILE)
+        return (st.st_mtime_ns, st.st_ino, st.st_size)
+    except OSError:
+        return None
+
+def _load() -> dict:
     try:
         with open(_STATE_FILE, "r") as f:
             return json.load(f)
     except Exception:
-        return dict(_DEFAULT_STATE)
+        return copy.deepcopy(_DEFAULT_STATE)
+
+def _notify(old: dict, new: dict):
+    for fn in list(_subscribers):
+        try:
+            fn(old, new)
+        except Exception as e:
+            print(f"[STATE] Subscriber ERR: {e}")
+
+def _read(force: bool = False) -> dict:
+    """Gecachter Zustand (nicht verändern!); prüft die Datei höchstens alle STATE_CHECK_MS."""
+    global _cache, _sig, _checked_at
+    now = time.monotonic()
+    with _lock:
+        if _cache is not None and not force and now - _checked_at < _CHECK_SEC:
+            return _cache
+        _checked_at = now
+        sig = _stat_sig()
+        if _cache is not None and sig == _sig:
+            return _cache
+        old, data = _cache, _load()
+        _cache, _sig = data, sig
+    if old is not None and old != data:
+        _notify(old, data)
+    return data
 
 def _write(d: dict):
-    with open(_STATE_FILE, "w") as f:
-        json.dump(d, f, indent=2)
+    # atomar: temporäre Datei im selben Verzeichnis, fsync, dann rename
+    global _cache, _sig, _checked_at
+    with _lock:
+        old = _cache
+        folder = os.path.dirname(os.path.abspath(_STATE_FILE))
+        fd, tmp = tempfile.mkstemp(prefix=".runtime_state.", suffix=".tmp", dir=folder)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(d, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, _STATE_FILE)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+        _cache, _sig, _checked_at = d, _stat_sig(), time.monotonic()
+    if old != d:
+        _notify(old if old is not None else copy.deepcopy(_DEFAULT_STATE), d)
 
 def get_state() -> dict:
-    return _read()
+    return dict(_read())
 
 def set_state(patch: dict):
-    data = _read()
-    data.update(patch)
-    _write(data)
+    with _lock:
+        data = copy.deepcopy(_read(force=True))
+        data.update(patch)
+        _write(data)
     return data
 
 def set_override(key: str, value):
-    data = _read()
-    ov = data.get("overrides") or {}
-    ov[key] = value
-    data["overrides"] = ov
-    _write(data)
+    with _lock:
+        data = copy.deepcopy(_read(force=True))
+        ov = data.get("overrides") or {}
+        ov[key] = value
+        data["overrides"] = ov
+        _write(data)
     return data
 
 def get_overrides() -> dict:
+    # gecachtes Dict – nur lesen
     return (_read().get("overrides") or {})
+
+def subscribe(fn: Callable[[dict, dict], None]):
+    """fn(alt, neu) bei jeder Änderung (eigene Writes sofort, externe beim nächsten Check)."""
+    with _lock:
+        if fn not in _subscribers:
+            _subscribers.append(fn)
+
+def unsubscribe(fn: Callable[[dict, dict], None]):
+    with _lock:
+        if fn in _subscribers:
+            _subscribers.remove(fn)
+
+def start_watcher(interval: float = 1.0):
+    """Hintergrund-Thread, der externe Änderungen an der Datei auch ohne Lesezugriffe meldet."""
+    global _watcher
+    with _lock:
+        if _watcher is not None:
+            return
+        def loop():
+            while True:
+                time.sleep(max(0.05, interval))
+                _read(force=True)
+        _watcher = threading.Thread(target=loop, name="state-watch", daemon=True)
+        _watcher.start()
@@ -0,0 +1,86 @@
+# scan_index.py — Begrenzter Index bereits bewerteter Pairs (LRU + TTL, Schlüssel pairAddress)
+# - Speichert pro Pair die zuletzt bewerteten Rohmetriken und das Ergebnis (Treffer-Tupel oder verworfen)
+# - Unveränderte Pairs werden übersprungen, nur neue oder wesentlich veränderte neu bewertet
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
+
+from pairs import PairSnapshot
+
+def _fingerprint(p: PairSnapshot) -> Tuple:
+    return (p.chain_id, p.url, p.quote_symbol, p.created_ms, p.liq, p.fdv, p.vol5, p.best_vol)
+
+def _material_change(old: Tuple, new: Tuple, rescore_pct: float) -> bool:
+    if old[:4] != new[:4]:
+        return True
+    if rescore_pct <= 0:
+        return old != new
+    for a, b in zip(old[4:], new[4:]):
+        if a == b:
+            continue
+        base = max(abs(a), abs(b))
+        if not base or base != base or abs(a - b) / base * 100.0 > rescore_pct:
+            return True
+    return False
+
+class _Seen:
+    __slots__ = ("fp", "verdict", "sig", "ts")
+
+    def __init__(self, fp, verdict, sig, ts):
+        self.fp, self.verdict, self.sig, self.ts = fp, verdict, sig, ts
+
+class SeenPairIndex:
+    def __init__(self, max_size: int = 20000, ttl: float = 600.0, rescore_pct: float = 5.0):
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl)
+        self.rescore_pct = float(rescore_pct)
+        self._idx: "OrderedDict[str, _Seen]" = OrderedDict()
+        self.last = {"new": 0, "rescored": 0, "skipped": 0, "at": 0.0}
+        self.totals = {"new": 0, "rescored": 0, "skipped": 0, "scans": 0, "evictions": 0}
+
+    def __len__(self):
+        return len(self._idx)
+
+    def partition(self, pairs: List[PairSnapshot], sig: Tuple) -> Tuple[List[PairSnapshot], Dict[str, Optional[tuple]]]:
+        """
+        Teilt einen Scan in (zu bewerten, bekannte Ergebnisse).
+        bekannte Ergebnisse: pid -> Treffer-Tupel (liq, fdv, vol5, bestv) oder None (verworfen).
+        """
+        now = time.time()
+        fresh: List[PairSnapshot] = []
+        known: Dict[str, Optional[tuple]] = {}
+        n_new = n_re = n_skip = 0
+        for p in pairs:
+            pid = p.pid
+            ent = self._idx.get(pid) if pid else None
+            if ent is None:
+                n_new += 1
+                fresh.append(p)
+                continue
+            if ent.sig != sig or now - ent.ts > self.ttl or _material_change(ent.fp, _fingerprint(p), self.rescore_pct):
+                n_re += 1
+                fresh.append(p)
+                continue
+            self._idx.move_to_end(pid)
+            n_skip += 1
+            known[pid] = ent.verdict
+        self.last = {"new": n_new, "rescored": n_re, "skipped": n_skip, "at": now}
+        self.totals["new"] += n_new
+        self.totals["rescored"] += n_re
+        self.totals["skipped"] += n_skip
+        self.totals["scans"] += 1
+        return fresh, known
+
+    def store(self, p: PairSnapshot, verdict: Optional[tuple], sig: Tuple):
+        pid = p.pid
+        if not pid:
+            return
+        self._idx[pid] = _Seen(_fingerprint(p), verdict, sig, time.time())
+        self._idx.move_to_end(pid)
+        while len(self._idx) > self.max_size:
+            self._idx.popitem(last=False)
+            self.totals["evictions"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._idx), "max_size": self.max_size, "ttl": self.ttl,
+                "rescore_pct": self.rescore_pct, "last": dict(self.last), "totals": dict(self.totals)}
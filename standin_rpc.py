@@ -0,0 +1,247 @@
+# standin_rpc.py — Lokale Stand-in-Server für Solana-RPC (Tests/Entwicklung ohne Mainnet)
+# - WsRpcStandin: accountSubscribe/accountUnsubscribe, Notifications per push_account()
+# - HttpRpcStandin: JSON-RPC über HTTP (getSlot, getBlockHeight, getBalance, getMultipleAccounts, sendTransaction,
+#   getSignatureStatuses …) mit einstellbarer Latenz, Fehlerquote und Bestätigungsdauer
+# Start: python standin_rpc.py ws [--port 8900]  (schickt eine zufällige pump.fun-Kurve)
+#        python standin_rpc.py http [--port 8899] [--latency-ms N]
+import asyncio, base64, json, struct, sys, threading, random, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Set
+
+import base58
+
+def pumpfun_curve_bytes(price_sol: float, virtual_tokens: float = 1e9) -> bytes:
+    """Bonding-Curve-Account mit virtuellen Reserven passend zu price_sol (Token 6, SOL 9 Dezimalen)."""
+    vtok = int(virtual_tokens * 1e6)
+    vsol = int(price_sol * virtual_tokens * 1e9)
+    return b"\x17\xb7\xf8\x37\x60\xd8\xac\x60" + struct.pack("<QQQQQ?", vtok, vsol, vtok, vsol, vtok, False)
+
+def base64_account(data: bytes, owner: str = "11111111111111111111111111111111") -> Dict[str, Any]:
+    return {"data": [base64.b64encode(data).decode(), "base64"], "owner": owner,
+            "lamports": 1, "executable": False, "rentEpoch": 0}
+
+def token_account(ui_amount: float, decimals: int = 6) -> Dict[str, Any]:
+    raw = int(round(ui_amount * 10 ** decimals))
+    return {"data": {"program": "spl-token", "parsed": {"type": "account", "info": {
+                "tokenAmount": {"amount": str(raw), "decimals": decimals, "uiAmount": ui_amount}}}},
+            "owner": "TokenkegQfeZyiNwAJbNbGKPFXCWuBvf9Ss623VQ5DA", "lamports": 1, "executable": False, "rentEpoch": 0}
+
+class WsRpcStandin:
+    """Minimaler Solana-Websocket-Server in eigenem Thread: ws://127.0.0.1:<port>."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._done: Optional[asyncio.Future] = None
+        self._thread: Optional[threading.Thread] = None
+        self._ready = threading.Event()
+        self._next_sub = 1
+        self._subs: Dict[int, tuple] = {}               # sub-id -> (ws, account)
+        self.subscribed: Set[str] = set()
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> "WsRpcStandin":
+        self._thread = threading.Thread(target=lambda: asyncio.run(self._serve()), name="ws-standin", daemon=True)
+        self._thread.start()
+        self._ready.wait(5)
+        return self
+
+    def stop(self):
+        # Future auflösen -> async with schließt Server und Verbindungen, asyncio.run beendet den Loop
+        if self._loop and self._done:
+            self._loop.call_soon_threadsafe(lambda: self._done.done() or self._done.set_result(None))
+        if self._thread:
+            self._thread.join(5)
+
+    async def _serve(self):
+        import websockets
+        self._loop = asyncio.get_running_loop()
+        self._done = self._loop.create_future()
+        async with websockets.serve(self._handler, self.host, self.port) as server:
+            self.port = server.sockets[0].getsockname()[1]
+            self._ready.set()
+            await self._done
+
+    async def _handler(self, ws, path=None):
+        try:
+            async for raw in ws:
+                msg = json.loads(raw)
+                self.requests += 1
+                method, rid, params = msg.get("method"), msg.get("id"), msg.get("params") or []
+                if method == "accountSubscribe":
+                    sid = self._next_sub
+                    self._next_sub += 1
+                    self._subs[sid] = (ws, params[0])
+                    self.subscribed.add(params[0])
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "result": sid}))
+                elif method == "accountUnsubscribe":
+                    ent = self._subs.pop(params[0], None)
+                    if ent:
+                        self.subscribed.discard(ent[1])
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": rid, "result": ent is not None}))
+                else:
+                    await ws.send(json.dumps({"jsonrpc": "2.0", "id": rid,
+                                              "error": {"code": -32601, "message": "Method not found"}}))
+        finally:
+            for sid in [sid for sid, (w, _) in self._subs.items() if w is ws]:
+                self.subscribed.discard(self._subs.pop(sid)[1])
+
+    async def _push(self, account: str, value: Dict[str, Any], slot: int):
+        for sid, (ws, a) in list(self._subs.items()):
+            if a == account:
+                await ws.send(json.dumps({"jsonrpc": "2.0", "method": "accountNotification", "params": {
+                    "subscription": sid, "result": {"context": {"slot": slot}, "value": value}}}))
+
+    def push_account(self, account: str, value: Dict[str, Any], slot: int = 0):
+        """Account-Update an alle Abonnenten von account schicken (thread-safe)."""
+        asyncio.run_coroutine_threadsafe(self._push(account, value, slot), self._loop).result(5)
+
+class HttpRpcStandin:
+    """
+    Minimaler Solana-JSON-RPC über HTTP in eigenem Thread: http://127.0.0.1:<port>.
+    latency (s) verzögert jede Antwort, fail_rate liefert zufällig HTTP 503,
+    confirm_after (s) bestimmt, wann gesendete Transaktionen als confirmed gemeldet werden
+    (None = dieser Knoten sieht sie nie). fail_tx: Signaturen, die mit err landen.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0,
+                 fail_rate: float = 0.0, confirm_after: Optional[float] = 0.2):
+        self.host = host
+        self.port = port
+        self.latency = latency
+        self.fail_rate = fail_rate
+        self.confirm_after = confirm_after
+        self.slot = 1
+        self.block_height = 1000
+        self.balances: Dict[str, int] = {}                    # Adresse -> Lamports
+        self.accounts: Dict[str, Dict[str, Any]] = {}         # Adresse -> Account-Value (jsonParsed/base64)
+        self.sent: Dict[str, float] = {}                      # Signatur -> Empfangszeit
+        self.fail_tx: Set[str] = set()
+        self.calls: Dict[str, int] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "HttpRpcStandin":
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if standin.latency:
+                    time.sleep(standin.latency)
+                if standin.fail_rate and random.random() < standin.fail_rate:
+                    self.send_response(503)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                msg = json.loads(body)
+                out = json.dumps(standin._dispatch(msg)).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(out)))
+                self.end_headers()
+                self.wfile.write(out)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, name="http-standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def _dispatch(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        method, rid, params = msg.get("method"), msg.get("id"), msg.get("params") or []
+        self.calls[method] = self.calls.get(method, 0) + 1
+        self.slot += 1
+        ctx = {"slot": self.slot}
+
+        def ok(result):
+            return {"jsonrpc": "2.0", "id": rid, "result": result}
+
+        if method == "getSlot":
+            return ok(self.slot)
+        if method == "getBlockHeight":
+            return ok(self.block_height)
+        if method == "getHealth":
+            return ok("ok")
+        if method == "getBalance":
+            return ok({"context": ctx, "value": self.balances.get(params[0], 0)})
+        if method == "getAccountInfo":
+            return ok({"context": ctx, "value": self.accounts.get(params[0])})
+        if method == "getMultipleAccounts":
+            vals = []
+            for a in params[0]:
+                v = self.accounts.get(a)
+                if v is None and a in self.balances:
+                    v = {"data": ["", "base64"], "owner": "11111111111111111111111111111111",
+                         "lamports": self.balances[a], "executable": False, "rentEpoch": 0}
+                vals.append(v)
+            return ok({"context": ctx, "value": vals})
+        if method == "getTokenAccountBalance":
+            v = self.accounts.get(params[0])
+            try:
+                ta = v["data"]["parsed"]["info"]["tokenAmount"]
+            except Exception:
+                return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32602, "message": "could not find account"}}
+            return ok({"context": ctx, "value": ta})
+        if method == "sendTransaction":
+            raw = base64.b64decode(params[0])
+            sig = base58.b58encode(raw[1:65]).decode()   # Wire-Format: compact-u16 Anzahl, dann die erste Signatur
+            self.sent.setdefault(sig, time.time())
+            return ok(sig)
+        if method == "getSignatureStatuses":
+            now, vals = time.time(), []
+            for sig in params[0]:
+                t = self.sent.get(sig)
+                if t is None or self.confirm_after is None or now - t < self.confirm_after:
+                    vals.append(None)
+                else:
+                    err = {"InstructionError": [0, {"Custom": 1}]} if sig in self.fail_tx else None
+                    vals.append({"slot": self.slot, "confirmations": None, "err": err,
+                                 "confirmationStatus": "confirmed"})
+            return ok({"context": ctx, "value": vals})
+        return {"jsonrpc": "2.0", "id": rid, "error": {"code": -32601, "message": "Method not found"}}
+
+def _demo_http(port: int, latency_ms: float):
+    srv = HttpRpcStandin(port=port, latency=latency_ms / 1000.0).start()
+    print(f"[STANDIN] {srv.url} – JSON-RPC (Latenz {latency_ms:.0f} ms)")
+    while True:
+        time.sleep(3600)
+
+def _demo_ws(port: int):
+    srv = WsRpcStandin(port=port).start()
+    print(f"[STANDIN] {srv.url} – pump.fun-Kurven-Updates für jeden abonnierten Account")
+    price, slot = 1e-6, 0
+    while True:
+        time.sleep(0.5)
+        price *= 1.0 + random.gauss(0, 0.02)
+        slot += 1
+        for a in list(srv.subscribed):
+            srv.push_account(a, base64_account(pumpfun_curve_bytes(price)), slot)
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    mode = args[0] if args else ""
+    port = int(args[args.index("--port") + 1]) if "--port" in args else (8899 if mode == "http" else 8900)
+    if mode == "ws":
+        _demo_ws(port)
+    elif mode == "http":
+        latency_ms = float(args[args.index("--latency-ms") + 1]) if "--latency-ms" in args else 0.0
+        _demo_http(port, latency_ms)
+    else:
+        print("Usage: python standin_rpc.py ws|http [--port N] [--latency-ms N]")
@@ -1,4 +1,6 @@
 
+from .base import Strategy
+from .engine import StrategyEngine, merge_signals
 from .strat_dexs import DexScreenerStrategy
 # from .strat_gmgn import GmgnStrategy
 
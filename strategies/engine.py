@@ -0,0 +1,194 @@
+
+# strategies/engine.py — Mehrere Strategien parallel, jede mit eigenem Takt und Timeout
+# - Pro Strategie ein Scheduler-Thread; get_signals() läuft in einem eigenen Worker mit Timeout
+# - Neue Ergebnisse einer Strategie lösen sofort ein Update aus (langsame Quellen bremsen nichts)
+# - Signale aller Strategien werden per Token-Adresse zusammengeführt und gerankt
+import threading, time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, List, Any, Union
+
+from .base import Strategy
+
+Num = Union[float, Callable[[], float]]
+
+def _val(v: Num) -> float:
+    return float(v() if callable(v) else v)
+
+class StrategyStats:
+    __slots__ = ("runs", "errors", "timeouts", "skipped", "last_latency", "latency_sum",
+                 "last_hits", "hits_total", "last_run_at", "last_error")
+
+    def __init__(self):
+        self.runs = self.errors = self.timeouts = self.skipped = 0
+        self.last_latency = self.latency_sum = 0.0
+        self.last_hits = self.hits_total = 0
+        self.last_run_at = 0.0
+        self.last_error = ""
+
+class _Slot:
+    def __init__(self, strategy: Strategy, interval: Num, timeout: Num):
+        self.strategy = strategy
+        self.interval = interval
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"strat-{strategy.name}")
+        self.running = False
+        self.signals: List[Dict[str, Any]] = []
+        self.signals_at = 0.0
+        self.wake = threading.Event()
+        self.enabled = True
+        self.stats = StrategyStats()
+
+def _rank_key(s: Dict[str, Any]):
+    # mehr Strategien einig > mehr Liquidität > niedrigerer FDV > mehr Volumen
+    fdv = float(s.get("fdv") or 0.0) or float("inf")
+    vol = float(s.get("best_vol") or s.get("vol5m") or 0.0)
+    return (-len(s.get("strategies") or ()), -float(s.get("liq_usd") or 0.0), fdv, -vol)
+
+def merge_signals(per_strategy: Dict[str, List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Signale aller Strategien nach 'address' deduplizieren; erstes Vorkommen liefert die Daten."""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for name, sigs in per_strategy.items():
+        for s in sigs:
+            addr = s.get("address")
+            if not addr:
+                continue
+            m = merged.get(addr)
+            if m is None:
+                m = dict(s)
+                m["strategies"] = [name]
+                merged[addr] = m
+            elif name not in m["strategies"]:
+                m["strategies"].append(name)
+                # fehlende Kennzahlen aus weiteren Quellen ergänzen
+                for k, v in s.items():
+                    if m.get(k) in (None, 0, 0.0, "") and v not in (None, ""):
+                        m[k] = v
+    return sorted(merged.values(), key=_rank_key)
+
+class StrategyEngine:
+    """
+    on_update(merged) wird nach jedem abgeschlossenen Lauf einer Strategie aufgerufen
+    (aus deren Scheduler-Thread). Signale älter als max_age fallen aus dem Merge.
+    """
+
+    def __init__(self, on_update: Callable[[List[Dict[str, Any]]], None], max_age: Num = 120.0):
+        self.on_update = on_update
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._update_lock = threading.Lock()
+        self._slots: Dict[str, _Slot] = {}
+        self._threads: Dict[str, threading.Thread] = {}
+
+    def add(self, strategy: Strategy, interval: Num, timeout: Num):
+        with self._lock:
+            self._slots[strategy.name] = _Slot(strategy, interval, timeout)
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._slots)
+
+    def set_enabled(self, names: List[str]):
+        want = set(names)
+        with self._lock:
+            for n, slot in self._slots.items():
+                slot.enabled = n in want
+                if slot.enabled:
+                    slot.wake.set()
+
+    def enabled(self) -> List[str]:
+        with self._lock:
+            return [n for n, s in self._slots.items() if s.enabled]
+
+    def start(self):
+        with self._lock:
+            for name, slot in self._slots.items():
+                if name not in self._threads:
+                    slot.wake.clear()   # erster Lauf startet ohnehin sofort
+                    t = threading.Thread(target=self._loop, args=(slot,), name=f"strat-sched-{name}", daemon=True)
+                    self._threads[name] = t
+                    t.start()
+
+    def trigger(self):
+        """Alle aktiven Strategien sofort laufen lassen (z. B. Refresh-Button)."""
+        with self._lock:
+            for slot in self._slots.values():
+                slot.wake.set()
+
+    # ---------- Lauf ----------
+    def _loop(self, slot: _Slot):
+        while True:
+            if slot.enabled:
+                self._run_once(slot)
+            slot.wake.wait(max(1.0, _val(slot.interval)))
+            slot.wake.clear()
+
+    def _run_once(self, slot: _Slot):
+        st = slot.stats
+        if slot.running:
+            # voriger Lauf hängt noch (Timeout überschritten) – nicht stapeln
+            st.skipped += 1
+            return
+        slot.running = True
+        t0 = time.perf_counter()
+
+        def job():
+            try:
+                return slot.strategy.get_signals()
+            finally:
+                slot.running = False
+        fut = slot.pool.submit(job)
+        try:
+            sigs = fut.result(timeout=max(0.1, _val(slot.timeout)))
+        except FutureTimeout:
+            st.timeouts += 1
+            st.last_error = "timeout"
+            print(f"[STRAT] {slot.strategy.name}: Timeout nach {_val(slot.timeout):.0f}s")
+            return
+        except Exception as e:
+            st.errors += 1
+            st.last_error = str(e)[:200]
+            print(f"[STRAT] {slot.strategy.name} ERR: {e}")
+            return
+        dt = time.perf_counter() - t0
+        sigs = list(sigs or [])
+        with self._lock:
+            slot.signals, slot.signals_at = sigs, time.time()
+            st.runs += 1
+            st.last_latency = dt
+            st.latency_sum += dt
+            st.last_hits = len(sigs)
+            st.hits_total += len(sigs)
+            st.last_run_at = slot.signals_at
+        self._publish()
+
+    def merged(self) -> List[Dict[str, Any]]:
+        now, max_age = time.time(), _val(self.max_age)
+        with self._lock:
+            per = {n: s.signals for n, s in self._slots.items() if s.enabled and now - s.signals_at <= max_age}
+        return merge_signals(per)
+
+    def _publish(self):
+        # Updates serialisieren, damit Auto-Buy/Digest nicht parallel aus zwei Strategien laufen
+        with self._update_lock:
+            try:
+                self.on_update(self.merged())
+            except Exception as e:
+                print(f"[STRAT] on_update ERR: {e}")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            out = {}
+            for n, s in self._slots.items():
+                st = s.stats
+                out[n] = {
+                    "enabled": s.enabled,
+                    "interval": _val(s.interval),
+                    "timeout": _val(s.timeout),
+                    "runs": st.runs, "errors": st.errors, "timeouts": st.timeouts, "skipped": st.skipped,
+                    "last_latency": st.last_latency,
+                    "avg_latency": st.latency_sum / st.runs if st.runs else 0.0,
+                    "last_hits": st.last_hits, "hits_total": st.hits_total,
+                    "last_run_age": (time.time() - st.last_run_at) if st.last_run_at else None,
+                    "last_error": st.last_error,
+                }
+            return out
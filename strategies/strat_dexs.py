@@ -2,6 +2,7 @@
 import os, requests
 from typing import List, Dict
 from .base import Strategy
+from ingest import parse_pairs
 
 def _to_float(v, default=0.0):
     try:
@@ -27,12 +28,7 @@ class DexScreenerStrategy(Strategy):
     def fetch_candidates(self) -> List[Dict]:
         r = requests.get(self.endpoint, timeout=self.timeout)
         r.raise_for_status()
-        data = r.json()
-        pairs = []
-        if isinstance(data, dict) and isinstance(data.get("pairs"), list):
-            pairs = data["pairs"]
-        elif isinstance(data, list):
-            pairs = data
+        pairs = parse_pairs(r.content)
         return pairs[: self.max_items]
 
     def filter_candidates(self, pairs: List[Dict]) -> List[Dict]:
@@ -0,0 +1,290 @@
+# stream_feed.py — Streaming-Preisquelle über Solana-RPC-Websocket (accountSubscribe)
+# - Abonniert die Pool-Accounts gehaltener Positionen und rechnet Reserven in einen SOL-Preis um
+# - Unterstützt: pump.fun Bonding-Curve (virtuelle Reserven) und Raydium AMM v4 (Vault-Token-Accounts)
+# - Andere Pools bleiben beim HTTP-Polling; die Feed-Ticks gehen direkt an die Exit-Engine
+from __future__ import annotations
+import asyncio, base64, json, os, struct, threading, time
+from typing import Optional, Dict, Tuple, Callable, List, Any
+
+import base58
+
+from http_pool import get_session
+
+SOL_MINT = "So11111111111111111111111111111111111111112"
+
+RAYDIUM_AMM_V4 = "675kPX9MHTjS2zt1qfr1NYHuzeLXfQM9H24wFSUt1Mp8"
+PUMPFUN_PROGRAM = "6EF8rrecthR5Dkzon8Nwu78hRvfCKubJ14M5uBEwF6P"
+# Anchor-Discriminator sha256("account:BondingCurve")[:8]
+PUMPFUN_CURVE_DISC = bytes.fromhex("17b7f83760d8ac60")
+
+# ===== Encoding Helpers =====
+def b58encode(raw: bytes) -> str:
+    return base58.b58encode(raw).decode("ascii")
+
+def ws_url_from_rpc(rpc_url: str) -> str:
+    env = (os.getenv("SOLANA_WS_URL") or "").strip()
+    if env:
+        return env
+    if rpc_url.startswith("https://"):
+        return "wss://" + rpc_url[len("https://"):]
+    if rpc_url.startswith("http://"):
+        return "ws://" + rpc_url[len("http://"):]
+    return rpc_url
+
+# ===== Pool-Decoder =====
+def decode_pumpfun_curve(data: bytes) -> Optional[float]:
+    """Bonding-Curve: 8 Byte Discriminator, virtualTokenReserves u64, virtualSolReserves u64 (Token 6 Dez., SOL 9 Dez.)."""
+    if len(data) < 24 or data[:8] != PUMPFUN_CURVE_DISC:
+        return None
+    vtok, vsol = struct.unpack_from("<QQ", data, 8)
+    if vtok <= 0:
+        return None
+    return (vsol / 1e9) / (vtok / 1e6)
+
+def decode_raydium_v4_vaults(data: bytes) -> Optional[Tuple[str, str, str, str]]:
+    """LIQUIDITY_STATE_LAYOUT_V4: baseVault@336, quoteVault@368, baseMint@400, quoteMint@432."""
+    if len(data) < 464:
+        return None
+    f = lambda off: b58encode(data[off:off + 32])
+    return f(336), f(368), f(400), f(432)
+
+def _account_bytes(value: Dict[str, Any]) -> bytes:
+    data = (value or {}).get("data")
+    if isinstance(data, list) and data and data[-1] == "base64":
+        return base64.b64decode(data[0])
+    return b""
+
+def _token_ui_amount(value: Dict[str, Any]) -> Optional[float]:
+    try:
+        ta = value["data"]["parsed"]["info"]["tokenAmount"]
+        ui = ta.get("uiAmount")
+        if ui is None:
+            ui = int(ta["amount"]) / (10 ** int(ta["decimals"]))
+        return float(ui)
+    except Exception:
+        return None
+
+# ===== Feed =====
+class _Watch:
+    __slots__ = ("mint", "kind", "accounts", "token_vault", "sol_vault", "reserves")
+
+    def __init__(self, mint: str, kind: str, accounts: List[str]):
+        self.mint = mint
+        self.kind = kind              # 'pumpfun' | 'raydium'
+        self.accounts = accounts      # abonnierte Accounts
+        self.token_vault = ""
+        self.sol_vault = ""
+        self.reserves: Dict[str, float] = {}
+
+class StreamingPriceFeed:
+    """
+    resolver(mint) -> (pool_address, dex_id) | None, on_tick(mint, price_sol).
+    Läuft mit eigenem asyncio-Loop in einem Daemon-Thread, reconnectet mit Backoff.
+    """
+
+    def __init__(self, rpc_url: str, resolver: Callable[[str], Optional[Tuple[str, str]]],
+                 on_tick: Callable[[str, float], None], ws_url: Optional[str] = None,
+                 commitment: str = "processed", timeout: int = 15):
+        self.rpc_url = rpc_url
+        self.ws_url = ws_url or ws_url_from_rpc(rpc_url)
+        self.resolver = resolver
+        self.on_tick = on_tick
+        self.commitment = commitment
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._wanted: Dict[str, Optional[_Watch]] = {}   # mint -> Watch (None = noch nicht aufgelöst)
+        self._unsupported: set = set()
+        self._by_account: Dict[str, _Watch] = {}
+        self._thread: Optional[threading.Thread] = None
+        self.connected = False
+        self.ticks = 0
+        self.reconnects = 0
+        self.last_tick_at = 0.0
+
+    # ---------- Public ----------
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=lambda: asyncio.run(self._main()), name="price-stream", daemon=True)
+            self._thread.start()
+
+    def watch(self, mint: str):
+        with self._lock:
+            if mint not in self._wanted and mint not in self._unsupported:
+                self._wanted[mint] = None
+
+    def unwatch(self, mint: str):
+        with self._lock:
+            self._wanted.pop(mint, None)
+            self._unsupported.discard(mint)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "connected": self.connected,
+                "streams": sum(1 for w in self._wanted.values() if w is not None),
+                "unsupported": len(self._unsupported),
+                "ticks": self.ticks,
+                "reconnects": self.reconnects,
+                "last_tick_age": (time.time() - self.last_tick_at) if self.last_tick_at else None,
+            }
+
+    # ---------- Auflösung Pool -> Accounts ----------
+    def _rpc_call(self, method: str, params: list) -> Any:
+        body = {"jsonrpc": "2.0", "id": 1, "method": method, "params": params}
+        r = get_session("rpc").post(self.rpc_url, json=body, timeout=self.timeout)
+        r.raise_for_status()
+        data = r.json()
+        if data.get("error"):
+            raise RuntimeError(data["error"])
+        return data.get("result")
+
+    def _resolve(self, mint: str) -> Optional[_Watch]:
+        res = self.resolver(mint)
+        if not res:
+            return None
+        pool, dex = res[0], (res[1] or "").lower()
+        # nur die Bonding-Curve selbst; pumpswap-AMM-Pools haben ein anderes Layout
+        if dex == "pumpfun":
+            info = self._rpc_call("getAccountInfo", [pool, {"encoding": "base64", "commitment": "confirmed"}])
+            value = (info or {}).get("value") or {}
+            if value.get("owner") != PUMPFUN_PROGRAM or decode_pumpfun_curve(_account_bytes(value)) is None:
+                return None
+            return _Watch(mint, "pumpfun", [pool])
+        if dex == "raydium":
+            info = self._rpc_call("getAccountInfo", [pool, {"encoding": "base64", "commitment": "confirmed"}])
+            value = (info or {}).get("value") or {}
+            if value.get("owner") != RAYDIUM_AMM_V4:
+                return None
+            dec = decode_raydium_v4_vaults(_account_bytes(value))
+            if not dec:
+                return None
+            base_vault, quote_vault, base_mint, quote_mint = dec
+            if quote_mint == SOL_MINT and base_mint == mint:
+                w = _Watch(mint, "raydium", [base_vault, quote_vault])
+                w.token_vault, w.sol_vault = base_vault, quote_vault
+            elif base_mint == SOL_MINT and quote_mint == mint:
+                w = _Watch(mint, "raydium", [quote_vault, base_vault])
+                w.token_vault, w.sol_vault = quote_vault, base_vault
+            else:
+                return None
+            return w
+        return None
+
+    def _resolve_pending(self):
+        with self._lock:
+            pending = [m for m, w in self._wanted.items() if w is None]
+        for mint in pending:
+            try:
+                w = self._resolve(mint)
+            except Exception as e:
+                print(f"[STREAM] resolve {mint[:6]}… ERR: {e}")
+                w = None
+            with self._lock:
+                if mint not in self._wanted:
+                    continue
+                if w is None:
+                    self._wanted.pop(mint, None)
+                    self._unsupported.add(mint)
+                    print(f"[STREAM] {mint[:6]}…: Pool nicht unterstützt – bleibt beim Polling")
+                else:
+                    self._wanted[mint] = w
+
+    # ---------- Notifications ----------
+    def _on_account(self, account: str, value: Dict[str, Any]):
+        w = self._by_account.get(account)
+        if w is None:
+            return
+        price = None
+        if w.kind == "pumpfun":
+            price = decode_pumpfun_curve(_account_bytes(value))
+        else:
+            ui = _token_ui_amount(value)
+            if ui is None:
+                return
+            w.reserves[account] = ui
+            tok, sol = w.reserves.get(w.token_vault), w.reserves.get(w.sol_vault)
+            if tok and sol:
+                price = sol / tok
+        if price and price > 0:
+            self.ticks += 1
+            self.last_tick_at = time.time()
+            try:
+                self.on_tick(w.mint, price)
+            except Exception as e:
+                print(f"[STREAM] on_tick ERR: {e}")
+
+    # ---------- asyncio ----------
+    async def _main(self):
+        import websockets
+        backoff = 1.0
+        while True:
+            try:
+                async with websockets.connect(self.ws_url, ping_interval=20, max_size=2 ** 22) as ws:
+                    self.connected = True
+                    backoff = 1.0
+                    await self._session(ws)
+            except Exception as e:
+                print(f"[STREAM] {self.ws_url} getrennt: {e}")
+            self.connected = False
+            self._by_account = {}
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(30.0, backoff * 2)
+
+    async def _session(self, ws):
+        next_id = 1
+        pending: Dict[int, Tuple[str, str]] = {}     # req-id -> (op, account)
+        subs: Dict[int, str] = {}                    # subscription -> account
+        sub_of: Dict[str, int] = {}                  # account -> subscription
+        loop = asyncio.get_running_loop()
+
+        async def sync_subscriptions():
+            nonlocal next_id
+            await loop.run_in_executor(None, self._resolve_pending)
+            with self._lock:
+                watches = [w for w in self._wanted.values() if w is not None]
+            want = {}
+            for w in watches:
+                for a in w.accounts:
+                    want[a] = w
+            self._by_account = want
+            inflight = {a for (_, a) in pending.values()}
+            for a, w in want.items():
+                if a in sub_of or a in inflight:
+                    continue
+                enc = "base64" if w.kind == "pumpfun" else "jsonParsed"
+                pending[next_id] = ("sub", a)
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": next_id, "method": "accountSubscribe",
+                                          "params": [a, {"encoding": enc, "commitment": self.commitment}]}))
+                next_id += 1
+            for a in [a for a in sub_of if a not in want]:
+                sid = sub_of.pop(a)
+                subs.pop(sid, None)
+                pending[next_id] = ("unsub", a)
+                await ws.send(json.dumps({"jsonrpc": "2.0", "id": next_id, "method": "accountUnsubscribe", "params": [sid]}))
+                next_id += 1
+
+        await sync_subscriptions()
+        last_sync = time.time()
+        while True:
+            try:
+                raw = await asyncio.wait_for(ws.recv(), timeout=1.0)
+            except asyncio.TimeoutError:
+                raw = None
+            if raw is not None:
+                msg = json.loads(raw)
+                if "id" in msg and msg["id"] in pending:
+                    op, a = pending.pop(msg["id"])
+                    if op == "sub" and isinstance(msg.get("result"), int):
+                        subs[msg["result"]] = a
+                        sub_of[a] = msg["result"]
+                    elif msg.get("error"):
+                        print(f"[STREAM] {op} {a[:6]}… ERR: {msg['error']}")
+                elif msg.get("method") == "accountNotification":
+                    params = msg.get("params") or {}
+                    a = subs.get(params.get("subscription"))
+                    if a:
+                        self._on_account(a, (params.get("result") or {}).get("value") or {})
+            if time.time() - last_sync >= 1.0:
+                await sync_subscriptions()
+                last_sync = time.time()
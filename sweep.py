@@ -0,0 +1,352 @@
+# sweep.py — Parameter-Sweep (Backtest) für Filter- und Exit-Einstellungen über aufgezeichnete Marktdaten
+# - Aufzeichnung (replay.py / RECORD_DIR) wird einmal in Spalten dekodiert und als .npy abgelegt;
+#   die Worker eines Prozess-Pools öffnen sie read-only per mmap (kein erneutes Parsen, geteilter Page-Cache)
+# - Pro Konfiguration: Scan-Filter/Ranking vektorisiert über alle Scans (vector_engine), Auto-Buy Top-1
+#   wie live, Exit-Pfad je Position vektorisiert mit denselben Regeln wie ExitEngine._evaluate
+# - Ranking nach simulierter PnL abzüglich Drawdown-Gewicht
+# CLI: python sweep.py REC_DIR --grid TP1_PCT=8:20:2 --grid STOP_LOSS_PCT=5,10,15 [--random N] [--workers N]
+#                      [--invest 1.0] [--cost-bps 0] [--dd-weight 1.0] [--top 20] [--out sweep.json]
+import hashlib, itertools, json, os, random, sys, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from ingest import parse_pairs
+from pairs import PairSnapshot, _as_float, _as_int
+from vector_engine import strategy_mask, rank_order
+import replay
+
+# Schlüssel, die variiert werden dürfen (alles andere kommt aus CONFIG)
+SWEEP_KEYS = (
+    "STRAT_LIQ_MIN", "STRAT_FDV_MAX", "STRAT_VOL5M_MIN", "STRAT_VOL_BEST_MIN", "MAX_AGE_MIN",
+    "PARTIAL_ENABLED", "TP1_PCT", "TP1_SELL_PCT", "TP2_PCT", "TP2_SELL_PCT",
+    "TRAIL_AFTER_TP1_PCT", "STOP_LOSS_PCT", "TP_PCT",
+)
+_INT_KEYS = ("STRAT_LIQ_MIN", "STRAT_FDV_MAX", "STRAT_VOL5M_MIN", "STRAT_VOL_BEST_MIN", "MAX_AGE_MIN", "PARTIAL_ENABLED")
+
+_SCAN_COLS = ("scan", "mint", "liq", "fdv", "vol5", "best", "age", "base_ok", "price")
+_TICK_COLS = ("tick_t", "tick_price", "mint_start")
+
+# ===== Datensatz =====
+def _source_sig(rec_dir: str) -> str:
+    h = hashlib.sha1()
+    for p in replay.segment_files(rec_dir):
+        st = os.stat(p)
+        h.update(f"{os.path.basename(p)}:{st.st_size}:{st.st_mtime_ns};".encode())
+    return h.hexdigest()
+
+def build_dataset(rec_dir: str, out_dir: str, cfg: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Dekodiert die Aufzeichnung einmal in Spalten:
+    - Scan-Zeilen (eine je Pair und Scan, dedupliziert und begrenzt wie fetch_pairs)
+    - Ticks je Mint zeitlich sortiert (Preise aus Scans und Preis-Frames), mint_start als Offsets
+    Chain-/Quote-Filter sind fest (CONFIG), alles Übrige bleibt variierbar.
+    """
+    sig = _source_sig(rec_dir)
+    meta_path = os.path.join(out_dir, "meta.json")
+    fixed = {k: cfg[k] for k in ("STRAT_CHAIN", "STRICT_QUOTE", "STRAT_QUOTE", "STRAT_MAX_ITEMS")}
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get("source") == sig and meta.get("fixed") == fixed:
+            return meta
+    except Exception:
+        pass
+
+    t0 = time.perf_counter()
+    chain, quote = cfg["STRAT_CHAIN"], cfg["STRAT_QUOTE"].upper()
+    strict = cfg["STRICT_QUOTE"] == 1 and quote != "ANY"
+    max_items = cfg["STRAT_MAX_ITEMS"]
+    mint_ids: Dict[str, int] = {}
+    scan_t: List[float] = []
+    rows: Dict[str, list] = {k: [] for k in _SCAN_COLS}
+    ticks: List[Tuple[int, float, float]] = []   # (mint, t, price)
+
+    def mid(m: str) -> int:
+        i = mint_ids.get(m)
+        if i is None:
+            i = mint_ids[m] = len(mint_ids)
+        return i
+
+    for fr in replay.iter_frames(rec_dir):
+        t = float(fr["t"])
+        if fr["k"] == "price":
+            for m, pr in fr["prices"].items():
+                if m and pr:
+                    ticks.append((mid(m), t, float(pr)))
+            continue
+        uniq: Dict[str, PairSnapshot] = {}
+        for status, body in fr["bodies"].values():
+            if int(status) != 200 or not body:
+                continue
+            for p in parse_pairs(body.encode("utf-8")):
+                pid = p.get("pairAddress") or p.get("url")
+                if pid and pid not in uniq:
+                    uniq[pid] = PairSnapshot.from_pair(p)
+            if len(uniq) >= max_items:
+                break
+        n = len(scan_t)
+        scan_t.append(t)
+        now_us = int(t * 1_000_000)
+        for p in uniq.values():
+            if not p.base_address:
+                continue
+            m = mid(p.base_address)
+            ok = p.chain_id == chain or p.url_sol
+            if strict:
+                ok = ok and (p.quote_symbol or "").upper() == quote
+            rows["scan"].append(n)
+            rows["mint"].append(m)
+            rows["liq"].append(p.liq)
+            rows["fdv"].append(p.fdv)
+            rows["vol5"].append(p.vol5)
+            rows["best"].append(p.best_vol)
+            rows["age"].append(p.age_minutes(now_us))
+            rows["base_ok"].append(ok)
+            rows["price"].append(p.price_native or 0.0)
+            if p.price_native:
+                ticks.append((m, t, p.price_native))
+
+    os.makedirs(out_dir, exist_ok=True)
+    dtypes = {"scan": np.int32, "mint": np.int32, "base_ok": np.bool_, "age": np.float64}
+    arrays = {k: np.asarray(v, dtype=dtypes.get(k, np.float64)) for k, v in rows.items()}
+    arrays["scan_t"] = np.asarray(scan_t, dtype=np.float64)
+    tk = np.asarray(ticks, dtype=np.float64).reshape(-1, 3)
+    order = np.lexsort((tk[:, 1], tk[:, 0]))   # nach Mint, dann Zeit (stabil)
+    tk = tk[order]
+    arrays["tick_t"] = np.ascontiguousarray(tk[:, 1])
+    arrays["tick_price"] = np.ascontiguousarray(tk[:, 2])
+    arrays["mint_start"] = np.searchsorted(tk[:, 0], np.arange(len(mint_ids) + 1)).astype(np.int64)
+    for k, a in arrays.items():
+        np.save(os.path.join(out_dir, f"{k}.npy"), a)
+    meta = {"source": sig, "fixed": fixed, "scans": len(scan_t), "rows": len(rows["scan"]),
+            "ticks": int(len(tk)), "mints": len(mint_ids), "build_sec": time.perf_counter() - t0}
+    with open(meta_path, "w") as f:
+        json.dump(meta, f)
+    return meta
+
+def load_dataset(data_dir: str) -> Dict[str, np.ndarray]:
+    return {k: np.load(os.path.join(data_dir, f"{k}.npy"), mmap_mode="r")
+            for k in _SCAN_COLS + _TICK_COLS + ("scan_t",)}
+
+# ===== Simulation =====
+def exit_path(prices: np.ndarray, entry: float, c: Dict[str, Any]) -> List[Tuple[int, float, str]]:
+    """
+    Fills einer Position als (tick_index, verkaufter Anteil der Ursprungsmenge, kind) —
+    dieselben Regeln und Reihenfolge wie ExitEngine._evaluate (SL vor TP1, nach TP1: SL, TRAIL, TP2).
+    """
+    if len(prices) == 0 or entry <= 0:
+        return []
+    change = (prices / entry - 1.0) * 100.0
+    sl = c["STOP_LOSS_PCT"]
+    sl_hit = change <= -sl if sl > 0 else np.zeros(len(prices), dtype=bool)
+    if c["PARTIAL_ENABLED"] != 1:
+        tp_hit = change >= c["TP_PCT"] if c["TP_PCT"] > 0 else np.zeros(len(prices), dtype=bool)
+        hit = np.flatnonzero(sl_hit | tp_hit)
+        if not len(hit):
+            return []
+        i = int(hit[0])
+        return [(i, 1.0, "SL" if sl_hit[i] else "TP")]
+
+    hit = np.flatnonzero(sl_hit | (change >= c["TP1_PCT"]))
+    if not len(hit):
+        return []
+    i = int(hit[0])
+    if sl_hit[i]:
+        return [(i, 1.0, "SL")]
+    frac1 = max(0.0, min(100.0, c["TP1_SELL_PCT"])) / 100.0
+    fills = [(i, frac1, "TP1")]
+    left = 1.0 - frac1
+    if left <= 1e-9 or i + 1 >= len(prices):
+        return fills
+
+    post = prices[i + 1:]
+    pch = change[i + 1:]
+    high = np.maximum.accumulate(np.concatenate(([prices[i]], post)))[1:]
+    trail = c["TRAIL_AFTER_TP1_PCT"]
+    s_hit = sl_hit[i + 1:]
+    t_hit = ((post / high - 1.0) * 100.0 <= -trail) if trail > 0 else np.zeros(len(post), dtype=bool)
+    p_hit = pch >= c["TP2_PCT"]
+    hit = np.flatnonzero(s_hit | t_hit | p_hit)
+    if not len(hit):
+        return fills
+    j = int(hit[0])
+    if s_hit[j]:
+        fills.append((i + 1 + j, left, "SL"))
+    elif t_hit[j]:
+        fills.append((i + 1 + j, left, "TRAIL"))
+    else:
+        # TP2 schließt die Position auch bei TP2_SELL_PCT < 100 (Rest wird nicht mehr getrackt)
+        fills.append((i + 1 + j, left * max(0.0, min(100.0, c["TP2_SELL_PCT"])) / 100.0, "TP2"))
+    return fills
+
+def simulate(d: Dict[str, np.ndarray], cfg: Dict[str, Any], invest_sol: float = 1.0, cost_bps: float = 0.0) -> Dict[str, Any]:
+    scan = d["scan"]
+    keep = np.asarray(d["base_ok"]) & strategy_mask(d["liq"], d["fdv"], d["vol5"], d["best"], cfg) & (d["price"] > 0)
+    if cfg["MAX_AGE_MIN"] > 0:
+        keep &= d["age"] <= cfg["MAX_AGE_MIN"]
+    idx = np.flatnonzero(keep)
+    order = idx[rank_order(d["liq"][idx], d["fdv"][idx], d["best"][idx], scan[idx])]
+    # Top-1 je Scan = erste Zeile jeder Scan-Gruppe
+    _, first = np.unique(scan[order], return_index=True)
+    tops = order[first]
+
+    scan_t, tick_t, tick_p, starts = d["scan_t"], d["tick_t"], d["tick_price"], d["mint_start"]
+    cost = cost_bps / 10_000.0
+    held_until: Dict[int, float] = {}
+    events: List[Tuple[float, float]] = []   # (zeit, realisierte PnL)
+    exits: Dict[str, int] = {}
+    trades = wins = 0
+    unrealized = 0.0
+    for r in tops.tolist():
+        m = int(d["mint"][r])
+        t = float(scan_t[scan[r]])
+        if held_until.get(m, -1.0) > t:
+            continue   # wie live: gehaltene Mints nicht nachkaufen
+        entry = float(d["price"][r]) * (1.0 + cost)
+        a, b = int(starts[m]), int(starts[m + 1])
+        k = a + int(np.searchsorted(tick_t[a:b], t, side="right"))
+        prices = np.asarray(tick_p[k:b])
+        fills = exit_path(prices, float(d["price"][r]), cfg)
+        trades += 1
+        pnl, sold = 0.0, 0.0
+        for i, frac, kind in fills:
+            v = invest_sol * frac * (float(prices[i]) * (1.0 - cost) / entry - 1.0)
+            pnl += v
+            sold += frac
+            events.append((float(tick_t[k + i]), v))
+            exits[kind] = exits.get(kind, 0) + 1
+        closed = bool(fills) and fills[-1][2] != "TP1"
+        if not closed and sold < 1.0 - 1e-9:
+            # offen bis zum Ende: zum letzten Preis bewerten
+            last = float(prices[-1]) if len(prices) else float(d["price"][r])
+            unrealized += invest_sol * (1.0 - sold) * (last * (1.0 - cost) / entry - 1.0)
+            held_until[m] = float("inf")
+        else:
+            held_until[m] = float(tick_t[k + fills[-1][0]])
+        wins += pnl > 0
+
+    events.sort()
+    eq = np.cumsum([v for _, v in events]) if events else np.zeros(1)
+    dd = float(np.max(np.maximum.accumulate(np.maximum(eq, 0.0)) - eq)) if events else 0.0
+    realized = float(eq[-1]) if events else 0.0
+    return {
+        "pnl_sol": realized + unrealized, "realized_sol": realized, "unrealized_sol": unrealized,
+        "max_drawdown_sol": dd, "trades": trades, "wins": wins, "exits": exits,
+    }
+
+# ===== Parameter-Raster =====
+def parse_values(spec: str) -> List[float]:
+    """'a,b,c' oder 'start:stop:step' (inklusive stop)."""
+    if ":" in spec:
+        a, b, s = (float(x) for x in spec.split(":"))
+        n = int(np.floor((b - a) / s + 1e-9)) + 1
+        return [round(a + i * s, 10) for i in range(max(0, n))]
+    return [float(x) for x in spec.split(",") if x.strip()]
+
+def make_grid(grid: Dict[str, List[float]], sample: int = 0, seed: int = 42) -> List[Dict[str, Any]]:
+    keys = list(grid)
+    total = int(np.prod([len(grid[k]) for k in keys])) if keys else 1
+    if sample and sample < total:
+        rnd = random.Random(seed)
+        picks = sorted(rnd.sample(range(total), sample))
+        combos = []
+        for n in picks:
+            c = []
+            for k in reversed(keys):
+                n, i = divmod(n, len(grid[k]))
+                c.append(grid[k][i])
+            combos.append(tuple(reversed(c)))
+    else:
+        combos = list(itertools.product(*(grid[k] for k in keys)))
+    return [{k: (int(v) if k in _INT_KEYS else v) for k, v in zip(keys, c)} for c in combos]
+
+# ===== Prozess-Pool =====
+_W: Dict[str, Any] = {}
+
+def _init_worker(data_dir: str, base: Dict[str, Any], invest_sol: float, cost_bps: float):
+    _W["d"] = load_dataset(data_dir)
+    _W["base"], _W["invest"], _W["cost"] = base, invest_sol, cost_bps
+
+def _run_one(params: Dict[str, Any]) -> Dict[str, Any]:
+    cfg = dict(_W["base"])
+    cfg.update(params)
+    res = simulate(_W["d"], cfg, _W["invest"], _W["cost"])
+    res["params"] = params
+    return res
+
+def run_sweep(data_dir: str, base: Dict[str, Any], configs: List[Dict[str, Any]], workers: int = 0,
+              invest_sol: float = 1.0, cost_bps: float = 0.0, dd_weight: float = 1.0) -> List[Dict[str, Any]]:
+    workers = workers or os.cpu_count() or 1
+    chunk = max(1, len(configs) // (workers * 8))
+    if workers == 1:
+        _init_worker(data_dir, base, invest_sol, cost_bps)
+        results = [_run_one(c) for c in configs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(data_dir, base, invest_sol, cost_bps)) as ex:
+            results = list(ex.map(_run_one, configs, chunksize=chunk))
+    for r in results:
+        r["score"] = r["pnl_sol"] - dd_weight * r["max_drawdown_sol"]
+    results.sort(key=lambda r: (-r["score"], r["max_drawdown_sol"], -r["pnl_sol"]))
+    return results
+
+# ===== CLI =====
+def _base_config() -> Dict[str, Any]:
+    # CONFIG des Bots (inkl. ENV); DRY_RUN, damit der Import nichts handelt
+    os.environ.setdefault("DRY_RUN", "1")
+    import bot
+    return {k: v for k, v in bot.CONFIG.items() if isinstance(v, (int, float, str))}
+
+def _fmt_row(n: int, r: Dict[str, Any]) -> str:
+    p = " ".join(f"{k}={v:g}" for k, v in r["params"].items())
+    return (f"{n:>3}. score {r['score']:+.4f} | PnL {r['pnl_sol']:+.4f} SOL | DD {r['max_drawdown_sol']:.4f} | "
+            f"Trades {r['trades']} (Gewinner {r['wins']}) | {p}")
+
+def main(argv: List[str]):
+    if not argv or argv[0].startswith("-"):
+        print("Usage: python sweep.py REC_DIR --grid KEY=a,b,c|start:stop:step [...] [--random N] [--workers N] [--out datei.json]")
+        return 2
+    rec_dir = argv[0]
+    grid: Dict[str, List[float]] = {}
+    opts = {"--random": "0", "--workers": "0", "--invest": "1.0", "--cost-bps": "0", "--dd-weight": "1.0",
+            "--top": "20", "--out": "", "--data": "", "--seed": "42"}
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a == "--grid" and i + 1 < len(argv):
+            k, _, spec = argv[i + 1].partition("=")
+            k = k.strip().upper()
+            if k not in SWEEP_KEYS:
+                print(f"[SWEEP] unbekannter Parameter {k} (erlaubt: {', '.join(SWEEP_KEYS)})")
+                return 2
+            grid[k] = parse_values(spec)
+            i += 2
+        elif a in opts and i + 1 < len(argv):
+            opts[a] = argv[i + 1]
+            i += 2
+        else:
+            print(f"[SWEEP] unbekannte Option {a}")
+            return 2
+
+    base = _base_config()
+    data_dir = opts["--data"] or os.path.join(rec_dir, ".sweep")
+    meta = build_dataset(rec_dir, data_dir, base)
+    print(f"[SWEEP] Daten: {meta['scans']} Scans | {meta['rows']} Zeilen | {meta['ticks']} Ticks | {meta['mints']} Mints")
+    configs = make_grid(grid, _as_int(opts["--random"], 0), _as_int(opts["--seed"], 42))
+    t0 = time.perf_counter()
+    results = run_sweep(data_dir, base, configs, workers=_as_int(opts["--workers"], 0),
+                        invest_sol=_as_float(opts["--invest"], 1.0), cost_bps=_as_float(opts["--cost-bps"], 0.0),
+                        dd_weight=_as_float(opts["--dd-weight"], 1.0))
+    dt = time.perf_counter() - t0
+    print(f"[SWEEP] {len(results)} Konfigurationen in {dt:.1f}s ({len(results) / dt * 3600 if dt > 0 else 0:,.0f}/h)")
+    for n, r in enumerate(results[:_as_int(opts["--top"], 20)], 1):
+        print(_fmt_row(n, r))
+    if opts["--out"]:
+        with open(opts["--out"], "w") as f:
+            json.dump({"meta": meta, "elapsed_sec": dt, "results": results}, f, indent=1)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
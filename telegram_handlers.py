@@ -1,7 +1,15 @@
 # telegram_handlers.py
 # Minimaler Long-Poll-Handler ohne externe Bot-Library
-import time, threading, requests, html
-from typing import Optional, Callable, List
+# Versand läuft asynchron über die Outbox (Rate-Limit, retry_after, Zusammenfassen von Broadcasts)
+# Befehle laufen in Worker-Pools; /sell, /dryrun und /set haben eine eigene Spur
+# Reihenfolge: je Chat und Spur strikt nacheinander; die Prio-Spur darf normale Befehle überholen
+import os, time, threading, html
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Callable, List, Iterable, Dict, Tuple, Deque
+
+from http_pool import get_session
+from tg_outbox import Outbox, PRIO_TRADE, PRIO_INFO
 
 TG_API = "https://api.telegram.org"
 
@@ -12,6 +20,8 @@ class TelegramBot:
         fixed_chat_id: Optional[str],
         on_command: Callable[[int, str, List[str]], None],
         on_button:  Callable[[int, str], None],
+        priority_commands: Iterable[str] = ("/sell", "/dryrun", "/set"),
+        ack_commands: Iterable[str] = ("/buy", "/sell"),
     ):
         self.token = token
         self.fixed_chat_id = fixed_chat_id  # wenn gesetzt, nur diese Chat-ID akzeptieren
@@ -19,6 +29,22 @@ class TelegramBot:
         self.on_button = on_button
         self.last_update_id = 0
         self.thread = threading.Thread(target=self._poll_loop, daemon=True)
+        # Dispatch: der Poll-Thread reiht nur ein; eine eigene Spur für /sell, /dryrun und /set,
+        # damit ein laufender /buy sie nicht blockiert
+        self.priority_commands = set(priority_commands)
+        self.ack_commands = set(ack_commands)
+        self._pool = ThreadPoolExecutor(max_workers=int(os.getenv("TG_WORKERS", "4")), thread_name_prefix="tg-cmd")
+        self._prio_pool = ThreadPoolExecutor(max_workers=int(os.getenv("TG_PRIO_WORKERS", "2")), thread_name_prefix="tg-prio")
+        self._dlock = threading.Lock()
+        self._chat_q: Dict[Tuple[int, bool], Deque[Callable[[], None]]] = {}   # (chat, prio) -> wartende Befehle
+        self.in_flight = self.dispatched = self.failed = 0
+        self.outbox = Outbox(
+            lambda method, params: self._api(method, **params),
+            rate=float(os.getenv("TG_RATE_PER_SEC", "1")),
+            burst=float(os.getenv("TG_BURST", "3")),
+            max_size=int(os.getenv("TG_OUTBOX_MAX", "200")),
+            coalesce_window=float(os.getenv("TG_COALESCE_MS", "300")) / 1000.0,
+        )
 
     # ------------ Public API ------------
     def start(self):
@@ -27,31 +53,71 @@ class TelegramBot:
     def _api(self, method: str, **params):
         url = f"{TG_API}/bot{self.token}/{method}"
         try:
-            r = requests.post(url, json=params, timeout=15)
+            r = get_session("telegram").post(url, json=params, timeout=15)
             return r.json()
         except Exception as e:
             print(f"[TG] API-ERR {method}: {e}")
             return {"ok": False}
 
-    def safe_send(self, chat_id: int, text: str, parse_mode: Optional[str]=None, disable_web_page_preview=True):
+    def safe_send(self, chat_id: int, text: str, parse_mode: Optional[str]=None, disable_web_page_preview=True,
+                  priority: int = PRIO_TRADE, key: Optional[str] = None, coalesce: bool = False):
+        # reiht nur ein – der Aufrufer wartet nie auf Telegram
         if self.fixed_chat_id and str(chat_id) != str(self.fixed_chat_id):
             print("[TG] send_text: kein chat_id verknüpft – Nachricht verworfen")
             return
-        self._api(
-            "sendMessage",
-            chat_id=chat_id,
-            text=text,
-            parse_mode=parse_mode,
-            disable_web_page_preview=disable_web_page_preview,
-            reply_markup=self._keyboard()
-        )
+        self.outbox.enqueue(chat_id, text, {
+            "parse_mode": parse_mode,
+            "disable_web_page_preview": disable_web_page_preview,
+            "reply_markup": self._keyboard(),
+        }, prio=priority, key=key, coalesce=coalesce)
 
-    def safe_broadcast(self, text: str, parse_mode: Optional[str]=None, disable_web_page_preview=True):
+    def safe_broadcast(self, text: str, parse_mode: Optional[str]=None, disable_web_page_preview=True,
+                       priority: int = PRIO_TRADE, key: Optional[str] = None):
+        # Broadcasts eines Bursts werden in der Outbox zu einer Nachricht zusammengefasst
         if self.fixed_chat_id:
-            self.safe_send(int(self.fixed_chat_id), text, parse_mode=parse_mode, disable_web_page_preview=disable_web_page_preview)
+            self.safe_send(int(self.fixed_chat_id), text, parse_mode=parse_mode, disable_web_page_preview=disable_web_page_preview,
+                           priority=priority, key=key, coalesce=True)
+
+    def dispatch_stats(self) -> dict:
+        with self._dlock:
+            return {"in_flight": self.in_flight, "dispatched": self.dispatched, "failed": self.failed}
+
+    def _dispatch(self, chat_id: int, label: str, fn: Callable, *args, priority: bool = False):
+        def run():
+            try:
+                fn(*args)
+            except Exception as e:
+                with self._dlock:
+                    self.failed += 1
+                print(f"[TG] Handler {label} ERR: {e}")
+                self.safe_send(chat_id, f"❌ {html.escape(label)} fehlgeschlagen: {html.escape(str(e))}")
+            finally:
+                with self._dlock:
+                    self.in_flight -= 1
+        # je Chat und Spur eine FIFO: läuft dort schon ein Befehl, wird angehängt statt parallel gestartet
+        k = (chat_id, priority)
+        with self._dlock:
+            self.in_flight += 1
+            self.dispatched += 1
+            q = self._chat_q.get(k)
+            if q is not None:
+                q.append(run)
+                return
+            self._chat_q[k] = deque([run])
+        (self._prio_pool if priority else self._pool).submit(self._drain, k)
+
+    def _drain(self, k: Tuple[int, bool]):
+        while True:
+            with self._dlock:
+                q = self._chat_q[k]
+                if not q:
+                    del self._chat_q[k]
+                    return
+                run = q.popleft()
+            run()
 
     def send_keyboard(self, chat_id: int):
-        self._api("sendMessage", chat_id=chat_id, text="Menü:", reply_markup=self._keyboard())
+        self.outbox.enqueue(chat_id, "Menü:", {"reply_markup": self._keyboard()}, prio=PRIO_INFO)
 
     def _keyboard(self):
         # Acht Buttons, wie besprochen
@@ -73,7 +139,7 @@ class TelegramBot:
         while True:
             try:
                 url = f"{TG_API}/bot{self.token}/getUpdates"
-                r = requests.get(url, params={"timeout": 30, "offset": self.last_update_id + 1}, timeout=35)
+                r = get_session("telegram-poll").get(url, params={"timeout": 30, "offset": self.last_update_id + 1}, timeout=35)
                 data = r.json()
                 if not data.get("ok"):
                     time.sleep(2)
@@ -97,10 +163,14 @@ class TelegramBot:
                         parts = text.split()
                         cmd = parts[0]
                         args = parts[1:]
-                        self.on_command(chat_id, cmd, args)
+                        key = cmd.lower().split("@")[0]
+                        if key in self.ack_commands:
+                            self.safe_send(chat_id, f"⏳ {html.escape(key)} angenommen – Ergebnis folgt.")
+                        self._dispatch(chat_id, key, self.on_command, chat_id, cmd, args,
+                                       priority=key in self.priority_commands)
                     else:
                         # Buttons
-                        self.on_button(chat_id, text)
+                        self._dispatch(chat_id, text, self.on_button, chat_id, text)
             except Exception as e:
                 print(f"[TG] poll error: {e}")
                 time.sleep(2)
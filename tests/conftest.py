@@ -0,0 +1,4 @@
+# conftest.py — Repo-Wurzel importierbar machen (Module liegen flach im Root)
+import os, sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,58 @@
+# test_confirm_tracker.py — ConfirmationTracker gegen HttpRpcStandin (Bestätigung, Ablauf, unbekannter Ausgang)
+import threading
+
+import pytest
+
+from confirm_tracker import ConfirmationTracker, EXPIRED, UNKNOWN
+from rpc_pool import RpcPool
+from standin_rpc import HttpRpcStandin
+
+def _raw_tx(n: int) -> bytes:
+    return b"\x01" + bytes([n]) * 64 + b"payload"
+
+@pytest.fixture
+def node():
+    srv = HttpRpcStandin(confirm_after=0.0).start()
+    yield srv
+    srv.stop()
+
+def _track(node, n: int, timeout: float, last_valid=None):
+    pool = RpcPool([node.url], timeout=2)
+    tracker = ConfirmationTracker(pool, poll_interval=0.05, timeout=timeout)
+    sig = pool.send_transaction(_raw_tx(n))
+    ev, res = threading.Event(), {}
+
+    def done(s, ok, err):
+        res.update(ok=ok, err=err)
+        ev.set()
+    tracker.track(sig, done, last_valid_height=last_valid)
+    return tracker, ev, res
+
+def test_confirmed(node):
+    tracker, ev, res = _track(node, 1, timeout=5)
+    assert ev.wait(5)
+    assert res == {"ok": True, "err": None}
+    assert tracker.stats()["confirmed"] == 1
+
+def test_landing_after_timeout_is_still_reported(node):
+    # Timeout kürzer als die Bestätigung, Blockhash noch gültig -> weiter verfolgen
+    node.confirm_after = 0.6
+    tracker, ev, res = _track(node, 2, timeout=0.1, last_valid=node.block_height + 150)
+    assert ev.wait(10)
+    assert res == {"ok": True, "err": None}
+
+def test_expired_blockhash_is_a_definite_failure(node):
+    node.confirm_after = None
+    tracker, ev, res = _track(node, 3, timeout=0.1, last_valid=node.block_height + 150)
+    assert not ev.wait(0.5)          # Blockhash noch gültig -> kein Ergebnis
+    node.block_height += 200
+    assert ev.wait(10)
+    assert res == {"ok": False, "err": EXPIRED}
+    assert tracker.stats()["timeouts"] == 1
+
+def test_without_block_height_outcome_is_unknown(node):
+    node.confirm_after = None
+    tracker, ev, res = _track(node, 4, timeout=0.1)
+    assert ev.wait(5)
+    assert res == {"ok": False, "err": UNKNOWN}
+    assert tracker.stats()["unknown"] == 1
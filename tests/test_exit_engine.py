@@ -0,0 +1,124 @@
+# test_exit_engine.py — Preisfolgen durch ExitEngine.process(): Signale, Anteile, Zustands-Updates
+# - Tabelle: Preise je Tick, erwartete Signale (kind, pct, updates) und on_update-Aufrufe (neues Hoch)
+# - Fehlgeschlagene Verkäufe: wie bot._finish_exit wird die Position aus dem "Buch" neu getrackt
+# - Dieselben Fälle laufen gegen sweep.exit_path (Fills ohne Nullmengen)
+import pytest
+
+from exit_engine import ExitEngine
+
+MINT = "Mint1111111111111111111111111111111111111111"
+ENTRY = 1.0
+
+BASE = {
+    "STOP_LOSS_PCT": 10.0, "PARTIAL_ENABLED": 1, "TP1_PCT": 20.0, "TP1_SELL_PCT": 50.0,
+    "TP2_PCT": 60.0, "TP2_SELL_PCT": 100.0, "BREAKEVEN_AFTER_TP1": 0,
+    "TRAIL_AFTER_TP1_PCT": 15.0, "TP_PCT": 30.0,
+}
+
+def _tp1(price, **extra):
+    return {"tp1_hit": True, "high_after_tp1": price, **extra}
+
+# (name, cfg-Overrides, Preise, fehlgeschlagene Ticks, erwartete Ereignisse)
+# Ereignis: (tick, kind, pct, updates) für Signale, (tick, "UPD", updates) für on_update
+CASES = [
+    ("sl", {}, [1.0, 0.95, 0.89], (),
+     [(2, "SL", 100.0, {})]),
+    ("sl_disabled", {"STOP_LOSS_PCT": 0.0}, [0.5, 1.25], (),
+     [(1, "TP1", 50.0, _tp1(1.25))]),
+    ("tp1_then_sl", {}, [1.25, 1.1, 0.85], (),
+     [(0, "TP1", 50.0, _tp1(1.25)), (2, "SL", 100.0, {})]),
+    ("trailing_high_then_trail", {}, [1.21, 1.3, 1.4, 1.35, 1.18], (),
+     [(0, "TP1", 50.0, _tp1(1.21)), (1, "UPD", {"high_after_tp1": 1.3}),
+      (2, "UPD", {"high_after_tp1": 1.4}), (4, "TRAIL", 100.0, {})]),
+    ("tp2_on_new_high", {}, [1.25, 1.7], (),
+     [(0, "TP1", 50.0, _tp1(1.25)), (1, "UPD", {"high_after_tp1": 1.7}), (1, "TP2", 100.0, {})]),
+    ("gap_through_tp2", {}, [1.8, 1.8], (),
+     [(0, "TP1", 50.0, _tp1(1.8)), (1, "TP2", 100.0, {})]),
+    ("tp2_partial", {"TP2_SELL_PCT": 50.0}, [1.25, 1.61], (),
+     [(0, "TP1", 50.0, _tp1(1.25)), (1, "UPD", {"high_after_tp1": 1.61}), (1, "TP2", 50.0, {})]),
+    ("no_trail", {"TRAIL_AFTER_TP1_PCT": 0.0}, [1.25, 1.0, 1.65], (),
+     [(0, "TP1", 50.0, _tp1(1.25)), (2, "UPD", {"high_after_tp1": 1.65}), (2, "TP2", 100.0, {})]),
+    ("breakeven", {"BREAKEVEN_AFTER_TP1": 1}, [1.3], (),
+     [(0, "TP1", 50.0, _tp1(1.3, stop_price=ENTRY))]),
+    ("tp1_zero_size", {"TP1_SELL_PCT": 0.0}, [1.25, 1.0], (),
+     [(0, "TP1", 0.0, _tp1(1.25)), (1, "TRAIL", 100.0, {})]),
+    ("tp1_full_size", {"TP1_SELL_PCT": 100.0}, [1.25, 1.05], (),
+     [(0, "TP1", 100.0, _tp1(1.25)), (1, "TRAIL", 100.0, {})]),
+    ("non_partial_tp", {"PARTIAL_ENABLED": 0}, [1.1, 1.29, 1.31], (),
+     [(2, "TP", 100.0, {})]),
+    ("non_partial_sl", {"PARTIAL_ENABLED": 0}, [1.1, 0.89], (),
+     [(1, "SL", 100.0, {})]),
+    # fehlgeschlagene Verkäufe: Updates werden nicht übernommen, neu getrackt aus dem Buch
+    ("retry_tp1", {}, [1.25, 1.22], (0,),
+     [(0, "TP1", 50.0, _tp1(1.25)), (1, "TP1", 50.0, _tp1(1.22))]),
+    ("retry_sl", {}, [0.85, 0.86, 0.95], (0,),
+     [(0, "SL", 100.0, {}), (1, "SL", 100.0, {})]),
+    ("retry_trail_keeps_high", {}, [1.25, 1.4, 1.15, 1.16], (2,),
+     [(0, "TP1", 50.0, _tp1(1.25)), (1, "UPD", {"high_after_tp1": 1.4}),
+      (2, "TRAIL", 100.0, {}), (3, "TRAIL", 100.0, {})]),
+]
+
+def _cfg(over):
+    return {**BASE, **over}
+
+def _run(cfg, prices, fail=()):
+    """Spielt die Preise durch wie bot: on_update und erfolgreiche Signale schreiben ins Buch."""
+    book = {"mint": MINT, "symbol": "T", "entry_price_sol": ENTRY}
+    events, signals = [], []
+    tick = [0]
+
+    def on_update(mint, upd):
+        book.update(upd)
+        events.append((tick[0], "UPD", upd))
+
+    eng = ExitEngine(cfg, on_signal=lambda s: None, on_update=on_update)
+    eng.track(book)
+    closed = False
+    for i, p in enumerate(prices):
+        tick[0] = i
+        for sig in eng.process({MINT: p}):
+            assert sig.mint == MINT and sig.price == p
+            events.append((i, sig.kind, sig.pct, sig.updates))
+            if i in fail:
+                eng.track(dict(book))
+                continue
+            signals.append((i, sig))
+            if sig.closes:
+                closed = True
+            else:
+                book.update(sig.updates)
+    assert closed == (MINT not in eng.mints())
+    return events, signals
+
+@pytest.mark.parametrize("name,over,prices,fail,expected", CASES, ids=[c[0] for c in CASES])
+def test_price_sequence(name, over, prices, fail, expected):
+    events, _ = _run(_cfg(over), prices, fail)
+    assert events == expected
+
+def test_closed_position_ignores_ticks():
+    events, _ = _run(BASE, [0.8, 0.5, 2.0])
+    assert events == [(0, "SL", 100.0, {})]
+
+def test_config_change_reindexes():
+    cfg = dict(BASE)
+    eng = ExitEngine(cfg, on_signal=lambda s: None)
+    eng.track({"mint": MINT, "entry_price_sol": ENTRY})
+    assert eng.process({MINT: 0.92}) == []
+    cfg["STOP_LOSS_PCT"] = 5.0
+    assert [s.kind for s in eng.process({MINT: 0.92})] == ["SL"]
+
+@pytest.mark.parametrize("name,over,prices,fail,expected",
+                         [c for c in CASES if not c[3]], ids=[c[0] for c in CASES if not c[3]])
+def test_sweep_exit_path_matches(name, over, prices, fail, expected):
+    np = pytest.importorskip("numpy")
+    sweep = pytest.importorskip("sweep")
+    cfg = _cfg(over)
+    _, signals = _run(cfg, prices)
+    left, fills = 1.0, []
+    for i, sig in signals:
+        frac = left * sig.pct / 100.0
+        left = 0.0 if sig.closes else left - frac
+        fills.append((i, frac, sig.kind))
+    want = [(i, pytest.approx(f), k) for i, f, k in fills if f > 1e-12]
+    got = [(i, f, k) for i, f, k in sweep.exit_path(np.array(prices, dtype=np.float64), ENTRY, cfg) if f > 1e-12]
+    assert got == want
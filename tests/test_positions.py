@@ -0,0 +1,82 @@
+# test_positions.py — JsonFileStore/PositionBook: Persistenz, Recovery aus .tmp, fsync-Policy
+import json, os, time
+
+import pytest
+
+import positions
+from positions import JsonFileStore, PositionBook
+
+def _pos(mint: str, **kw):
+    p = {"mint": mint, "symbol": mint, "entry_price_sol": 0.001, "qty_est": 1000.0, "tp1_hit": False}
+    p.update(kw)
+    return p
+
+def test_write_then_reload(tmp_path):
+    path = str(tmp_path / "positions.json")
+    book = PositionBook(JsonFileStore(path), flush_interval=0.0)
+    book.add(_pos("A"))
+    book.add(_pos("B"))
+    book.update("A", {"tp1_hit": True})
+    book.remove("B")
+    book.close()
+
+    again = PositionBook(JsonFileStore(path), flush_interval=0.0)
+    assert [p["mint"] for p in again.list()] == ["A"]
+    assert again.get("A")["tp1_hit"] is True
+    again.close()
+
+def test_recovers_from_tmp_when_main_file_is_broken(tmp_path):
+    path = str(tmp_path / "positions.json")
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump([_pos("A")], f)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("")                      # Absturz nach dem Anlegen, vor dem Inhalt
+    assert [p["mint"] for p in JsonFileStore(path).load()] == ["A"]
+
+def test_missing_file_loads_empty(tmp_path):
+    assert JsonFileStore(str(tmp_path / "nope.json")).load() == []
+
+@pytest.fixture
+def syncs(monkeypatch):
+    calls = []
+    real_fsync, real_replace = os.fsync, os.replace
+
+    def fsync(fd):
+        calls.append("fsync")
+        real_fsync(fd)
+
+    def replace(a, b):
+        calls.append("replace")
+        real_replace(a, b)
+    monkeypatch.setattr(positions.os, "fsync", fsync)
+    monkeypatch.setattr(positions.os, "replace", replace)
+    return calls
+
+def test_interval_fsyncs_tmp_before_rename(tmp_path, syncs):
+    store = JsonFileStore(str(tmp_path / "p.json"), fsync="interval", fsync_interval=60.0)
+    store.write([_pos("A")], changed=["A"])
+    syncs.clear()
+    store.write([_pos("A"), _pos("B")], changed=["B"])   # Verzeichnis-Sync gedrosselt
+    assert syncs[:2] == ["fsync", "replace"]               # Dateiinhalt vor dem Rename auf Platte
+    assert store.sync_due() is not None and store.sync_due() > 0
+
+def test_never_does_not_fsync(tmp_path, syncs):
+    store = JsonFileStore(str(tmp_path / "p.json"), fsync="never")
+    store.write([_pos("A")], changed=["A"])
+    assert syncs == ["replace"]
+    assert store.sync_due() is None
+
+def test_deferred_sync_runs_without_further_writes(tmp_path):
+    store = JsonFileStore(str(tmp_path / "p.json"), fsync="interval", fsync_interval=0.5)
+    book = PositionBook(store, flush_interval=0.0)
+    book.add(_pos("A"))
+    time.sleep(0.1)
+    book.add(_pos("B"))              # innerhalb des Intervalls -> Sync aufgeschoben
+    end = time.time() + 3.0
+    while store.sync_due() is None and time.time() < end:
+        time.sleep(0.01)
+    assert store.sync_due() is not None
+    while store.sync_due() is not None and time.time() < end:
+        time.sleep(0.02)
+    assert store.sync_due() is None  # Flush-Thread hat nachgezogen, ohne weiteren Write
+    book.close()
@@ -0,0 +1,91 @@
+# test_rpc_pool.py — RpcPool-Failover, Broadcast und Status-Fanout gegen HttpRpcStandin
+import time
+
+import base58
+import pytest
+
+from rpc_pool import RpcPool, RpcError
+from standin_rpc import HttpRpcStandin
+
+def _raw_tx(n: int) -> bytes:
+    # Wire-Format: compact-u16 Signaturanzahl, 64 Byte Signatur, Rest egal
+    return b"\x01" + bytes([n]) * 64 + b"payload"
+
+def _sig(n: int) -> str:
+    return base58.b58encode(bytes([n]) * 64).decode()
+
+@pytest.fixture
+def nodes():
+    started = []
+
+    def make(**kw) -> HttpRpcStandin:
+        srv = HttpRpcStandin(**kw).start()
+        started.append(srv)
+        return srv
+
+    yield make
+    for srv in started:
+        srv.stop()
+
+def _wait(cond, timeout: float = 5.0) -> bool:
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+def _dead_url() -> str:
+    srv = HttpRpcStandin().start()
+    url = srv.url
+    srv.stop()
+    return url
+
+def test_call_fails_over_to_next_endpoint(nodes):
+    good = nodes()
+    pool = RpcPool([_dead_url(), good.url], timeout=2)
+    assert isinstance(pool.call("getSlot", []), int)
+    dead, ok = pool.stats()
+    assert dead["errors"] == 1 and not dead["healthy"]
+    assert ok["errors"] == 0 and ok["calls"] == 1
+    # das kranke Endpoint sitzt im Cooldown, der nächste Read geht direkt an good
+    assert pool.url == good.url
+
+def test_rpc_error_is_not_retried_elsewhere(nodes):
+    a, b = nodes(), nodes()
+    pool = RpcPool([a.url, b.url], timeout=2)
+    with pytest.raises(RpcError):
+        pool.call("noSuchMethod", [])
+    assert a.calls.get("noSuchMethod", 0) + b.calls.get("noSuchMethod", 0) == 1
+
+def test_broadcast_sends_to_all_healthy_endpoints(nodes):
+    a, b, c = nodes(), nodes(), nodes()
+    pool = RpcPool([a.url, b.url, c.url], timeout=2, broadcast=True)
+    assert pool.send_transaction(_raw_tx(5)) == _sig(5)
+    # erste Signatur zählt, die übrigen Sends laufen im Hintergrund zu Ende
+    assert _wait(lambda: all(_sig(5) in n.sent for n in (a, b, c)))
+    assert pool.send_endpoints == 3
+
+def test_broadcast_survives_failing_endpoint(nodes):
+    bad, good = nodes(fail_rate=1.0), nodes()
+    pool = RpcPool([bad.url, good.url], timeout=2, broadcast=True)
+    assert pool.send_transaction(_raw_tx(6)) == _sig(6)
+    assert _sig(6) in good.sent
+
+def test_without_broadcast_only_one_endpoint_sends(nodes):
+    a, b = nodes(), nodes()
+    pool = RpcPool([a.url, b.url], timeout=2)
+    pool.send_transaction(_raw_tx(7))
+    assert len(a.sent) + len(b.sent) == 1
+
+def test_signature_status_first_report_wins(nodes):
+    blind, seer = nodes(confirm_after=None), nodes(confirm_after=0.0)
+    pool = RpcPool([blind.url, seer.url], timeout=2, broadcast=True, confirm_fanout=2)
+    sig = pool.send_transaction(_raw_tx(8))
+    seer.fail_tx.add(_sig(9))
+    pool.send_transaction(_raw_tx(9))
+    st = pool.signature_statuses([sig, _sig(9), _sig(10)])
+    assert st[0]["confirmationStatus"] == "confirmed" and st[0]["err"] is None
+    assert st[1]["err"] is not None
+    assert st[2] is None
+    assert pool.stats()[1]["first_status"] >= 2
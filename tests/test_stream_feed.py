@@ -0,0 +1,93 @@
+# test_stream_feed.py — StreamingPriceFeed gegen die lokalen RPC-Stand-ins (standin_rpc.py)
+import base64, threading, time
+
+import base58
+import pytest
+
+pytest.importorskip("websockets")
+
+from standin_rpc import HttpRpcStandin, WsRpcStandin, base64_account, pumpfun_curve_bytes, token_account
+from stream_feed import StreamingPriceFeed, PUMPFUN_PROGRAM, RAYDIUM_AMM_V4, SOL_MINT, b58encode
+
+def _addr(n: int) -> str:
+    return b58encode(bytes([n]) * 32)
+
+MINT = _addr(7)
+POOL = _addr(8)
+
+def _wait(cond, timeout: float = 5.0) -> bool:
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond():
+            return True
+        time.sleep(0.02)
+    return False
+
+@pytest.fixture
+def standins():
+    http = HttpRpcStandin().start()
+    ws = WsRpcStandin().start()
+    yield http, ws
+    ws.stop()
+    http.stop()
+
+def _feed(http, ws, dex: str):
+    ticks = []
+    lock = threading.Lock()
+
+    def on_tick(mint, price):
+        with lock:
+            ticks.append((mint, price))
+
+    feed = StreamingPriceFeed(http.url, lambda m: (POOL, dex), on_tick, ws_url=ws.url, timeout=5)
+    feed.start()
+    feed.watch(MINT)
+    return feed, ticks
+
+def test_pumpfun_curve_streams_prices(standins):
+    http, ws = standins
+    http.accounts[POOL] = base64_account(pumpfun_curve_bytes(1e-6), owner=PUMPFUN_PROGRAM)
+    feed, ticks = _feed(http, ws, "pumpfun")
+    assert _wait(lambda: POOL in ws.subscribed)
+    ws.push_account(POOL, base64_account(pumpfun_curve_bytes(2e-6), owner=PUMPFUN_PROGRAM), slot=5)
+    assert _wait(lambda: ticks)
+    assert ticks[0][0] == MINT
+    assert ticks[0][1] == pytest.approx(2e-6)
+    assert feed.stats()["streams"] == 1
+
+    feed.unwatch(MINT)
+    assert _wait(lambda: POOL not in ws.subscribed)
+
+@pytest.mark.parametrize("dex,owner", [
+    ("pumpswap", PUMPFUN_PROGRAM),                 # AMM-Pool, kein Bonding-Curve-Layout
+    ("pumpfun", "11111111111111111111111111111111"),  # falscher Owner
+])
+def test_unrecognised_pump_pool_falls_back_to_polling(standins, dex, owner):
+    http, ws = standins
+    http.accounts[POOL] = base64_account(pumpfun_curve_bytes(1e-6), owner=owner)
+    feed, ticks = _feed(http, ws, dex)
+    assert _wait(lambda: feed.stats()["unsupported"] == 1)
+    assert POOL not in ws.subscribed
+    assert not ticks
+
+def test_pumpfun_wrong_discriminator_is_unsupported(standins):
+    http, ws = standins
+    data = b"\0" * 8 + pumpfun_curve_bytes(1e-6)[8:]
+    http.accounts[POOL] = base64_account(data, owner=PUMPFUN_PROGRAM)
+    feed, _ = _feed(http, ws, "pumpfun")
+    assert _wait(lambda: feed.stats()["unsupported"] == 1)
+
+def test_raydium_vaults_stream_prices(standins):
+    http, ws = standins
+    base_vault, quote_vault = _addr(1), _addr(2)
+    layout = bytearray(464)
+    for off, addr in ((336, base_vault), (368, quote_vault), (400, MINT), (432, SOL_MINT)):
+        layout[off:off + 32] = base58.b58decode(addr)
+    http.accounts[POOL] = {"data": [base64.b64encode(bytes(layout)).decode(), "base64"], "owner": RAYDIUM_AMM_V4,
+                           "lamports": 1, "executable": False, "rentEpoch": 0}
+    feed, ticks = _feed(http, ws, "raydium")
+    assert _wait(lambda: {base_vault, quote_vault} <= ws.subscribed)
+    ws.push_account(base_vault, token_account(1_000_000.0))
+    ws.push_account(quote_vault, token_account(30.0, decimals=9))
+    assert _wait(lambda: ticks)
+    assert ticks[-1][1] == pytest.approx(30.0 / 1_000_000.0)
@@ -0,0 +1,59 @@
+# test_vector_engine.py — filter_and_rank muss exakt apply_strategy(filter_pairs(...)) liefern
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("numpy")
+
+import bot
+import pairs
+import vector_engine
+from ingest import synthetic_pairs, project_pair
+from pairs import PairSnapshot
+
+NOW = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+NOW_MS = pairs._now_us(NOW) // 1000
+
+# Varianten der Strategie: Standard, alles offen, streng, ohne Age/FDV/VOL_BEST, Quote-Filter aus
+VARIANTS = [
+    {},
+    {"STRAT_LIQ_MIN": 0, "STRAT_FDV_MAX": 0, "STRAT_VOL5M_MIN": 0, "STRAT_VOL_BEST_MIN": 0, "MAX_AGE_MIN": 0},
+    {"STRAT_LIQ_MIN": 200000, "STRAT_FDV_MAX": 50000000, "STRAT_VOL5M_MIN": 500, "STRAT_VOL_BEST_MIN": 10000, "MAX_AGE_MIN": 600},
+    {"STRAT_FDV_MAX": 0, "STRAT_VOL_BEST_MIN": 0, "MAX_AGE_MIN": 0},
+    {"STRICT_QUOTE": 0},
+]
+
+@pytest.fixture
+def fixed_clock(monkeypatch):
+    fixed = lambda now=None: pairs._now_us(now or NOW)
+    monkeypatch.setattr(bot, "_now_us", fixed)
+    monkeypatch.setattr(vector_engine, "_now_us", fixed)
+
+def _snapshots(n: int, seed: int):
+    raw = synthetic_pairs(n, seed, now_ms=NOW_MS)
+    # ein Teil fremde Chain/Quote, damit Chain- und Quote-Filter etwas zu tun haben
+    for i, p in enumerate(raw):
+        if i % 7 == 3:
+            p["chainId"] = "ethereum"
+            p["url"] = f"https://dexscreener.com/ethereum/pair{i}"
+        if i % 5 == 1:
+            p["quoteToken"] = {"address": "EPjFWdd5AufqSSqeM2qN1xzybapC8G4wEGGkZwyTDt1v", "name": "USD Coin", "symbol": "USDC"}
+        if i % 11 == 4:
+            p.pop("pairCreatedAt")
+    return [PairSnapshot.from_pair(project_pair(p)) for p in raw]
+
+def _key(rows):
+    return [(p.pid, liq, fdv, vol5, best) for (p, liq, fdv, vol5, best) in rows]
+
+@pytest.mark.parametrize("variant", VARIANTS)
+@pytest.mark.parametrize("n,seed", [(1, 1), (50, 7), (300, 42), (2000, 1234)])
+def test_matches_python_path(fixed_clock, monkeypatch, n, seed, variant):
+    for k, v in variant.items():
+        monkeypatch.setitem(bot.CONFIG, k, v)
+    snaps = _snapshots(n, seed)
+    want = bot.apply_strategy(bot.filter_pairs(snaps))
+    got = vector_engine.filter_and_rank(snaps, bot.CONFIG)
+    assert _key(got) == _key(want)
+
+def test_empty_scan():
+    assert vector_engine.filter_and_rank([], bot.CONFIG) == []
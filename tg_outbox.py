@@ -0,0 +1,165 @@
+# tg_outbox.py — Asynchroner Telegram-Versand (Outbox)
+# - Hintergrund-Thread mit Token-Bucket, respektiert retry_after (HTTP 429)
+# - Broadcast-Bursts werden zu einer Nachricht zusammengefasst (max. 4096 Zeichen)
+# - Begrenzte Queue: bei Überlauf fliegen zuerst Scan-Digests, dann Infos, Trade-Meldungen zuletzt
+import threading, time
+from collections import deque
+from typing import Callable, Dict, Any, Optional, List
+
+PRIO_TRADE = 0    # Käufe, Verkäufe, SL/TP, Antworten auf Befehle
+PRIO_INFO = 1     # Status-/Hinweistexte
+PRIO_DIGEST = 2   # Scan-Ergebnisse (ersetzbar, zuerst verworfen)
+
+TG_MAX_LEN = 4096
+
+class _Msg:
+    __slots__ = ("chat_id", "text", "params", "prio", "key", "coalesce", "ts", "parts")
+
+    def __init__(self, chat_id, text, params, prio, key, coalesce):
+        self.chat_id = chat_id
+        self.text = text
+        self.params = params
+        self.prio = prio
+        self.key = key
+        self.coalesce = coalesce
+        self.ts = time.time()
+        self.parts = 1
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = max(0.01, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.at = time.monotonic()
+
+    def wait_time(self) -> float:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.at) * self.rate)
+        self.at = now
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+    def take(self):
+        self.tokens -= 1.0
+
+class Outbox:
+    """
+    send(method, params) -> Telegram-Antwort (dict). Nachrichten werden über enqueue() eingereiht,
+    der Aufrufer wartet nie auf Telegram.
+    """
+
+    def __init__(self, send: Callable[[str, Dict[str, Any]], Dict[str, Any]],
+                 rate: float = 1.0, burst: float = 3.0, max_size: int = 200, coalesce_window: float = 0.3):
+        self.send = send
+        self.bucket = TokenBucket(rate, burst)
+        self.max_size = max(1, int(max_size))
+        self.coalesce_window = float(coalesce_window)
+        self._q: List[deque] = [deque(), deque(), deque()]
+        self._cv = threading.Condition()
+        self._paused_until = 0.0
+        self._thread: Optional[threading.Thread] = None
+        self.sent = self.merged = self.dropped = self.replaced = self.rate_limited = self.errors = 0
+
+    def __len__(self):
+        with self._cv:
+            return sum(len(q) for q in self._q)
+
+    # ---------- Einreihen ----------
+    def enqueue(self, chat_id, text: str, params: Optional[Dict[str, Any]] = None, prio: int = PRIO_TRADE,
+                key: Optional[str] = None, coalesce: bool = False):
+        prio = max(PRIO_TRADE, min(PRIO_DIGEST, int(prio)))
+        m = _Msg(chat_id, text, dict(params or {}), prio, key, coalesce)
+        with self._cv:
+            if key is not None:
+                # neuere Version ersetzt die noch nicht gesendete (z. B. Scan-Digest)
+                for q in self._q:
+                    for old in q:
+                        if old.key == key and old.chat_id == chat_id:
+                            old.text, old.params, old.ts = m.text, m.params, m.ts
+                            self.replaced += 1
+                            return
+            if sum(len(q) for q in self._q) >= self.max_size and not self._make_room(prio):
+                self.dropped += 1
+                return
+            self._q[prio].append(m)
+            self._cv.notify()
+        self._start()
+
+    def _make_room(self, prio: int) -> bool:
+        # älteste Nachricht der niedrigsten Priorität verwerfen, aber nie eine wichtigere als die neue
+        for p in range(PRIO_DIGEST, prio - 1, -1):
+            if self._q[p]:
+                self._q[p].popleft()
+                self.dropped += 1
+                return True
+        return False
+
+    # ---------- Versand ----------
+    def _start(self):
+        with self._cv:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="tg-outbox", daemon=True)
+                self._thread.start()
+
+    def _next(self) -> Optional[_Msg]:
+        for q in self._q:
+            if q:
+                return q.popleft()
+        return None
+
+    def _merge(self, m: _Msg):
+        # weitere Broadcasts derselben Klasse (gleicher Chat, gleiche Parameter) anhängen
+        q = self._q[m.prio]
+        rest = deque()
+        while q:
+            o = q.popleft()
+            if (o.coalesce and o.key is None and o.chat_id == m.chat_id and o.params == m.params
+                    and len(m.text) + 2 + len(o.text) <= TG_MAX_LEN):
+                m.text += "\n\n" + o.text
+                m.parts += 1
+                self.merged += 1
+            else:
+                rest.append(o)
+        self._q[m.prio] = rest
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not any(self._q):
+                    self._cv.wait()
+                m = self._next()
+            if m.coalesce and m.key is None:
+                # kurz sammeln, damit ein Burst als eine Nachricht rausgeht
+                delay = self.coalesce_window - (time.time() - m.ts)
+                if delay > 0:
+                    time.sleep(delay)
+                with self._cv:
+                    self._merge(m)
+            wait = max(self._paused_until - time.time(), self.bucket.wait_time())
+            if wait > 0:
+                time.sleep(wait)
+            self.bucket.wait_time()
+            self.bucket.take()
+            res = self.send("sendMessage", dict(m.params, chat_id=m.chat_id, text=m.text)) or {}
+            if res.get("ok"):
+                self.sent += 1
+                continue
+            retry = ((res.get("parameters") or {}).get("retry_after"))
+            if res.get("error_code") == 429 or retry:
+                # Flood-Limit: Versand pausieren, Nachricht vorne wieder einreihen
+                self.rate_limited += 1
+                self._paused_until = time.time() + float(retry or 1)
+                print(f"[TG] Flood-Limit, Pause {float(retry or 1):.0f}s")
+                with self._cv:
+                    self._q[m.prio].appendleft(m)
+                continue
+            self.errors += 1
+            print(f"[TG] sendMessage fehlgeschlagen: {res.get('description') or res}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cv:
+            return {
+                "queued": [len(q) for q in self._q],
+                "sent": self.sent, "merged": self.merged, "replaced": self.replaced,
+                "dropped": self.dropped, "rate_limited": self.rate_limited, "errors": self.errors,
+                "paused_for": max(0.0, self._paused_until - time.time()),
+            }
@@ -1,11 +1,16 @@
 # trading.py — Wallet & Trading über Jupiter v6 (mit Auto-ATA)
 # - Echte Swaps (SOL <-> Token) mit Quote-/Swap-API
-# - Legt fehlende Associated Token Accounts (ATA) automatisch an
+# - Fehlende Associated Token Accounts (ATA) legt Jupiter idempotent im Swap an;
+#   bekannte ATAs liegen in einem persistenten Cache (Batch-Check via getMultipleAccounts)
 # - Slippage/Timeout/Priority-Fee per ENV und /set steuerbar
 
 from __future__ import annotations
-from typing import Optional, Tuple, List
-import os, json, base64, requests
+from typing import Optional, Tuple, List, Dict, Any, Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+import os, json, math, time, base64, threading, requests
+
+from confirm_tracker import ConfirmationTracker
+from rpc_pool import RpcPool, urls_from_env
 
 # ===== Konstanten =====
 SOL_MINT = "So11111111111111111111111111111111111111112"
@@ -27,16 +32,260 @@ def _pick_rpc() -> str:
         or "https://api.mainnet-beta.solana.com"
     ).strip()
 
+# ===== Quote-Cache =====
+class QuoteCache:
+    """
+    Kurzlebige Jupiter-Quotes, Schlüssel (inputMint, outputMint, Betrags-Bucket, slippageBps).
+    Beträge im selben Bucket unterscheiden sich um weniger als bucket_bps.
+    Laufende Vorab-Quotes sind je Schlüssel registriert (single-flight): ein Buy wartet auf sie,
+    statt dieselbe Quote ein zweites Mal zu holen.
+    """
+
+    def __init__(self, ttl: float = 3.0, bucket_bps: int = 50, max_size: int = 256):
+        self.ttl = float(ttl)
+        self.bucket_bps = max(1, int(bucket_bps))
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._data: Dict[tuple, Tuple[dict, float]] = {}
+        self._inflight: Dict[tuple, Future] = {}
+        self.hits = self.misses = self.expired = self.stored = self.waited = 0
+        self._age_sum = 0.0
+        self.max_age_used = 0.0
+
+    def _bucket(self, amount_raw: int) -> int:
+        return int(math.log(max(1, amount_raw)) / math.log1p(self.bucket_bps / 10_000))
+
+    def key(self, input_mint: str, output_mint: str, amount_raw: int, slippage_bps: int) -> tuple:
+        return (input_mint, output_mint, self._bucket(amount_raw), int(slippage_bps))
+
+    def put(self, key: tuple, quote: dict):
+        with self._lock:
+            self._data[key] = (quote, time.time())
+            self.stored += 1
+            if len(self._data) > self.max_size:
+                oldest = min(self._data, key=lambda k: self._data[k][1])
+                self._data.pop(oldest, None)
+
+    def begin(self, key: tuple, submit: Callable[[], Future]) -> bool:
+        """Vorab-Quote starten, falls für key noch keine läuft (submit() -> Future)."""
+        with self._lock:
+            if key in self._inflight:
+                return False
+            fut = self._inflight[key] = submit()
+        fut.add_done_callback(lambda f, k=key: self._finish(k, f))
+        return True
+
+    def _finish(self, key: tuple, fut: Future):
+        with self._lock:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def wait(self, key: tuple, timeout: float) -> bool:
+        """Auf eine laufende Vorab-Quote für key warten (False, wenn keine läuft)."""
+        with self._lock:
+            fut = self._inflight.get(key)
+        if fut is None:
+            return False
+        try:
+            fut.result(timeout)
+        except Exception:
+            return False
+        with self._lock:
+            self.waited += 1
+        return True
+
+    def take(self, key: tuple) -> Tuple[Optional[dict], float]:
+        """Frische Quote entnehmen (einmalig nutzbar) -> (quote, alter_s) oder (None, 0)."""
+        with self._lock:
+            ent = self._data.pop(key, None)
+            if ent is None:
+                self.misses += 1
+                return None, 0.0
+            age = time.time() - ent[1]
+            if age > self.ttl:
+                self.expired += 1
+                self.misses += 1
+                return None, 0.0
+            self.hits += 1
+            self._age_sum += age
+            self.max_age_used = max(self.max_age_used, age)
+            return ent[0], age
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data), "ttl": self.ttl, "stored": self.stored,
+                "hits": self.hits, "misses": self.misses, "expired": self.expired, "waited": self.waited,
+                "inflight": len(self._inflight),
+                "hit_rate": self.hits / total if total else 0.0,
+                "avg_age": self._age_sum / self.hits if self.hits else 0.0,
+                "max_age": self.max_age_used,
+            }
+
+# ===== ATA-Cache =====
+class AtaCache:
+    """
+    Persistente Menge bekannter (existierender) ATAs: mint -> ata.
+    Nur bestätigt existierende Accounts werden gespeichert; ein ATA wird nie wieder geschlossen.
+    """
+
+    def __init__(self, path: str = "ata_cache.json"):
+        self.path = path
+        self._lock = threading.Lock()
+        self._known: Dict[str, str] = {}
+        self.hits = self.misses = self.checked = self.created = 0
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                self._known = {str(k): str(v) for k, v in data.items()}
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"[ATA] Cache {path} unlesbar: {e}")
+
+    def get(self, mint: str) -> Optional[str]:
+        with self._lock:
+            ata = self._known.get(mint)
+            if ata:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return ata
+
+    def known(self, mint: str) -> bool:
+        with self._lock:
+            return mint in self._known
+
+    def add_many(self, items: Dict[str, str]):
+        if not items:
+            return
+        with self._lock:
+            new = {m: a for m, a in items.items() if self._known.get(m) != a}
+            if not new:
+                return
+            self._known.update(new)
+            snapshot = dict(self._known)
+        self._save(snapshot)
+
+    def _save(self, data: Dict[str, str]):
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except Exception as e:
+            print(f"[ATA] Cache speichern fehlgeschlagen: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"known": len(self._known), "hits": self.hits, "misses": self.misses,
+                    "checked": self.checked, "created": self.created}
+
+# ===== Balance-Cache =====
+class BalanceCache:
+    """
+    SOL- (Lamports) und Token-Bestände (raw, decimals) mit kurzer TTL.
+    Gesendete/bestätigte Swaps invalidieren die betroffenen Einträge.
+    """
+
+    def __init__(self, ttl: float = 10.0):
+        self.ttl = float(ttl)
+        self._lock = threading.Lock()
+        self._sol: Optional[Tuple[int, float]] = None
+        self._tok: Dict[str, Tuple[int, int, float]] = {}
+        self.watched: set = set()
+        self.hits = self.misses = self.invalidations = self.refreshes = 0
+
+    def _fresh(self, ts: float, max_age: Optional[float]) -> bool:
+        return time.time() - ts <= (self.ttl if max_age is None else max_age)
+
+    def get_sol(self, max_age: Optional[float] = None) -> Optional[int]:
+        with self._lock:
+            if self._sol and self._fresh(self._sol[1], max_age):
+                self.hits += 1
+                return self._sol[0]
+            self.misses += 1
+            return None
+
+    def set_sol(self, lamports: int):
+        with self._lock:
+            self._sol = (int(lamports), time.time())
+
+    def get_token(self, mint: str, max_age: Optional[float] = None) -> Optional[Tuple[int, int]]:
+        with self._lock:
+            ent = self._tok.get(mint)
+            if ent and self._fresh(ent[2], max_age):
+                self.hits += 1
+                return ent[0], ent[1]
+            self.misses += 1
+            return None
+
+    def set_token(self, mint: str, raw: int, decimals: int):
+        with self._lock:
+            self._tok[mint] = (int(raw), int(decimals), time.time())
+
+    def invalidate(self, *mints: str):
+        with self._lock:
+            for m in mints:
+                if not m:
+                    continue
+                self.invalidations += 1
+                if m == SOL_MINT:
+                    self._sol = None
+                else:
+                    self._tok.pop(m, None)
+
+    def watch(self, mint: str):
+        if mint and mint != SOL_MINT:
+            with self._lock:
+                self.watched.add(mint)
+
+    def unwatch(self, mint: str):
+        with self._lock:
+            self.watched.discard(mint)
+            self._tok.pop(mint, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "sol_age": (time.time() - self._sol[1]) if self._sol else None,
+                "tokens": len(self._tok), "watched": len(self.watched), "ttl": self.ttl,
+                "hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "invalidations": self.invalidations, "refreshes": self.refreshes,
+            }
+
 # ===== Trader =====
 class JupiterTrader:
     def __init__(self):
-        self.rpc_url = _pick_rpc()
         self.slippage_bps = int(os.getenv("SLIPPAGE_BPS", "100"))      # 1.00% default
         self.swap_timeout = int(os.getenv("SWAP_TIMEOUT", "45"))        # Sekunden
+        # RPC-Pool: SOLANA_RPC_URLS (kommagetrennt) oder die Einzel-URL wie bisher
+        self.rpc = RpcPool(
+            urls_from_env(_pick_rpc()),
+            timeout=float(os.getenv("RPC_TIMEOUT", "15")),
+            broadcast=os.getenv("RPC_BROADCAST", "0") in ("1","true","True"),
+            confirm_fanout=int(os.getenv("RPC_CONFIRM_FANOUT", "2")),
+        )
+        self.rpc_url = self.rpc.url
         self.priority_lamports = int(os.getenv("JUPITER_PRIORITY_LAMPORTS", "5000"))
         self.as_legacy = os.getenv("JUPITER_AS_LEGACY", "1") in ("1","true","True")
         self.dynamic_cu = os.getenv("JUPITER_DYNAMIC_CU_LIMIT", "1") in ("1","true","True")
         self.wrap_unwrap = os.getenv("WRAP_UNWRAP_SOL", "1") in ("1","true","True")
+        self.quotes = QuoteCache(
+            ttl=float(os.getenv("QUOTE_TTL_SEC", "3")),
+            bucket_bps=int(os.getenv("QUOTE_BUCKET_BPS", "50")),
+        )
+        self._bg = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prequote")
+        self.atas = AtaCache(os.getenv("ATA_CACHE_PATH", "ata_cache.json"))
+        self.balances = BalanceCache(ttl=float(os.getenv("BALANCE_TTL_SEC", "10")))
+        self.balance_refresh_sec = float(os.getenv("BALANCE_REFRESH_SEC", "0"))   # 0 = kein Hintergrund-Refresh
+        self.tracker = ConfirmationTracker(self.rpc, poll_interval=float(os.getenv("CONFIRM_POLL_SEC", "0.5")),
+                                           timeout=self.swap_timeout)
+        # fehlende ATAs für Kandidaten vorab anlegen (kostet Rent) – default aus
+        self.ata_preprovision = os.getenv("ATA_PREPROVISION", "0") in ("1","true","True")
 
         # Lazy Imports / Flags
         self._sol_ok = False
@@ -75,10 +324,14 @@ class JupiterTrader:
             self._client = Client(self.rpc_url)
             self._keypair = self._parse_secret(secret)
             self._pubkey = str(self._keypair.public_key)
-            print(f"[WALLET] Secret OK | RPC={self.rpc_url}")
+            print(f"[WALLET] Secret OK | RPC={self.rpc_url} ({len(self.rpc.endpoints)} Endpoint(s))")
             print(f"[WALLET] Address: {self._pubkey}")
         except Exception as e:
             print(f"[WALLET] Fehler beim Laden: {e}")
+            return
+        self.rpc.start_probing(float(os.getenv("RPC_PROBE_SEC", "30")))
+        if self.balance_refresh_sec > 0:
+            threading.Thread(target=self._balance_loop, name="balance-refresh", daemon=True).start()
 
     # ---------- Wallet Basics ----------
     @property
@@ -97,15 +350,66 @@ class JupiterTrader:
             return Keypair.from_secret_key(bytes(arr))
         return Keypair.from_secret_key(base58.b58decode(s))
 
-    def get_sol_balance(self) -> float:
+    def get_sol_balance(self, max_age: Optional[float] = None) -> float:
         if not (self._sol_ok and self._pubkey):
             return 0.0
+        lamports = self.balances.get_sol(max_age)
+        if lamports is not None:
+            return lamports / LAMPORTS_PER_SOL
         try:
-            lamports = self._rpc().get_balance(self._keypair.public_key).value
+            lamports = int(self.rpc.call("getBalance", [self._pubkey, {"commitment": "confirmed"}])["value"])
+            self.balances.set_sol(lamports)
             return lamports / LAMPORTS_PER_SOL
         except Exception:
             return 0.0
 
+    def get_token_raw(self, mint: str, max_age: Optional[float] = None) -> Tuple[int, int]:
+        """(raw, decimals) des Token-ATAs, gecacht; Fehler (z. B. kein ATA) werden durchgereicht."""
+        cached = self.balances.get_token(mint, max_age)
+        if cached is not None:
+            return cached
+        bal = (self.rpc.call("getTokenAccountBalance", [self._ata_address(mint), {"commitment": "confirmed"}]) or {}).get("value")
+        if not bal:
+            return 0, 0
+        raw, dec = int(bal.get("amount", "0") or 0), int(bal.get("decimals", 0) or 0)
+        self.balances.set_token(mint, raw, dec)
+        return raw, dec
+
+    def refresh_balances(self, mints: Optional[List[str]] = None) -> bool:
+        """SOL + Token-ATAs (beobachtete bzw. übergebene Mints) in einem getMultipleAccounts-Call (à 100)."""
+        if not (self._sol_ok and self._pubkey):
+            return False
+        mints = [m for m in dict.fromkeys(mints if mints is not None else sorted(self.balances.watched)) if m != SOL_MINT]
+        keys = [(None, self._pubkey)] + [(m, self._ata_address(m)) for m in mints]
+        for i in range(0, len(keys), 100):
+            chunk = keys[i:i + 100]
+            try:
+                res = self.rpc.call("getMultipleAccounts", [[a for _, a in chunk], {"encoding": "jsonParsed", "commitment": "confirmed"}])
+                values = (res or {}).get("value") or []
+            except Exception as e:
+                print(f"[BAL] getMultipleAccounts ERR: {e}")
+                return False
+            for (m, _), v in zip(chunk, values):
+                if m is None:
+                    if v is not None:
+                        self.balances.set_sol(int(v.get("lamports", 0) or 0))
+                    continue
+                try:
+                    ta = v["data"]["parsed"]["info"]["tokenAmount"] if v else None
+                except Exception:
+                    ta = None
+                if ta is None:
+                    self.balances.set_token(m, 0, 0)
+                else:
+                    self.balances.set_token(m, int(ta.get("amount", "0") or 0), int(ta.get("decimals", 0) or 0))
+        self.balances.refreshes += 1
+        return True
+
+    def _balance_loop(self):
+        while True:
+            self.refresh_balances()
+            time.sleep(max(1.0, self.balance_refresh_sec))
+
     def describe_wallet(self) -> str:
         if not self._sol_ok:
             return "Wallet: Python-Pakete fehlen (solana/spl/base58)."
@@ -140,6 +444,55 @@ class JupiterTrader:
         except Exception:
             return 0.0, 0, 0
 
+    def _ata_address(self, mint: str) -> str:
+        from solana.publickey import PublicKey
+        from spl.token.instructions import get_associated_token_address
+        return str(get_associated_token_address(self._keypair.public_key, PublicKey(mint)))
+
+    def check_atas(self, mints: List[str]) -> Dict[str, bool]:
+        """Existenz der ATAs per getMultipleAccounts (Batches à 100); Treffer landen im Cache."""
+        if not (self._sol_ok and self._pubkey):
+            return {}
+        out: Dict[str, bool] = {}
+        todo = []
+        for m in dict.fromkeys(mints):
+            if not m or m == SOL_MINT:
+                continue
+            if self.atas.known(m):
+                out[m] = True
+            else:
+                todo.append((m, self._ata_address(m)))
+        found: Dict[str, str] = {}
+        for i in range(0, len(todo), 100):
+            chunk = todo[i:i + 100]
+            try:
+                res = self.rpc.call("getMultipleAccounts", [[a for _, a in chunk],
+                                    {"encoding": "base64", "commitment": "confirmed", "dataSlice": {"offset": 0, "length": 0}}])
+                values = (res or {}).get("value") or []
+            except Exception as e:
+                print(f"[ATA] getMultipleAccounts ERR: {e}")
+                continue
+            self.atas.checked += len(chunk)
+            for (m, a), v in zip(chunk, values):
+                out[m] = v is not None
+                if v is not None:
+                    found[m] = a
+        self.atas.add_many(found)
+        return out
+
+    def prepare_atas_async(self, mints: List[str]):
+        """Kandidaten-ATAs im Hintergrund prüfen und (ATA_PREPROVISION=1) fehlende anlegen."""
+        def run():
+            try:
+                missing = [m for m, ok in self.check_atas(mints).items() if not ok]
+                if self.ata_preprovision:
+                    for m in missing:
+                        self._ensure_ata(m)
+            except Exception as e:
+                print(f"[ATA] Vorbereitung ERR: {e}")
+        if self._sol_ok and self._pubkey and mints:
+            self._bg.submit(run)
+
     def _ensure_ata(self, mint: str) -> Optional[str]:
         try:
             from solana.publickey import PublicKey
@@ -156,6 +509,8 @@ class JupiterTrader:
                 tx.add(create_associated_token_account(payer=owner, owner=owner, mint=mint_pk))
                 sig = self._rpc().send_transaction(tx, self._keypair, opts=TxOpts(skip_preflight=False, preflight_commitment="confirmed"))
                 self._rpc().confirm_transaction(sig.value, commitment="confirmed")
+                self.atas.created += 1
+            self.atas.add_many({mint: str(ata)})
             return str(ata)
         except Exception as e:
             print("[ATA] Fehler:", e)
@@ -176,7 +531,63 @@ class JupiterTrader:
         r.raise_for_status()
         return r.json()
 
+    def prequote_buy(self, out_mint: str, amount_sol: float) -> bool:
+        """Quote SOL -> out_mint vorab holen und cachen (für buy_with_sol)."""
+        if not (self._sol_ok and self._pubkey) or amount_sol <= 0:
+            return False
+        amount_raw = int(float(amount_sol) * LAMPORTS_PER_SOL)
+        try:
+            quote = self._jupiter_quote(SOL_MINT, out_mint, amount_raw)
+        except Exception as e:
+            print(f"[QUOTE] prequote {out_mint[:6]}… ERR: {e}")
+            return False
+        self.quotes.put(self.quotes.key(SOL_MINT, out_mint, amount_raw, self.slippage_bps), quote)
+        return True
+
+    def prequote_async(self, out_mints: List[str], amount_sol: float):
+        amount_raw = int(float(amount_sol) * LAMPORTS_PER_SOL)
+        for m in out_mints:
+            key = self.quotes.key(SOL_MINT, m, amount_raw, self.slippage_bps)
+            self.quotes.begin(key, lambda m=m: self._bg.submit(self.prequote_buy, m, amount_sol))
+
     def _jupiter_swap(self, quote: dict, output_mint: Optional[str] = None) -> str:
+        """Senden und blockierend bestätigen (über den Tracker, erster meldender Endpoint zählt)."""
+        sig, last_valid = self._swap_send(quote, output_mint)
+        ev, res = threading.Event(), {}
+
+        def done(s: str, ok: bool, err: Optional[str]):
+            res.update(ok=ok, err=err)
+            ev.set()
+        self.tracker.track(sig, done, timeout=self.swap_timeout, last_valid_height=last_valid)
+        # der Tracker meldet spätestens nach Ablauf des Blockhashs (~150 Blöcke) ein Ergebnis
+        ev.wait(self.swap_timeout + 120)
+        if not res.get("ok"):
+            raise RuntimeError(f"TX {sig} nicht bestätigt: {res.get('err') or 'unknown'}")
+        self._on_landed(quote, output_mint)
+        return sig
+
+    def _on_landed(self, quote: dict, output_mint: Optional[str]):
+        self.balances.invalidate(SOL_MINT, quote.get("inputMint"), quote.get("outputMint"))
+        if output_mint and output_mint != SOL_MINT:
+            self.balances.watch(output_mint)
+            if not self.atas.known(output_mint):
+                self.atas.add_many({output_mint: self._ata_address(output_mint)})
+
+    def _swap_submit(self, quote: dict, output_mint: Optional[str],
+                     on_done: Callable[[str, bool, Optional[str]], None]) -> str:
+        """Senden und sofort zurückkehren; der ConfirmationTracker meldet das Ergebnis."""
+        sig, last_valid = self._swap_send(quote, output_mint)
+
+        def done(s: str, ok: bool, err: Optional[str]):
+            if ok:
+                self._on_landed(quote, output_mint)
+            on_done(s, ok, err)
+        self.tracker.timeout = self.swap_timeout
+        self.tracker.track(sig, done, last_valid_height=last_valid)
+        return sig
+
+    def _swap_send(self, quote: dict, output_mint: Optional[str] = None) -> Tuple[str, Optional[int]]:
+        """Signierte TX senden -> (Signatur, lastValidBlockHeight laut Jupiter oder None)."""
         url = os.getenv("JUPITER_SWAP_URL", "https://quote-api.jup.ag/v6/swap")
         payload = {
             "userPublicKey": self._pubkey,
@@ -186,9 +597,10 @@ class JupiterTrader:
             "dynamicComputeUnitLimit": self.dynamic_cu,
             "prioritizationFeeLamports": self.priority_lamports,
         }
-        # Ziel-ATA (nur wenn Output != SOL)
+        # Ziel-ATA (nur wenn Output != SOL): bekannt -> direkt angeben; unbekannt -> weglassen,
+        # Jupiter nutzt dann das Standard-ATA und legt es idempotent in derselben Transaktion an
         if output_mint and output_mint != SOL_MINT:
-            ata = self._ensure_ata(output_mint)
+            ata = self.atas.get(output_mint)
             if ata:
                 payload["destinationTokenAccount"] = ata
 
@@ -200,56 +612,85 @@ class JupiterTrader:
             raise RuntimeError(f"Swap-Error: {data}")
         # Wir nutzen Legacy-Transaktionen (asLegacy=true)
         from solana.transaction import Transaction
-        from solana.rpc.types import TxOpts
         raw = base64.b64decode(b64tx)
         tx = Transaction.deserialize(raw)
         tx.sign(self._keypair)
-        sig = self._rpc().send_raw_transaction(bytes(tx), opts=TxOpts(skip_preflight=False, max_retries=3))
-        self._rpc().confirm_transaction(sig.value, commitment="confirmed")
-        return str(sig.value)
+        # RPC_BROADCAST=1: parallel an alle gesunden Endpoints
+        sig = self.rpc.send_transaction(bytes(tx), skip_preflight=False, max_retries=3)
+        # Bestände ändern sich mit dem Swap -> gecachte Werte verwerfen (Fees zählen auch bei Fehlschlag)
+        self.balances.invalidate(SOL_MINT, quote.get("inputMint"), quote.get("outputMint"))
+        last_valid = data.get("lastValidBlockHeight")
+        return sig, (int(last_valid) if last_valid else None)
 
     # ---------- Public: BUY & SELL ----------
+    def fill(self, sig: str) -> Optional[Dict[str, Any]]:
+        # live kommen keine Ausführungsdaten zurück (Ledger schätzt über den Preis) – siehe PaperTrader.fill
+        return None
+
     def buy_with_sol(self, out_mint: str, amount_sol: float) -> str:
         """
-        Kauft amount_sol (SOL) -> out_mint (Token).
+        Kauft amount_sol (SOL) -> out_mint (Token) und wartet auf die Bestätigung.
+        """
+        return self.submit_buy(out_mint, amount_sol)[1]
+
+    def submit_buy(self, out_mint: str, amount_sol: float,
+                   on_done: Optional[Callable[[str, bool, Optional[str]], None]] = None) -> Tuple[Optional[str], str]:
+        """
+        Wie buy_with_sol; mit on_done kehrt es direkt nach dem Senden zurück.
+        Returns (signatur | None, meldung).
         """
         if not (self._sol_ok and self._pubkey):
-            return "⚠️ Trading inaktiv (Pakete oder WALLET_SECRET fehlen)."
+            return None, "⚠️ Trading inaktiv (Pakete oder WALLET_SECRET fehlen)."
         if amount_sol <= 0:
-            return "⚠️ Amount <= 0."
+            return None, "⚠️ Amount <= 0."
         amount_raw = int(float(amount_sol) * LAMPORTS_PER_SOL)
         try:
-            quote = self._jupiter_quote(SOL_MINT, out_mint, amount_raw)
+            # vorab geholte Quote nutzen (Round-Trip gespart; läuft sie noch, darauf warten), sonst frisch anfragen
+            key = self.quotes.key(SOL_MINT, out_mint, amount_raw, self.slippage_bps)
+            self.quotes.wait(key, self.swap_timeout)
+            quote, age = self.quotes.take(key)
+            if quote is None:
+                quote = self._jupiter_quote(SOL_MINT, out_mint, amount_raw)
+                src = "live"
+            else:
+                src = f"cache {age:.1f}s"
+            spent = int(quote.get("inAmount", amount_raw) or amount_raw) / LAMPORTS_PER_SOL
+            if on_done:
+                sig = self._swap_submit(quote, out_mint, on_done)
+                return sig, f"📤 BUY {spent:.6f} SOL -> {out_mint[:6]}… gesendet (Quote: {src})\nTX: https://solscan.io/tx/{sig}"
             sig = self._jupiter_swap(quote, output_mint=out_mint)
-            return f"✅ BUY {amount_sol:.6f} SOL -> {out_mint[:6]}…\nTX: https://solscan.io/tx/{sig}"
+            return sig, f"✅ BUY {spent:.6f} SOL -> {out_mint[:6]}… (Quote: {src})\nTX: https://solscan.io/tx/{sig}"
         except Exception as e:
-            return f"❌ Buy-Fehler: {e}"
+            return None, f"❌ Buy-Fehler: {e}"
 
     def sell_to_sol(self, in_mint: str, pct: float) -> str:
         """
-        Verkauft pct% des Token-Bestandes (in_mint) -> SOL.
+        Verkauft pct% des Token-Bestandes (in_mint) -> SOL und wartet auf die Bestätigung.
+        """
+        return self.submit_sell(in_mint, pct)[1]
+
+    def submit_sell(self, in_mint: str, pct: float,
+                    on_done: Optional[Callable[[str, bool, Optional[str]], None]] = None) -> Tuple[Optional[str], str]:
+        """
+        Wie sell_to_sol; mit on_done kehrt es direkt nach dem Senden zurück.
+        Returns (signatur | None, meldung).
         """
         if not (self._sol_ok and self._pubkey):
-            return "⚠️ Trading inaktiv (Pakete oder WALLET_SECRET fehlen)."
+            return None, "⚠️ Trading inaktiv (Pakete oder WALLET_SECRET fehlen)."
         if pct <= 0:
-            return "⚠️ Prozent muss > 0 sein."
+            return None, "⚠️ Prozent muss > 0 sein."
         try:
-            # Token-Balance (roh) ermitteln
-            from solana.publickey import PublicKey
-            from spl.token.instructions import get_associated_token_address
-            owner = self._keypair.public_key
-            mint_pk = PublicKey(in_mint)
-            ata = get_associated_token_address(owner, mint_pk)
-            bal = self._rpc().get_token_account_balance(ata).value
-            if not bal:
-                return "⚠️ Kein Token-Bestand."
-            raw = int(bal.amount)
+            # Token-Balance (roh) ermitteln – aus dem Cache, nach jedem Swap invalidiert
+            raw, _ = self.get_token_raw(in_mint)
             if raw <= 0:
-                return "⚠️ Kein Token-Bestand."
+                return None, "⚠️ Kein Token-Bestand."
             raw_to_sell = int(raw * min(pct, 100.0) / 100.0)
 
             quote = self._jupiter_quote(in_mint, SOL_MINT, raw_to_sell)
+            if on_done:
+                sig = self._swap_submit(quote, SOL_MINT, on_done)
+                return sig, f"📤 SELL {pct:.2f}% ({in_mint[:6]}…) -> SOL gesendet\nTX: https://solscan.io/tx/{sig}"
             sig = self._jupiter_swap(quote, output_mint=SOL_MINT)
-            return f"✅ SELL {pct:.2f}% ({in_mint[:6]}…) -> SOL\nTX: https://solscan.io/tx/{sig}"
+            return sig, f"✅ SELL {pct:.2f}% ({in_mint[:6]}…) -> SOL\nTX: https://solscan.io/tx/{sig}"
         except Exception as e:
-            return f"❌ Sell-Fehler: {e}"
+            return None, f"❌ Sell-Fehler: {e}"
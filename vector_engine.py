@@ -0,0 +1,75 @@
+# vector_engine.py — Spaltenbasierte Filter-/Ranking-Engine (NumPy, optional)
+# - Ein Scan (PairSnapshots) wird einmal in Spalten (liq, fdv, vol5, best-vol, created-at, chain, quote) umgewandelt
+# - Chain/Quote/Age/LIQ/FDV/VOL5M/VOL_BEST und Ranking laufen als Array-Operationen
+# - Ergebnis identisch zu apply_strategy(filter_pairs(pairs))
+from typing import List, Dict, Any
+from datetime import datetime
+
+from pairs import PairSnapshot, _now_us
+
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except Exception:
+    np = None
+    HAVE_NUMPY = False
+
+class PairColumns:
+    """Spaltenansicht eines Scans; die Snapshots bleiben nur für die Ausgabe referenziert."""
+
+    def __init__(self, pairs: List[PairSnapshot]):
+        n = len(pairs)
+        self.pairs = pairs
+        self.chain = np.array([p.chain_id for p in pairs], dtype=object)
+        self.url_sol = np.fromiter((p.url_sol for p in pairs), dtype=bool, count=n)
+        self.quote = np.array([(p.quote_symbol or "").upper() for p in pairs], dtype=object)
+        self.liq = np.fromiter((p.liq for p in pairs), dtype=np.float64, count=n)
+        self.fdv = np.fromiter((p.fdv for p in pairs), dtype=np.float64, count=n)
+        self.vol5 = np.fromiter((p.vol5 for p in pairs), dtype=np.float64, count=n)
+        self.best = np.fromiter((p.best_vol for p in pairs), dtype=np.float64, count=n)
+        self.has_created = np.fromiter((p.created_ms is not None for p in pairs), dtype=bool, count=n)
+        self.created_us = np.fromiter(((p.created_ms or 0) * 1000 for p in pairs), dtype=np.float64, count=n)
+
+    def __len__(self):
+        return len(self.pairs)
+
+    def age_minutes(self, now: datetime = None):
+        age = np.floor_divide((_now_us(now) - self.created_us) / 1e6, 60.0)
+        return np.where(self.has_created, age, 1e9)
+
+def strategy_mask(liq, fdv, vol5, best, cfg: Dict[str, Any]):
+    """Dieselben Bedingungen wie apply_strategy (als Negation der 'continue'-Fälle), auf Spalten."""
+    keep = ~(liq < cfg["STRAT_LIQ_MIN"])
+    if cfg["STRAT_FDV_MAX"]:
+        keep &= ~((fdv != 0) & (fdv > cfg["STRAT_FDV_MAX"]))
+    keep &= ~(vol5 < cfg["STRAT_VOL5M_MIN"])
+    if cfg["STRAT_VOL_BEST_MIN"]:
+        keep &= ~(best < cfg["STRAT_VOL_BEST_MIN"])
+    return keep
+
+def rank_order(liq, fdv, best, *outer):
+    # Ranking: mehr Liq, niedriger FDV, hohes bestVol (lexsort ist stabil wie list.sort);
+    # optionale äußere Schlüssel (z. B. Scan-Nummer) gruppieren zuerst
+    return np.lexsort((-best, fdv, -liq) + tuple(reversed(outer)))
+
+def filter_and_rank(pairs: List[PairSnapshot], cfg: Dict[str, Any], now: datetime = None) -> List[tuple]:
+    """Wie apply_strategy(filter_pairs(pairs)): Liste (p, liq, fdv, vol5, bestv), sortiert."""
+    if not pairs:
+        return []
+    cols = PairColumns(pairs)
+    quote = cfg["STRAT_QUOTE"].upper()
+
+    keep = (cols.chain == cfg["STRAT_CHAIN"]) | cols.url_sol
+    n_chain = int(keep.sum())
+    if cfg["STRICT_QUOTE"] == 1 and quote != "ANY":
+        keep &= (cols.quote == quote)
+    n_quote = int(keep.sum())
+    if cfg["MAX_AGE_MIN"] > 0:
+        keep &= cols.age_minutes(now) <= cfg["MAX_AGE_MIN"]
+    n_age = int(keep.sum())
+
+    keep &= strategy_mask(cols.liq, cols.fdv, cols.vol5, cols.best, cfg)
+    idx = np.flatnonzero(keep)
+    order = idx[rank_order(cols.liq[idx], cols.fdv[idx], cols.best[idx])]
+    print(f"[SCAN] vector: chain {n_chain} | quote {n_quote} | age {n_age} | hits {len(order)} of {len(cols)}")
+    return [(pairs[i], pairs[i].liq, pairs[i].fdv, pairs[i].vol5, pairs[i].best_vol) for i in order.tolist()]